@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+COM 왕복 호출 프로파일러 (Excel / Outlook 자동화용)
+
+COM 객체를 프록시로 감싸서 속성 읽기(get) / 속성 쓰기(set) / 메서드 호출(call)마다
+횟수와 시간을 재고, 호출한 Python 함수(파일:함수)별로 집계한다.
+실행이 끝나면 "상위 호출 위치" 표를 출력.
+
+켜는 방법 (기본은 꺼짐 - 꺼져 있으면 wrap()이 객체를 그대로 돌려주므로 비용 없음):
+    set COM_PROFILE=1          (Windows)
+    COM_PROFILE=1 python ...   (Linux / fake_com 사용 시)
+또는 코드에서 com_profiler.enable()
+
+사용 예:
+    excel = com_profiler.wrap(win32.Dispatch("Excel.Application"), "Excel")
+    ...
+    com_profiler.print_report()
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+
+# 호출 위치 계산 시 건너뛸 프록시 내부 함수들
+_INTERNAL_FRAMES = {"__getattr__", "__setattr__", "__call__", "__iter__", "method", "record", "_call_site"}
+
+# 반환된 COM 객체 이름 (표에 "Worksheet.Cells()"처럼 보이도록)
+# 컬렉션 항목 (wb.Sheets(1), for sheet in wb.Sheets, Workbooks.Add() 등)
+_ITEM_NAMES = {
+    "Sheets": "Worksheet",
+    "Worksheets": "Worksheet",
+    "Workbooks": "Workbook",
+    "Attachments": "Attachment",
+}
+# 속성 / 메서드 결과
+_RESULT_NAMES = {
+    "UsedRange": "Range",
+    "Open": "Workbook",
+    "Cells": "Range",
+    "Borders": "Border",
+    "CreateItem": "MailItem",
+    "GetNamespace": "Namespace",
+    "GetDefaultFolder": "Folder",
+}
+
+# 호출 종류
+KIND_GET = "get"
+KIND_SET = "set"
+KIND_CALL = "call"
+
+
+def is_com_object(value) -> bool:
+    """win32com CDispatch (및 fake_com 객체)는 _oleobj_ 속성을 가짐"""
+    return hasattr(type(value), "_oleobj_") or hasattr(value, "_oleobj_")
+
+
+class ComProfiler:
+    """
+    COM 호출 통계 수집기
+    - stats[(호출 위치, 멤버, 종류)] = [횟수, 총 시간(초)]
+    - 여러 스레드(Excel 작업자 풀 등)에서 동시에 기록하므로 stats는 _lock 안에서만 읽고 씀
+    """
+
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def record(self, member: str, kind: str, elapsed: float):
+        site = _call_site()  # 스택 훑기는 잠금 밖에서
+        with self._lock:
+            entry = self.stats[(site, member, kind)]
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def snapshot(self, reset: bool = False) -> Dict[Tuple[str, str, str], List[float]]:
+        """지금까지의 통계 복사본 (reset=True면 복사하면서 비움)"""
+        with self._lock:
+            stats = {key: list(entry) for key, entry in self.stats.items()}
+            if reset:
+                self.stats.clear()
+        return stats
+
+    @property
+    def total_calls(self) -> int:
+        return int(sum(count for count, _ in self.snapshot().values()))
+
+    def by_call_site(self, stats: Optional[Dict] = None) -> List[Tuple[str, Dict[str, int], float]]:
+        """호출 위치별 (위치, {종류: 횟수}, 총 시간) - 총 시간 내림차순"""
+        stats = self.snapshot() if stats is None else stats
+        sites: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for (site, _, kind), (count, elapsed) in stats.items():
+            sites[site][kind] += count
+            sites[site]["_time"] += elapsed
+        rows = []
+        for site, data in sites.items():
+            elapsed = data.pop("_time", 0.0)
+            rows.append((site, {k: int(v) for k, v in data.items()}, elapsed))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def by_member(self, stats: Optional[Dict] = None) -> List[Tuple[str, str, int, float]]:
+        """멤버별 (멤버, 종류, 횟수, 총 시간) - 총 시간 내림차순"""
+        stats = self.snapshot() if stats is None else stats
+        members: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+        for (_, member, kind), (count, elapsed) in stats.items():
+            members[(member, kind)][0] += count
+            members[(member, kind)][1] += elapsed
+        rows = [(member, kind, int(count), elapsed) for (member, kind), (count, elapsed) in members.items()]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def format_report(self, top: int = 15, stats: Optional[Dict] = None) -> str:
+        stats = self.snapshot() if stats is None else stats
+        lines = []
+        total_calls = int(sum(count for count, _ in stats.values()))
+        total_time = sum(elapsed for _, elapsed in stats.values())
+        lines.append("=" * 90)
+        lines.append(f"COM 호출 프로파일: 총 {total_calls}회, {total_time * 1000:.1f}ms")
+        lines.append("=" * 90)
+        lines.append(f"[상위 호출 위치] (최대 {top}개)")
+        lines.append(f"{'호출 위치':<48}{'횟수':>8}{'get':>7}{'set':>7}{'call':>7}{'시간(ms)':>11}")
+        for site, kinds, elapsed in self.by_call_site(stats)[:top]:
+            count = sum(kinds.values())
+            lines.append(
+                f"{site[:47]:<48}{count:>8}{kinds.get(KIND_GET, 0):>7}"
+                f"{kinds.get(KIND_SET, 0):>7}{kinds.get(KIND_CALL, 0):>7}{elapsed * 1000:>11.1f}"
+            )
+        lines.append("")
+        lines.append(f"[상위 COM 멤버] (최대 {top}개)")
+        lines.append(f"{'멤버':<40}{'종류':>6}{'횟수':>8}{'시간(ms)':>11}{'평균(us)':>11}")
+        for member, kind, count, elapsed in self.by_member(stats)[:top]:
+            avg_us = elapsed / count * 1_000_000 if count else 0.0
+            lines.append(f"{member[:39]:<40}{kind:>6}{count:>8}{elapsed * 1000:>11.1f}{avg_us:>11.1f}")
+        lines.append("=" * 90)
+        return "\n".join(lines)
+
+
+def _call_site() -> str:
+    """프록시/프로파일러 밖의 첫 번째 호출 프레임 → '파일명:함수명'"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_name in _INTERNAL_FRAMES \
+            and os.path.normcase(os.path.abspath(frame.f_code.co_filename)) == _THIS_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def _result_name(owner: str, attr: str) -> str:
+    if attr in _RESULT_NAMES:
+        return _RESULT_NAMES[attr]
+    if attr == "Add":
+        return _ITEM_NAMES.get(owner, owner)  # Workbooks.Add() → Workbook
+    return attr
+
+
+def _unwrap(value):
+    """COM에 인자로 넘길 때는 프록시를 벗겨서 실제 객체 전달"""
+    if isinstance(value, ProfiledCom):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, tuple):
+        return tuple(_unwrap(v) for v in value)
+    if isinstance(value, list):
+        return [_unwrap(v) for v in value]
+    return value
+
+
+class ProfiledCom:
+    """COM 객체 프록시 - 모든 get/set/call을 ComProfiler에 기록"""
+    __slots__ = ("_target", "_name", "_profiler")
+
+    def __init__(self, target, name: str, profiler: ComProfiler):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_profiler", profiler)
+
+    def _wrap_result(self, value, name: str):
+        if is_com_object(value):
+            return ProfiledCom(value, name, object.__getattribute__(self, "_profiler"))
+        return value
+
+    def __getattr__(self, attr: str):
+        target = object.__getattribute__(self, "_target")
+        owner = object.__getattribute__(self, "_name")
+        profiler = object.__getattribute__(self, "_profiler")
+
+        start = time.perf_counter()
+        value = getattr(target, attr)
+        elapsed = time.perf_counter() - start
+
+        if callable(value) and not is_com_object(value):
+            # 메서드: 실제 호출 시점에 call로 기록
+            member = f"{owner}.{attr}()"
+
+            def method(*args, **kwargs):
+                args = _unwrap(args)
+                kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
+                call_start = time.perf_counter()
+                try:
+                    result = value(*args, **kwargs)
+                finally:
+                    profiler.record(member, KIND_CALL, time.perf_counter() - call_start)
+                return self._wrap_result(result, _result_name(owner, attr))
+            return method
+
+        profiler.record(f"{owner}.{attr}", KIND_GET, elapsed)
+        return self._wrap_result(value, _result_name(owner, attr))
+
+    def __setattr__(self, attr: str, value):
+        target = object.__getattribute__(self, "_target")
+        owner = object.__getattribute__(self, "_name")
+        profiler = object.__getattribute__(self, "_profiler")
+
+        start = time.perf_counter()
+        try:
+            setattr(target, attr, _unwrap(value))
+        finally:
+            profiler.record(f"{owner}.{attr}", KIND_SET, time.perf_counter() - start)
+
+    def __call__(self, *args, **kwargs):
+        # 기본 멤버 호출 (예: wb.Sheets(1), ws.Cells(r, c))
+        target = object.__getattribute__(self, "_target")
+        owner = object.__getattribute__(self, "_name")
+        profiler = object.__getattribute__(self, "_profiler")
+
+        start = time.perf_counter()
+        try:
+            result = target(*_unwrap(args), **{k: _unwrap(v) for k, v in kwargs.items()})
+        finally:
+            profiler.record(f"{owner}()", KIND_CALL, time.perf_counter() - start)
+        return self._wrap_result(result, _ITEM_NAMES.get(owner, owner))
+
+    def __iter__(self):
+        # 컬렉션 순회 (예: for sheet in wb.Sheets) - 항목 하나 가져올 때마다 get으로 기록
+        target = object.__getattribute__(self, "_target")
+        owner = object.__getattribute__(self, "_name")
+        profiler = object.__getattribute__(self, "_profiler")
+
+        iterator = iter(target)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                profiler.record(f"{owner}[iter]", KIND_GET, time.perf_counter() - start)
+            yield self._wrap_result(item, _ITEM_NAMES.get(owner, owner))
+
+    def __repr__(self):
+        return f"<ProfiledCom {object.__getattribute__(self, '_name')}: {object.__getattribute__(self, '_target')!r}>"
+
+
+# ----------------------------
+# 전역 on/off
+# ----------------------------
+_profiler: Optional[ComProfiler] = ComProfiler() if os.environ.get("COM_PROFILE", "") not in ("", "0") else None
+
+
+def enable() -> ComProfiler:
+    """프로파일링 켜기 (이미 켜져 있으면 기존 수집기 반환)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = ComProfiler()
+    return _profiler
+
+
+def disable():
+    global _profiler
+    _profiler = None
+
+
+def get_profiler() -> Optional[ComProfiler]:
+    return _profiler
+
+
+def wrap(com_object, name: str = "COM"):
+    """프로파일링이 켜져 있으면 프록시로 감싸고, 꺼져 있으면 그대로 반환"""
+    if _profiler is None or com_object is None or isinstance(com_object, ProfiledCom):
+        return com_object
+    return ProfiledCom(com_object, name, _profiler)
+
+
+def print_report(out: Callable[[str], None] = print, top: int = 15, reset: bool = True):
+    """수집된 통계를 '상위 호출 위치' 표로 출력 (꺼져 있거나 기록이 없으면 아무것도 안 함)"""
+    if _profiler is None:
+        return
+    stats = _profiler.snapshot(reset=reset)
+    if not stats:
+        return
+    for line in _profiler.format_report(top=top, stats=stats).splitlines():
+        out(line)
+
+
+if __name__ == "__main__":
+    # fake_com으로 프로파일러 동작 확인 (Linux에서도 실행 가능)
+    from fake_com import FakeExcelApplication
+
+    enable()
+    excel = wrap(FakeExcelApplication(), "Excel")
+    excel.Visible = False
+    wb = excel.Workbooks.Add("상세내역")
+    ws = wb.Sheets("상세내역")
+
+    def write_cell_by_cell(n: int):
+        for i in range(n):
+            ws.Cells(i + 1, 1).Value = f"매장{i}"
+
+    def write_bulk(n: int):
+        ws.Range(ws.Cells(1, 2), ws.Cells(n, 2)).Value = tuple((f"매장{i}",) for i in range(n))
+
+    write_cell_by_cell(300)
+    write_bulk(300)
+    print_report()
@@ -1,10 +1,23 @@
 # -*- coding: utf-8 -*-
 import os
 import re
+import hashlib
+import queue
 import shutil
+import signal
 import tempfile
 import threading
-from urllib.parse import unquote
+import time
+import json
+import logging
+import zipfile
+from logging.handlers import RotatingFileHandler
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+from urllib.parse import quote, unquote
 
 import tkinter as tk
 from tkinter import messagebox
@@ -12,9 +25,31 @@ from tkinter import messagebox
 from tkinterdnd2 import TkinterDnD, DND_FILES  # pip install tkinterdnd2
 import win32com.client as win32               # pip install pywin32
 
+import com_profiler  # COM 호출 프로파일링 (COM_PROFILE=1일 때만 동작)
+import xls_convert   # Excel 없이 .xls → .xlsx 변환 (xlrd + openpyxl)
+
+# .xls 변환 방식: auto = Excel 없이 먼저 변환하고 안 되는 파일(수식/그림 등)만 Excel,
+#                 native = Excel 없이만, com = 항상 Excel
+XLS_ENGINE = os.environ.get("XLS_ENGINE", "auto").lower()
+
+
+# 사본 안의 연/월 문자열(셀, 외부 링크)도 다음 달로 바꿀지 (기본은 파일명만 바꿈)
+PATCH_MONTH_CONTENTS = os.environ.get("EXCEL_COPY_PATCH", "0") == "1"
+
 
 # -------------------- 공통 유틸 -------------------- #
 
+# 연/월 패턴 (앞에 있는 것부터 먼저 시도)
+YEAR_MONTH_PATTERNS = [
+    r'(?P<year>\d{4})\s*년\s*(?P<month>\d{1,2})\s*월',
+    r'(?P<year>\d{2})\s*년\s*(?P<month>\d{1,2})\s*월',
+    r'(?P<year>\d{4})\.\s*(?P<month>\d{1,2})(?=\D|$)',
+    r'(?P<year>\d{2})\.\s*(?P<month>\d{1,2})(?=\D|$)',
+    r'(?P<year>\d{4})(?P<month>\d{1,2})(?=\D|$)',
+    r'(?P<year>\d{2})(?P<month>\d{1,2})(?=\D|$)',
+]
+
+
 def extract_year_month_from_filename(filename: str) -> tuple[int, int, str, str] | None:
     """
     파일명에서 'YY년MM월', 'YYYY년MM월', 'YY.MM', 'YYYY.MM',
@@ -22,26 +57,71 @@ def extract_year_month_from_filename(filename: str) -> tuple[int, int, str, str]
     year_full은 4자리 정수(예: 2025).
     """
     name, _ = os.path.splitext(os.path.basename(filename))
-    patterns = [
-        r'(?P<year>\d{4})\s*년\s*(?P<month>\d{1,2})\s*월',
-        r'(?P<year>\d{2})\s*년\s*(?P<month>\d{1,2})\s*월',
-        r'(?P<year>\d{4})\.\s*(?P<month>\d{1,2})(?=\D|$)',
-        r'(?P<year>\d{2})\.\s*(?P<month>\d{1,2})(?=\D|$)',
-        r'(?P<year>\d{4})(?P<month>\d{1,2})(?=\D|$)',
-        r'(?P<year>\d{2})(?P<month>\d{1,2})(?=\D|$)',
-    ]
-    for pattern in patterns:
-        m = re.search(pattern, name)
-        if m:
-            year_str = m.group("year")
-            month_str = m.group("month")
-            year = int(year_str)
-            month = int(month_str)
-            if len(year_str) == 2:
-                year += 2000
-            matched_text = m.group(0)  # 매칭된 전체 문자열
-            return year, month, pattern, matched_text
-    return None
+    return find_year_month(name)
+
+
+def find_year_month(name: str) -> tuple[int, int, str, str] | None:
+    """확장자를 떼지 않고 문자열 그대로 연/월 패턴 찾기 (폴더 이름용, 반환값은 위와 같음)."""
+    match = scan_year_month(name)
+    if match is None:
+        return None
+    return match.year, match.month, match.pattern, match.text
+
+
+@dataclass
+class YearMonthMatch:
+    """scan_year_month 결과 (start/end는 name 안의 위치, name[start:end] == text)"""
+    year: int            # 4자리 (예: 2025)
+    month: int
+    pattern: str         # YEAR_MONTH_PATTERNS 중 매칭된 패턴
+    index: int           # 그 패턴의 순번 (작을수록 우선)
+    start: int
+    end: int
+    text: str
+    year_text: str       # 원본 연도 문자열 ("25" / "2025")
+    month_text: str      # 원본 월 문자열 ("1" / "01")
+
+
+def _compile_year_month_scanners(patterns: list[str]) -> list[re.Pattern]:
+    """
+    scanners[k] = 앞의 k+1개 패턴을 하나로 합친 정규식
+    k번째 패턴의 그룹 번호: 전체 3k+1, 연도 3k+2, 월 3k+3 (이름으로 찾는 것보다 빠름)
+    같은 위치에서는 앞 패턴이 먼저 시도되므로 search 결과는 "가장 왼쪽 위치에서 가장 우선인 패턴"
+    """
+    alternatives = []
+    for k, pattern in enumerate(patterns):
+        pattern = pattern.replace("?P<year>", "").replace("?P<month>", "")
+        alternatives.append(f"({pattern})")
+    return [re.compile("|".join(alternatives[:k + 1])) for k in range(len(alternatives))]
+
+
+_YEAR_MONTH_SCANNERS = _compile_year_month_scanners(YEAR_MONTH_PATTERNS)
+
+
+def scan_year_month(name: str) -> YearMonthMatch | None:
+    """
+    YEAR_MONTH_PATTERNS를 합친 정규식으로 연/월 찾기 (패턴 위치 포함)
+    결과는 패턴을 순서대로 re.search했을 때와 같음: 가장 우선인 패턴의 가장 왼쪽 매칭
+    - 전체 패턴으로 한 번 찾고, 첫 패턴이 아니면 그 뒤에서 더 우선인 패턴만 다시 찾음
+      (앞 위치에서는 어떤 패턴도 안 맞았으므로 뒤만 보면 됨, 보통 한두 번이면 끝)
+    """
+    best = _YEAR_MONTH_SCANNERS[-1].search(name)
+    if best is None:
+        return None
+    best_index = (best.lastindex - 1) // 3  # 바깥 그룹이 마지막에 닫힘
+    while best_index > 0:
+        better = _YEAR_MONTH_SCANNERS[best_index - 1].search(name, best.start() + 1)
+        if better is None:
+            break
+        best, best_index = better, (better.lastindex - 1) // 3
+    group = 3 * best_index + 1
+    year_text, month_text = best.group(group + 1, group + 2)
+    year = int(year_text) + (2000 if len(year_text) == 2 else 0)
+    start, end = best.span(group)
+    return YearMonthMatch(
+        year, int(month_text), YEAR_MONTH_PATTERNS[best_index], best_index,
+        start, end, name[start:end], year_text, month_text,
+    )
 
 
 def get_next_year_month(year: int, month: int) -> tuple[int, int]:
@@ -68,6 +148,67 @@ def make_unique_path(path: str) -> str:
     return candidate
 
 
+class DestinationPlanner:
+    """
+    여러 사본 경로를 한 번에 정함 (make_unique_path를 파일마다 돌리는 대신)
+    - 대상 폴더마다 os.listdir를 한 번만 하고 이름 목록을 기억 (normcase, 폴더도 포함)
+    - 배정한 경로는 따로 기억해서 뒤 파일과 겹치면 _copy1, _copy2... (파일 시스템을 다시 보지 않음)
+    - 계획하는 동안 다른 곳에서 생긴 파일은 모름 → 사본은 copy_new_file 등으로 덮어쓰지 않게 만들어서 막음
+    - 스레드 안전 (동시에 도는 드롭 배치끼리 하나를 같이 써서 서로 같은 이름을 배정하지 않음)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._existing: dict[str, set[str]] = {}   # 폴더 → 이미 있는 이름
+        self._reserved: dict[str, set[str]] = {}   # 폴더 → 배정한 이름
+
+    def _names(self, directory: str) -> set[str]:
+        key = os.path.normcase(directory)
+        names = self._existing.get(key)
+        if names is None:
+            try:
+                names = {os.path.normcase(name) for name in os.listdir(directory)}
+            except OSError:
+                names = set()  # 아직 없는 폴더
+            self._existing[key] = names
+        return names
+
+    def exists(self, path: str) -> bool:
+        """계획 시작 시점에 디스크에 있던 경로인지 (배정한 경로는 제외)"""
+        directory, name = os.path.split(path)
+        with self._lock:
+            return os.path.normcase(name) in self._names(directory)
+
+    def reserve(self, path: str) -> str:
+        """path와 겹치지 않는 경로를 정해서 배정하고 반환"""
+        directory, name = os.path.split(path)
+        base, ext = os.path.splitext(name)
+        with self._lock:
+            existing = self._names(directory)
+            reserved = self._reserved.setdefault(os.path.normcase(directory), set())
+            candidate = name
+            i = 1
+            while os.path.normcase(candidate) in existing or os.path.normcase(candidate) in reserved:
+                candidate = f"{base}_copy{i}{ext}"
+                i += 1
+            reserved.add(os.path.normcase(candidate))
+        return os.path.join(directory, candidate)
+
+
+def copy_new_file(source: str, dest: str):
+    """
+    source를 dest로 복사 - dest가 이미 있으면 덮어쓰지 않고 FileExistsError
+    (임시 이름으로 shutil.copyfile 후 xls_convert.move_no_replace, 실패하면 임시 파일만 지움)
+    """
+    temp_path = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(source, temp_path)
+        xls_convert.move_no_replace(temp_path, dest)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
 # -------------------- xls → xlsx 변환 (Excel COM 객체 재사용) -------------------- #
 
 def normalize_path(path: str) -> str:
@@ -88,6 +229,21 @@ def normalize_path(path: str) -> str:
     return path
 
 
+def create_excel_app():
+    """변환용 숨김 Excel 인스턴스 생성 (DispatchEx로 전용 프로세스, 호출자가 Quit해야 함)."""
+    excel = com_profiler.wrap(win32.DispatchEx("Excel.Application"), "Excel")
+    excel.Visible = False
+    excel.DisplayAlerts = False
+    excel.ScreenUpdating = False  # 화면 업데이트 비활성화로 성능 향상
+    excel.EnableEvents = False  # 이벤트 비활성화로 성능 향상
+    # Calculation 속성은 일부 Excel 버전에서 지원하지 않을 수 있음
+    try:
+        excel.Calculation = -4105  # xlCalculationManual - 자동 계산 비활성화
+    except Exception:
+        pass  # 실패해도 계속 진행
+    return excel
+
+
 def convert_xls_to_xlsx_with_excel(xls_path: str, dest_xlsx_path: str, excel_app=None) -> str:
     """
     Excel COM 객체를 사용하여 .xls를 .xlsx로 변환.
@@ -102,16 +258,7 @@ def convert_xls_to_xlsx_with_excel(xls_path: str, dest_xlsx_path: str, excel_app
     excel = excel_app
     should_quit = False
     if excel is None:
-        excel = win32.DispatchEx("Excel.Application")
-        excel.Visible = False
-        excel.DisplayAlerts = False
-        excel.ScreenUpdating = False  # 화면 업데이트 비활성화로 성능 향상
-        excel.EnableEvents = False  # 이벤트 비활성화로 성능 향상
-        # Calculation 속성은 일부 Excel 버전에서 지원하지 않을 수 있음
-        try:
-            excel.Calculation = -4105  # xlCalculationManual - 자동 계산 비활성화
-        except Exception:
-            pass  # 실패해도 계속 진행
+        excel = create_excel_app()
         should_quit = True
     
     wb = None
@@ -145,28 +292,277 @@ def convert_xls_to_xlsx_with_excel(xls_path: str, dest_xlsx_path: str, excel_app
     return dest_xlsx_path
 
 
-# -------------------- 메인 로직: 파일명만 변경 (내용 변경 없음) -------------------- #
+def convert_xls_to_xlsx(xls_path: str, dest_xlsx_path: str, excel_app=None, engine: str = XLS_ENGINE) -> str:
+    """
+    engine에 따라 .xls를 .xlsx로 변환 (XLS_ENGINE 참고).
+    auto면 Excel 없이 변환이 실패했을 때만 Excel COM 사용.
+    """
+    cached_path = make_unique_path(dest_xlsx_path)
+    if load_cached_conversion(xls_path, cached_path, engine):
+        return cached_path
+
+    final_path = None
+    converter = "native"
+    if engine != "com":
+        try:
+            final_path = xls_convert.convert_xls_to_xlsx(xls_path, make_unique_path(dest_xlsx_path))
+        except Exception:
+            if engine == "native":
+                raise
+    if final_path is None:
+        final_path = convert_xls_to_xlsx_with_excel(xls_path, dest_xlsx_path, excel_app)
+        converter = "com"
+    store_conversion(xls_path, final_path, converter)
+    return final_path
+
+
+# -------------------- 변환 결과 캐시 (.xls 내용 해시 + 변환기 → .xlsx) -------------------- #
+
+# 같은 .xls(양식 등)를 다시 드롭하면 변환하지 않고 지난번 결과를 복사
+# 끄는 방법: set CONVERT_CACHE=0
+CONVERT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "convert_cache")
+CONVERT_CACHE_MAX_MB = float(os.environ.get("CONVERT_CACHE_MAX_MB", "500"))  # 넘으면 오래 안 쓴 것부터 삭제
+CONVERT_CACHE_ENABLED = os.environ.get("CONVERT_CACHE", "1") not in ("0", "")
+# 변환기별 버전 (캐시 키에 들어감, 변환 방식이 바뀌면 올려서 예전 결과를 안 씀 - 남은 파일은 용량 정리 때 삭제)
+CONVERT_CACHE_VERSIONS = {"native": xls_convert.CONVERTER_VERSION, "com": 1}
 
-def make_next_month_copy(original_path: str, excel_app=None) -> tuple[str, int]:
+# (경로, 크기, 수정시간) → sha256 (같은 실행 안에서 같은 파일을 두 번 읽지 않도록)
+_hash_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_hash_lock = threading.Lock()
+
+
+def xls_content_hash(path: str) -> str:
+    """파일 내용 sha256 (크기/수정시간이 같으면 이번 실행에서 계산한 값 재사용)"""
+    stat = os.stat(path)
+    key = (os.path.normcase(os.path.abspath(path)), stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        digest = _hash_memo.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with _hash_lock:
+            _hash_memo[key] = digest
+            while len(_hash_memo) > 1000:
+                _hash_memo.popitem(last=False)
+    return digest
+
+
+def _cache_entry(xls_path: str, converter: str) -> str:
+    """converter: "native"(xls_convert) / "com"(Excel) - 결과가 다르므로 따로 보관"""
+    version = CONVERT_CACHE_VERSIONS[converter]
+    return os.path.join(CONVERT_CACHE_DIR, f"{xls_content_hash(xls_path)}.{converter}-v{version}.xlsx")
+
+
+def load_cached_conversion(xls_path: str, dest_xlsx_path: str, engine: str = XLS_ENGINE) -> bool:
     """
-    - 파일명에서 연/월 추출 ('YY년MM월', 'YYYY년MM월', 'YY.MM', 'YYYY.MM' 형식 지원)
-    - 다음달 연/월로 바뀐 이름을 만들고 (확장자는 .xlsx로 통일)
-    - 원본이 .xls면: Excel COM으로 .xlsx로 변환 후, 새 이름으로 저장
-    - 원본이 .xlsx/.xlsm이면: 파일을 새 이름(.xlsx/.xlsm)으로 복사
-    - ⚠️ 엑셀 파일 안의 내용(셀 값, 날짜 등)은 전혀 수정하지 않음
-    - excel_app: Excel COM 객체 (재사용 시 제공, None이면 필요시 새로 생성)
-    → (최종 사본 경로, 변경된 셀 개수=0) 반환
+    캐시에 같은 내용의 변환 결과가 있으면 dest로 복사하고 True (없거나 실패하면 False)
+    - engine이 com이면 Excel로 변환한 결과만, 아니면 Excel 결과를 먼저 찾고 없으면 Excel 없이 변환한 결과
+    - dest가 이미 있으면 덮어쓰지 않고 FileExistsError
+    """
+    if not CONVERT_CACHE_ENABLED:
+        return False
+    try:
+        converters = ("com",) if engine == "com" else ("com", "native")
+        entry = next(
+            (path for path in (_cache_entry(xls_path, c) for c in converters) if os.path.exists(path)), None
+        )
+        if entry is None:
+            return False
+        copy_new_file(entry, dest_xlsx_path)
+        os.utime(entry)  # 최근에 쓴 것으로 표시 (정리할 때 수정시간 순)
+        return True
+    except FileExistsError:
+        raise
+    except OSError as e:
+        print(f"변환 캐시 읽기 실패 (새로 변환): {e}")
+        return False
+
+
+def store_conversion(xls_path: str, xlsx_path: str, converter: str):
     """
+    변환 결과를 캐시에 저장 (연/월 바꾸기 전 상태로 저장해야 함, 실패해도 변환은 그대로)
+    converter: 결과를 만든 변환기 ("native" / "com")
+    """
+    if not CONVERT_CACHE_ENABLED:
+        return
+    try:
+        os.makedirs(CONVERT_CACHE_DIR, exist_ok=True)
+        entry = _cache_entry(xls_path, converter)
+        if os.path.exists(entry):
+            return
+        temp_path = f"{entry}.{threading.get_ident()}.tmp"
+        shutil.copyfile(xlsx_path, temp_path)
+        os.replace(temp_path, entry)
+        _prune_convert_cache()
+    except OSError as e:
+        print(f"변환 캐시 저장 실패 (캐시 없이 계속): {e}")
+
+
+def _prune_convert_cache():
+    """캐시가 CONVERT_CACHE_MAX_MB를 넘으면 오래 안 쓴 것(수정시간 순)부터 삭제"""
+    entries = []
+    for name in os.listdir(CONVERT_CACHE_DIR):
+        if name.endswith(".xlsx"):
+            try:
+                stat = os.stat(os.path.join(CONVERT_CACHE_DIR, name))
+            except OSError:
+                continue  # 다른 작업자가 방금 지움
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    limit = CONVERT_CACHE_MAX_MB * 1024 * 1024
+    for _, size, name in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(os.path.join(CONVERT_CACHE_DIR, name))
+        except OSError:
+            pass
+        total -= size
+
+
+# -------------------- 사본 안의 연/월 바꾸기 (xlsx XML 직접 수정) -------------------- #
+
+# 셀 문자열용: 'YY년MM월' / 'YYYY년MM월'과 'YYYY.MM'만 (앞뒤에 숫자·소수점·%가 붙으면 제외)
+# 'YYMM' / 'YYYYMM' / 'YY.MM'은 주문번호·매장코드·소수(25.11%)와 구분이 안 되므로 링크 파일명에만 사용
+_CELL_PATTERNS = [re.compile(r'(?<!\d)' + p) for p in YEAR_MONTH_PATTERNS[:2]] + [
+    re.compile(r'(?<![\d.])(?P<year>\d{4})\.\s*(?P<month>\d{1,2})(?![\d%.])'),
+]
+_PATH_PATTERNS = [re.compile(r'(?<!\d)' + p) for p in YEAR_MONTH_PATTERNS]
+
+_XML_TEXT_RE = re.compile(r'(<t(?:\s[^>]*)?>)([^<]*)(</t>)')      # 공유 문자열 / 인라인 문자열 / 서식 있는 텍스트
+_REL_TARGET_RE = re.compile(r'(Target=")([^"]*)(")')
+_TEXT_PART_RE = re.compile(r'^xl/(worksheets/sheet\d+|sharedStrings)\.xml$')
+_LINK_PART_RE = re.compile(r'^xl/externalLinks/_rels/externalLink\d+\.xml\.rels$')
+
+
+def shift_month_text(text: str, old_year: int, old_month: int, patterns=_CELL_PATTERNS) -> tuple[str, int]:
+    """
+    text 안의 old_year년 old_month월 표기를 모두 다음 달로 (다른 달 표기는 그대로).
+    연/월 자릿수와 사이의 공백·구분자는 원본 그대로 유지.
+    → (바뀐 문자열, 바꾼 개수)
+    """
+    new_year, new_month = get_next_year_month(old_year, old_month)
+    count = 0
+
+    def repl(m):
+        nonlocal count
+        year_str = m.group("year")
+        month_str = m.group("month")
+        year = int(year_str) + (2000 if len(year_str) == 2 else 0)
+        if (year, int(month_str)) != (old_year, old_month):
+            return m.group(0)
+        count += 1
+        year_new = f"{new_year}" if len(year_str) == 4 else f"{new_year % 100:02d}"
+        month_new = f"{new_month:02d}" if len(month_str) == 2 else f"{new_month}"
+        start = m.start()
+        matched = m.group(0)
+        (ys, ye), (ms, me) = m.span("year"), m.span("month")
+        return (matched[:ys - start] + year_new + matched[ye - start:ms - start]
+                + month_new + matched[me - start:])
+
+    for pattern in patterns:
+        text = pattern.sub(repl, text)
+    return text, count
+
+
+def _shift_link_target(target: str, old_year: int, old_month: int) -> tuple[str, int]:
+    """외부 링크 경로 (URL 인코딩될 수 있음) - 폴더/파일 이름마다 연/월을 다음 달로"""
+    parts = re.split(r'([/\\])', unquote(target))
+    total = 0
+    for i, part in enumerate(parts):
+        if part in ("/", "\\"):
+            continue
+        parts[i], count = shift_month_text(part, old_year, old_month, _PATH_PATTERNS)
+        total += count
+    if not total:
+        return target, 0
+    new_target = "".join(parts)
+    if "%" in target:
+        new_target = quote(new_target, safe="/\\:.-_~!$&'()*+,;=@")
+    return new_target, total
+
+
+def patch_month_in_workbook(path: str, old_year: int, old_month: int) -> int:
+    """
+    .xlsx/.xlsm 안의 old_year년 old_month월 문자열을 다음 달로 (Excel/openpyxl로 열지 않고 zip 안의 XML만 수정)
+    - 대상: 공유 문자열(sharedStrings.xml), 시트의 인라인 문자열, 외부 링크 대상 파일 경로
+    - 수식, 숫자/날짜 셀은 건드리지 않음
+    - 나머지 항목은 압축 방식 그대로 스트림 복사, 바꿀 곳이 없으면 파일을 다시 쓰지 않음
+    Returns: 바꾼 개수
+    """
+    temp_path = path + ".tmp"
+    total = 0
+    try:
+        with zipfile.ZipFile(path) as zin:
+            patched: dict[str, bytes] = {}
+            for info in zin.infolist():
+                if _TEXT_PART_RE.match(info.filename):
+                    regex, shift = _XML_TEXT_RE, shift_month_text
+                elif _LINK_PART_RE.match(info.filename):
+                    regex, shift = _REL_TARGET_RE, _shift_link_target
+                else:
+                    continue
+                try:
+                    xml = zin.read(info).decode("utf-8")
+                except UnicodeDecodeError:
+                    continue  # UTF-8이 아닌 파트는 건너뜀 (Excel은 항상 UTF-8로 저장)
+                count = 0
+
+                def repl(m):
+                    nonlocal count
+                    new_text, n = shift(m.group(2), old_year, old_month)
+                    count += n
+                    return m.group(1) + new_text + m.group(3)
+
+                new_xml = regex.sub(repl, xml)
+                if count:
+                    patched[info.filename] = new_xml.encode("utf-8")
+                    total += count
+            if not patched:
+                return 0
+
+            with zipfile.ZipFile(temp_path, "w") as zout:
+                for info in zin.infolist():
+                    out_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    out_info.compress_type = info.compress_type
+                    out_info.external_attr = info.external_attr
+                    if info.filename in patched:
+                        zout.writestr(out_info, patched[info.filename])
+                    else:
+                        with zin.open(info) as src, zout.open(out_info, "w") as dst:
+                            shutil.copyfileobj(src, dst, 1024 * 1024)
+        # 원본 zip을 닫은 뒤에 교체 (Windows는 열린 파일을 바꿀 수 없음)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return total
+
+
+def patch_next_month_copy(original_path: str, copy_path: str) -> int:
+    """원본 파일명의 연/월 기준으로 사본 내용의 연/월을 다음 달로 (patch_month_in_workbook). 바꾼 개수 반환."""
     info = extract_year_month_from_filename(original_path)
     if not info:
-        raise ValueError("파일명에서 'YY년MM월' / 'YYYY년MM월' / 'YY.MM' / 'YYYY.MM' 패턴을 찾지 못함.")
+        return 0
+    return patch_month_in_workbook(copy_path, info[0], info[1])
 
-    old_year, old_month, pattern, matched_text = info
-    new_year, new_month = get_next_year_month(old_year, old_month)
 
-    dir_name = os.path.dirname(original_path)
-    base_name = os.path.basename(original_path)
-    name, ext = os.path.splitext(base_name)
+# -------------------- 메인 로직: 파일명만 변경 (내용 변경 없음) -------------------- #
+
+def next_month_name(name: str) -> str | None:
+    """
+    문자열(확장자 없는 파일명 또는 폴더 이름)의 연/월을 다음 달로 바꿔서 반환, 패턴이 없으면 None.
+    원본의 연도 자릿수, 월 자릿수, '년' 뒤 공백을 그대로 유지.
+    """
+    match = scan_year_month(name)
+    if match is None:
+        return None
+
+    pattern, matched_text = match.pattern, match.text
+    new_year, new_month = get_next_year_month(match.year, match.month)
 
     # 원본 매칭 문자열에서 공백 패턴 추출
     # 예: "25년11월" -> 공백 없음, "25년 11월" -> "년" 뒤에 공백 있음
@@ -182,11 +578,10 @@ def make_next_month_copy(original_path: str, excel_app=None) -> tuple[str, int]:
             if space_match:
                 space_after_year = space_match.group(1)
     
-    # 새 파일 이름 (원본 확장자 유지, 단 .xls는 .xlsx로 변환)
-    def repl_func(m):
-        year_str = m.group("year")
-        month_str = m.group("month")
-        
+    def replacement() -> str:
+        year_str = match.year_text
+        month_str = match.month_text
+
         # 원본 연도 형식 유지
         if len(year_str) == 4:
             year_new_str = f"{new_year}"
@@ -207,37 +602,1167 @@ def make_next_month_copy(original_path: str, excel_app=None) -> tuple[str, int]:
         else:
             return f"{year_new_str}{month_new_str}"
 
-    new_name = re.sub(pattern, repl_func, name, count=1)
-    ext_lower = ext.lower()
-    
+    return name[:match.start] + replacement() + name[match.end:]
+
+
+def next_month_filename(filename: str) -> str:
+    """다음 달 사본 파일 이름 (원본 확장자 유지, 단 .xls는 .xlsx로 변환). 패턴이 없으면 ValueError."""
+    name, ext = os.path.splitext(os.path.basename(filename))
+    new_name = next_month_name(name)
+    if new_name is None:
+        raise ValueError("파일명에서 'YY년MM월' / 'YYYY년MM월' / 'YY.MM' / 'YYYY.MM' 패턴을 찾지 못함.")
+
     # 확장자 결정: .xls는 .xlsx로, 나머지는 원본 확장자 유지
-    if ext_lower == ".xls":
+    if ext.lower() == ".xls":
         new_ext = ".xlsx"
     else:
         new_ext = ext  # .xlsx 또는 .xlsm 유지
-    
-    new_filename = new_name + new_ext
-    dest_path = os.path.join(dir_name, new_filename)
-    dest_path = make_unique_path(dest_path)
+    return new_name + new_ext
+
+
+def next_month_dest_path(original_path: str, planner: Optional[DestinationPlanner] = None) -> str:
+    """
+    파일명의 연/월을 다음 달로 바꾼 사본 경로 (같은 폴더, 겹치면 _copyN)
+    planner: 병렬 처리 전에 여러 목적지를 한 번에 정할 때 (폴더 목록을 한 번만 읽고 메모리에서 충돌 해결)
+    """
+    dest_path = os.path.join(os.path.dirname(original_path), next_month_filename(original_path))
+    return planner.reserve(dest_path) if planner is not None else make_unique_path(dest_path)
+
+
+def make_next_month_copy(
+    original_path: str,
+    excel_app=None,
+    dest_path: Optional[str] = None,
+    engine: str = XLS_ENGINE,
+    patch_contents: bool = PATCH_MONTH_CONTENTS,
+) -> tuple[str, int]:
+    """
+    - 파일명에서 연/월 추출 ('YY년MM월', 'YYYY년MM월', 'YY.MM', 'YYYY.MM' 형식 지원)
+    - 다음달 연/월로 바뀐 이름을 만들고 (확장자는 .xlsx로 통일)
+    - 원본이 .xls면: .xlsx로 변환 후 새 이름으로 저장 (engine: convert_xls_to_xlsx 참고)
+    - 원본이 .xlsx/.xlsm이면: 파일을 새 이름(.xlsx/.xlsm)으로 복사
+    - ⚠️ 기본은 엑셀 파일 안의 내용(셀 값, 날짜 등)은 전혀 수정하지 않음
+    - patch_contents=True면 사본 안의 지난달 연/월 문자열과 외부 링크 경로를 다음 달로 (patch_month_in_workbook)
+    - excel_app: Excel COM 객체 (재사용 시 제공, None이면 필요시 새로 생성)
+    - dest_path: 미리 정한 목적지 (None이면 next_month_dest_path로 계산)
+    → (최종 사본 경로, 변경된 문자열 개수) 반환
+    """
+    if dest_path is None:
+        dest_path = next_month_dest_path(original_path)
+    ext_lower = os.path.splitext(original_path)[1].lower()
 
     if ext_lower == ".xls":
-        # xls → xlsx 변환 (Excel 객체 재사용)
-        final_path = convert_xls_to_xlsx_with_excel(original_path, dest_path, excel_app)
+        # xls → xlsx 변환 (Excel을 쓸 때는 객체 재사용)
+        final_path = convert_xls_to_xlsx(original_path, dest_path, excel_app, engine)
     elif ext_lower in [".xlsx", ".xlsm"]:
-        # 파일 복사 최적화: 메타데이터가 중요하지 않으므로 copy 사용 (copy2보다 빠름)
-        shutil.copy(original_path, dest_path)
+        # 메타데이터는 복사하지 않음, 그새 같은 이름이 생겼으면 덮어쓰지 않고 FileExistsError
+        copy_new_file(original_path, dest_path)
         final_path = dest_path
     else:
         raise ValueError(".xls / .xlsx / .xlsm 파일만 지원.")
 
-    # 내용은 안 바꾸니까 항상 0
-    changed_count = 0
+    # 내용을 안 바꾸면 항상 0
+    changed_count = patch_next_month_copy(original_path, final_path) if patch_contents else 0
 
     return final_path, changed_count
 
 
+# -------------------- 미리 띄워 둔 Excel (드롭할 때마다 Excel 시작 시간 절약) -------------------- #
+
+EXCEL_IDLE_SECONDS = float(os.environ.get("EXCEL_IDLE_SECONDS", "600"))  # 이 시간 동안 안 쓰면 종료 (다음 작업 때 다시 띄움)
+EXCEL_MAX_USES = int(os.environ.get("EXCEL_MAX_USES", "200"))            # 이만큼 작업하면 새 인스턴스로 교체 (메모리 누수 방지)
+EXCEL_JOB_TIMEOUT = float(os.environ.get("EXCEL_JOB_TIMEOUT", "300"))    # 변환 하나가 이보다 오래 걸리면 멈춘 것으로 봄
+EXCEL_PING_TIMEOUT = 10.0                                                # 빌려 쓰기 전 상태 확인 응답 대기
+
+
+def _excel_pid(excel) -> Optional[int]:
+    """Excel 창 핸들로 프로세스 ID 찾기 (강제 종료용, 못 찾으면 None)"""
+    try:
+        import win32process
+        return win32process.GetWindowThreadProcessId(excel.Hwnd)[1]
+    except Exception:
+        return None
+
+
+class WarmExcel:
+    """
+    숨김 Excel 하나를 전담 스레드에 띄워 두고 드롭 사이에도 재사용
+    - COM 개체는 만든 스레드에서만 쓰므로 변환은 call()로 전담 스레드에 넘겨서 실행
+    - start()로 창이 열릴 때 미리 생성, idle_seconds 동안 안 쓰거나 max_uses번 변환하면 종료하고 다음 작업 때 새로 생성
+      (미리 생성과 상태 확인은 사용 횟수에 넣지 않음)
+    - 작업 전에 Workbooks.Count로 상태 확인, 응답이 없으면 종료 후 새로 생성
+    - 상태 확인이나 작업이 제한 시간을 넘기면 프로세스를 강제 종료 (막혀 있던 COM 호출이 오류로 풀림)
+    - 한 번에 한 작업자만 빌려 씀 (try_lease / release), 못 빌린 작업자는 각자 Excel 생성
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], object] = create_excel_app,
+        log: Optional[Callable[[str], None]] = None,
+        idle_seconds: float = EXCEL_IDLE_SECONDS,
+        max_uses: int = EXCEL_MAX_USES,
+        job_timeout: float = EXCEL_JOB_TIMEOUT,
+    ):
+        self.factory = factory
+        self.log = log or print
+        self.idle_seconds = idle_seconds
+        self.max_uses = max_uses
+        self.job_timeout = job_timeout
+        self._jobs: "queue.Queue[Optional[tuple[Callable, Future, bool]]]" = queue.Queue()   # (fn, 결과, 사용 횟수에 넣을지)
+        self._lease = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._excel = None
+        self._pid: Optional[int] = None
+        self._uses = 0
+
+    def start(self):
+        """전담 스레드 시작 + Excel 미리 생성 (기다리지 않음, 이미 떠 있으면 아무것도 안 함)"""
+        if self._start_thread() or self._excel is None:
+            self._jobs.put((lambda excel: None, Future(), False))
+
+    def _start_thread(self) -> bool:
+        """전담 스레드가 없으면 시작하고 True"""
+        if self._thread is not None:
+            return False
+        self._thread = threading.Thread(target=self._loop, name="warm-excel", daemon=True)
+        self._thread.start()
+        return True
+
+    def close(self, wait: float = 10.0):
+        """Excel 종료 후 전담 스레드 끝냄 (변환 중이면 wait초까지만 기다림)"""
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join(timeout=wait)
+            self._thread = None
+
+    def try_lease(self) -> bool:
+        return self._lease.acquire(blocking=False)
+
+    def release(self):
+        self._lease.release()
+
+    def call(self, fn: Callable[[object], object], timeout: Optional[float] = None, count: bool = True):
+        """
+        전담 스레드에서 fn(excel) 실행하고 결과 반환 (예외는 그대로 다시 발생)
+        count: 사용 횟수(max_uses)에 넣을지 (상태 확인 등은 False)
+        """
+        self._start_thread()
+        timeout = self.job_timeout if timeout is None else timeout
+        future: Future = Future()
+        self._jobs.put((fn, future, count))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            self._kill()
+            raise TimeoutError(f"Excel이 {timeout:g}초 동안 응답 없음 - 강제 종료함")
+
+    def check(self) -> bool:
+        """상태 확인 (응답이 없으면 강제 종료, 다음 작업 때 새로 생성)"""
+        try:
+            self.call(lambda excel: excel.Workbooks.Count, timeout=EXCEL_PING_TIMEOUT, count=False)
+            return True
+        except Exception as e:
+            self.log(f"  ⚠️ 미리 띄워 둔 Excel 상태 확인 실패: {e}")
+            return False
+
+    def _loop(self):
+        com_initialized = False
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()
+            com_initialized = True
+        except ImportError:
+            pass  # pywin32가 없는 환경 (fake_com 등)
+        try:
+            while True:
+                try:
+                    item = self._jobs.get(timeout=self.idle_seconds if self._excel is not None else None)
+                except queue.Empty:
+                    self._retire(f"{self.idle_seconds:g}초 동안 사용 안 함")
+                    continue
+                if item is None:
+                    break
+                fn, future, count = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(fn(self._ensure()))
+                except BaseException as e:
+                    future.set_exception(e)
+                    if self._excel is not None and not ExcelConversionPool._excel_alive(self._excel):
+                        self._retire("응답 없음")
+                if count:
+                    self._uses += 1
+                if self._excel is not None and self._uses >= self.max_uses:
+                    self._retire(f"{self._uses}회 사용")
+        finally:
+            self._retire()
+            if com_initialized:
+                try:
+                    pythoncom.CoUninitialize()
+                except Exception:
+                    pass
+
+    def _ensure(self):
+        """살아 있는 Excel 반환 (없거나 죽었으면 새로 생성, 전담 스레드에서만 호출)"""
+        if self._excel is not None and not ExcelConversionPool._excel_alive(self._excel):
+            self._retire("응답 없음")
+        if self._excel is None:
+            started = time.perf_counter()
+            self._excel = self.factory()
+            self._pid = _excel_pid(self._excel)
+            self._uses = 0
+            self.log(f"  Excel 미리 띄워 둠 ({time.perf_counter() - started:.1f}초)")
+        return self._excel
+
+    def _retire(self, reason: str = ""):
+        if self._excel is None:
+            return
+        excel, self._excel, self._pid = self._excel, None, None
+        try:
+            excel.Quit()
+        except Exception:
+            pass
+        if reason:
+            self.log(f"  미리 띄워 둔 Excel 종료 ({reason})")
+
+    def _kill(self):
+        """멈춘 Excel 프로세스 강제 종료 (Windows에서 os.kill은 TerminateProcess)"""
+        pid = self._pid
+        if pid:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                self.log(f"  ⚠️ 멈춘 Excel 프로세스 강제 종료 (PID {pid})")
+            except OSError:
+                pass
+
+
+# -------------------- 병렬 처리: Excel 인스턴스 풀 -------------------- #
+
+# 동시에 띄울 Excel 인스턴스 수 (인스턴스당 메모리 100MB 이상, 디스크가 병목이 되면 더 늘려도 소용없음)
+EXCEL_POOL_SIZE = max(1, int(os.environ.get("EXCEL_POOL_SIZE", min(4, os.cpu_count() or 1))))
+
+
+@dataclass
+class CopyResult:
+    """파일 하나의 처리 결과"""
+    source: str
+    dest: str = ""
+    error: str = ""
+    worker: int = 0
+    seconds: float = 0.0
+    changed: int = 0       # 사본 안에서 다음 달로 바꾼 연/월 문자열 수
+    cached: bool = False   # 변환하지 않고 변환 캐시에서 복사함
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+class ExcelConversionPool:
+    """
+    다음달 사본 만들기를 여러 스레드로 나눠 처리
+    - engine이 com이 아니면 .xls는 먼저 프로세스 풀에서 Excel 없이 변환 (xls_convert.convert_many),
+      auto일 때 거기서 실패한 파일만 아래 Excel 작업자에게 넘김
+    - 작업자 스레드마다 CoInitialize + 전용 Excel(DispatchEx) 하나, 공유 큐에서 파일을 하나씩 꺼냄
+    - Excel은 작업자가 처음 .xls를 꺼냈을 때 생성 (.xlsx/.xlsm 복사만 하면 Excel을 띄우지 않음)
+      warm_excel이 있으면 처음 .xls를 꺼낸 작업자 하나는 새로 만들지 않고 미리 띄워 둔 Excel을 빌려 씀
+    - excel_slots가 있으면 Excel을 쓰는 작업자와 Excel 없이 변환하는 프로세스가 거기서 자리를 받아서 씀
+      (동시에 도는 여러 풀이 합쳐서 EXCEL_POOL_SIZE를 넘지 않도록)
+    - 목적지 경로는 시작 전에 DestinationPlanner로 한 번에 정함 (병렬로 정하면 같은 이름이 나올 수 있음)
+      사본은 덮어쓰지 않게 만들어서 그새 같은 이름이 생겼으면 그 파일만 실패로 처리
+    - 실패하면 반쯤 쓰인 사본을 지우고, Excel이 응답하지 않으면 종료 후 다음 파일에서 새로 생성
+    """
+
+    def __init__(
+        self,
+        size: int = EXCEL_POOL_SIZE,
+        log: Optional[Callable[[str], None]] = None,
+        excel_factory: Callable[[], object] = create_excel_app,
+        engine: str = XLS_ENGINE,
+        patch_contents: bool = PATCH_MONTH_CONTENTS,
+        on_result: Optional[Callable[[CopyResult], None]] = None,
+        warm_excel: Optional[WarmExcel] = None,
+        excel_slots: Optional[threading.Semaphore] = None,
+    ):
+        self.size = max(1, size)
+        self.warm_excel = warm_excel
+        self.excel_slots = excel_slots
+        self.engine = engine
+        self.patch_contents = patch_contents
+        self.log = log or print
+        self.on_result = on_result    # 파일 하나가 끝날 때마다 호출 (전체 진행 표시용)
+        self.excel_factory = excel_factory
+        self._done = 0
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        files: list[str],
+        dests: Optional[list[str]] = None,
+        planner: Optional[DestinationPlanner] = None,
+    ) -> list[CopyResult]:
+        """
+        files를 처리하고 같은 순서의 CopyResult 목록 반환
+        dests: 미리 정한 목적지 (폴더 통째로 넘기기 등, None이면 원본 옆에 다음 달 이름으로)
+        planner: 동시에 도는 다른 작업과 같이 쓸 DestinationPlanner (None이면 이번 실행 전용)
+        """
+        results = [CopyResult(source=path) for path in files]
+        jobs: "queue.Queue[int]" = queue.Queue()
+        planner = planner or DestinationPlanner()
+        for i, path in enumerate(files):
+            try:
+                results[i].dest = dests[i] if dests else next_month_dest_path(path, planner)
+                jobs.put(i)
+            except Exception as e:
+                results[i].error = str(e)
+
+        self._done = 0
+        self._total = len(files)
+        for result in results:
+            if not result.ok:
+                self._report(result)
+
+        jobs = self._copy_cached(results, jobs)
+        if self.engine != "com":
+            jobs = self._convert_native(results, jobs)
+
+        xls_count = sum(
+            1 for i in list(jobs.queue)
+            if os.path.splitext(results[i].source)[1].lower() == ".xls"
+        )
+        # .xls가 없으면 복사뿐이라 스레드 하나로 충분
+        worker_count = min(self.size, max(1, xls_count), max(1, jobs.qsize()))
+        if jobs.qsize() > 0:
+            self.log(f"작업자 {worker_count}개로 처리 (.xls {xls_count}개)")
+        threads = [
+            threading.Thread(target=self._worker, args=(n, jobs, results), daemon=True)
+            for n in range(1, worker_count + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _copy_cached(self, results: list[CopyResult], jobs: "queue.Queue[int]") -> "queue.Queue[int]":
+        """변환 캐시에 있는 .xls는 복사로 끝내고, 나머지 큐 반환 (Excel을 띄우거나 프로세스 풀을 돌리기 전에)"""
+        remaining: "queue.Queue[int]" = queue.Queue()
+        while not jobs.empty():
+            i = jobs.get_nowait()
+            result = results[i]
+            if os.path.splitext(result.source)[1].lower() != ".xls":
+                remaining.put(i)
+                continue
+            started = time.perf_counter()
+            dest_existed = os.path.exists(result.dest)
+            try:
+                if not load_cached_conversion(result.source, result.dest, self.engine):
+                    remaining.put(i)
+                    continue
+            except FileExistsError as e:
+                result.error = str(e)   # 그새 다른 작업이 만든 파일 (지우지 않음)
+                self._report(result)
+                continue
+            result.cached = True
+            if self.patch_contents:
+                try:
+                    result.changed = patch_next_month_copy(result.source, result.dest)
+                except Exception as e:
+                    result.error = f"연/월 바꾸기 실패: {e}"
+                    if not dest_existed:
+                        self._remove_partial(result.dest)
+            result.seconds = time.perf_counter() - started
+            self._report(result)
+        return remaining
+
+    def _convert_native(self, results: list[CopyResult], jobs: "queue.Queue[int]") -> "queue.Queue[int]":
+        """큐에 있는 .xls를 Excel 없이 변환하고, 나머지(.xlsx 복사 + Excel로 넘길 .xls) 큐 반환"""
+        remaining: "queue.Queue[int]" = queue.Queue()
+        xls_indices = []
+        while not jobs.empty():
+            i = jobs.get_nowait()
+            if os.path.splitext(results[i].source)[1].lower() == ".xls":
+                xls_indices.append(i)
+            else:
+                remaining.put(i)
+        if not xls_indices:
+            return remaining
+
+        self.log(f"Excel 없이 .xls {len(xls_indices)}개 변환 중...")
+
+        def on_done(k: int, dest: str, error: str):
+            result = results[xls_indices[k]]
+            if not error:
+                result.dest = dest
+                store_conversion(result.source, dest, "native")
+                if self.patch_contents:
+                    try:
+                        result.changed = patch_next_month_copy(result.source, dest)
+                    except Exception as e:
+                        result.error = f"연/월 바꾸기 실패: {e}"
+                        self._remove_partial(dest)
+                self._report(result)
+            elif self.engine == "auto" and not error.startswith("FileExistsError:"):
+                # 그새 같은 이름이 생긴 경우는 Excel로 다시 해도 같으므로 바로 실패 처리
+                reason = error.split(":", 1)[1] if error.startswith("unsupported:") else error
+                self.log(f"  {os.path.basename(result.source)}: {reason} → Excel로 변환")
+                remaining.put(xls_indices[k])
+            else:
+                result.error = error
+                self._report(result)
+
+        pairs = [(results[i].source, results[i].dest) for i in xls_indices]
+        workers = self._acquire_slots(min(self.size, len(pairs)))
+        try:
+            xls_convert.convert_many(pairs, workers=workers, on_done=on_done)
+        finally:
+            self._release_slots(workers)
+        return remaining
+
+    def _acquire_slots(self, wanted: int) -> int:
+        """excel_slots에서 wanted개까지 자리를 받음 (최소 1개는 기다림), 받은 수 반환"""
+        if self.excel_slots is None:
+            return wanted
+        self.excel_slots.acquire()
+        got = 1
+        while got < wanted and self.excel_slots.acquire(blocking=False):
+            got += 1
+        return got
+
+    def _release_slots(self, count: int):
+        if self.excel_slots is not None:
+            for _ in range(count):
+                self.excel_slots.release()
+
+    def _report(self, result: CopyResult):
+        with self._lock:
+            self._done += 1
+            prefix = f"[{self._done}/{self._total}]"
+        name = os.path.basename(result.source)
+        if result.ok:
+            if result.cached:
+                how = "변환 캐시에서 복사"
+            elif result.worker:
+                how = f"작업자 {result.worker}, {result.seconds:.1f}초"
+            else:
+                how = "Excel 없이 변환"
+            if result.changed:
+                how += f", 연/월 {result.changed}곳 수정"
+            self.log(f"{prefix} ✅ {name} → {os.path.basename(result.dest)} ({how})")
+        else:
+            self.log(f"{prefix} ❌ {name}: {result.error}")
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def _worker(self, worker_no: int, jobs: "queue.Queue[int]", results: list[CopyResult]):
+        com_initialized = False
+        excel = None
+        warm = None    # 빌린 WarmExcel (있으면 .xls는 그쪽 전담 스레드에서 변환)
+        slot = False   # excel_slots에서 받은 자리 (Excel을 쓰는 동안만)
+        try:
+            try:
+                import pythoncom
+                pythoncom.CoInitialize()
+                com_initialized = True
+            except ImportError:
+                pass  # pywin32가 없는 환경 (fake_com 등)
+
+            while True:
+                try:
+                    i = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                result = results[i]
+                result.worker = worker_no
+                started = time.perf_counter()
+                is_xls = os.path.splitext(result.source)[1].lower() == ".xls"
+                dest_existed = os.path.exists(result.dest)
+                try:
+                    if is_xls and excel is None and warm is None:
+                        if not slot:
+                            slot = self._acquire_slots(1) > 0
+                        if self.warm_excel is not None and self.warm_excel.try_lease():
+                            warm = self.warm_excel
+                            warm.check()  # 멈춰 있으면 강제 종료 → 아래 call에서 새로 생성
+                            self.log(f"  작업자 {worker_no}: 미리 띄워 둔 Excel 사용")
+                        else:
+                            excel = self.excel_factory()
+                            self.log(f"  작업자 {worker_no}: Excel 인스턴스 생성")
+
+                    # Excel 없이 변환할 수 있는 .xls는 이미 처리됐으므로 여기서는 항상 Excel 사용
+                    def copy(app, result=result, is_xls=is_xls):
+                        return make_next_month_copy(
+                            result.source, app if is_xls else None, result.dest, engine="com",
+                            patch_contents=self.patch_contents,
+                        )
+
+                    if is_xls and warm is not None:
+                        result.dest, result.changed = warm.call(copy)
+                    else:
+                        result.dest, result.changed = copy(excel)
+                except Exception as e:
+                    result.error = str(e)
+                    # FileExistsError면 그새 다른 작업이 만든 파일이므로 지우지 않음
+                    if not dest_existed and not isinstance(e, FileExistsError):
+                        self._remove_partial(result.dest)
+                    if is_xls and excel is not None and not self._excel_alive(excel):
+                        self.log(f"  ⚠️ 작업자 {worker_no}: Excel 응답 없음 - 다음 파일에서 새로 생성")
+                        self._quit_excel(excel)
+                        excel = None
+                        self._release_slots(1)
+                        slot = False
+                result.seconds = time.perf_counter() - started
+                self._report(result)
+        finally:
+            if excel is not None:
+                self._quit_excel(excel)
+            if warm is not None:
+                warm.release()    # 종료하지 않고 다음 드롭을 위해 남겨 둠
+            if slot:
+                self._release_slots(1)
+            if com_initialized:
+                try:
+                    pythoncom.CoUninitialize()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _excel_alive(excel) -> bool:
+        try:
+            excel.Workbooks.Count
+            return True
+        except Exception:
+            return False
+
+    def _quit_excel(self, excel):
+        try:
+            excel.Quit()
+        except Exception as e:
+            self.log(f"⚠️ Excel 객체 종료 중 오류: {e}")
+
+    @staticmethod
+    def _remove_partial(path: str):
+        """실패한 작업이 남긴 사본 삭제 (작업 시작 전에 없던 경로일 때만 호출)"""
+        if path and os.path.isfile(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# -------------------- 폴더 통째로 다음 달로 (폴더 트리 복사) -------------------- #
+
+EXCEL_EXTENSIONS = (".xlsx", ".xls", ".xlsm")
+# 파일 복사 스레드 수 (복사는 대부분 디스크/네트워크 대기라 CPU 수보다 많아도 됨)
+COPY_WORKERS = 8
+
+
+@dataclass
+class RolloverItem:
+    source: str
+    dest: str = ""
+    action: str = "copy"   # copy: 그대로 복사, convert: .xls → .xlsx 변환, skip: 건너뜀
+    reason: str = ""       # 건너뛴 이유
+
+
+@dataclass
+class RolloverPlan:
+    root: str
+    dest_root: str
+    items: list[RolloverItem]
+
+    def count(self, action: str) -> int:
+        return sum(1 for item in self.items if item.action == action)
+
+    def summary(self, limit: int = 30) -> list[str]:
+        """미리보기용 로그 줄 (dry-run 출력, GUI 로그 공용)"""
+        lines = [
+            f"폴더: {self.root}",
+            f"  → {self.dest_root}",
+            f"복사 {self.count('copy')}개 / 변환 {self.count('convert')}개 / 건너뜀 {self.count('skip')}개",
+        ]
+        labels = {"copy": "복사", "convert": "변환", "skip": "건너뜀"}
+        for item in self.items[:limit]:
+            src = os.path.relpath(item.source, self.root)
+            if item.action == "skip":
+                lines.append(f"  [{labels[item.action]}] {src} ({item.reason})")
+            else:
+                lines.append(f"  [{labels[item.action]}] {src} → {os.path.relpath(item.dest, self.dest_root)}")
+        if len(self.items) > limit:
+            lines.append(f"  ... 외 {len(self.items) - limit}개")
+        return lines
+
+
+def default_rollover_dest(root: str) -> str:
+    """'25년11월' 같은 폴더는 같은 위치의 '25년12월' 폴더로 (폴더 이름에 연/월이 없으면 ValueError)."""
+    parent, name = os.path.split(os.path.normpath(root))
+    new_name = next_month_name(name)
+    if new_name is None:
+        raise ValueError(f"폴더 이름에 연/월이 없어 대상 폴더를 정할 수 없음 (대상 폴더를 지정해 주세요): {name}")
+    return os.path.join(parent, new_name)
+
+
+def plan_folder_rollover(
+    root: str, dest_root: Optional[str] = None, planner: Optional[DestinationPlanner] = None
+) -> RolloverPlan:
+    """
+    폴더 트리를 훑어서 다음 달 사본 계획을 한 번에 만듦 (파일은 건드리지 않음)
+    - 하위 폴더 구조는 dest_root 아래에 그대로 (폴더 이름의 연/월도 다음 달로)
+    - 대상에 이미 같은 이름이 있으면 건너뜀 (다시 실행해도 중복 사본이 생기지 않음)
+    - 계획 안에서 이름이 겹치면 (a.xls와 a.xlsx 등) _copyN
+    - planner: 동시에 도는 다른 작업과 같이 쓸 DestinationPlanner (None이면 이번 계획 전용)
+    """
+    root = normalize_path(root)
+    dest_root = normalize_path(dest_root) if dest_root else default_rollover_dest(root)
+    if os.path.normcase(dest_root) == os.path.normcase(root):
+        raise ValueError("원본 폴더와 대상 폴더가 같음")
+
+    items: list[RolloverItem] = []
+    planner = planner or DestinationPlanner()
+    for dirpath, dirnames, filenames in os.walk(root):
+        # 대상 폴더가 원본 안에 있으면 다시 훑지 않음
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if os.path.normcase(os.path.join(dirpath, d)) != os.path.normcase(dest_root)
+        )
+        rel_dir = os.path.relpath(dirpath, root)
+        parts = [] if rel_dir == "." else rel_dir.split(os.sep)
+        dest_dir = os.path.join(dest_root, *[next_month_name(p) or p for p in parts])
+
+        for name in sorted(filenames):
+            if name.startswith("~$") or os.path.splitext(name)[1].lower() not in EXCEL_EXTENSIONS:
+                continue  # 엑셀 파일만 (열려 있는 파일의 잠금 파일 ~$ 제외)
+            source = os.path.join(dirpath, name)
+            try:
+                dest = os.path.join(dest_dir, next_month_filename(name))
+            except ValueError:
+                items.append(RolloverItem(source, action="skip", reason="파일명에 연/월 없음"))
+                continue
+            if planner.exists(dest):
+                items.append(RolloverItem(source, dest, action="skip", reason="이미 있음"))
+                continue
+            dest = planner.reserve(dest)
+            action = "convert" if name.lower().endswith(".xls") else "copy"
+            items.append(RolloverItem(source, dest, action=action))
+    return RolloverPlan(root, dest_root, items)
+
+
+def _copy_file(source: str, dest: str, patch_contents: bool = False) -> int:
+    """
+    파일 하나 복사 (shutil.copyfile은 Linux에서 sendfile, macOS에서 fcopyfile로 커널 안에서 복사)
+    patch_contents면 사본 안의 연/월도 다음 달로 - 바꾼 개수 반환
+    dest가 이미 있으면 덮어쓰지 않고 FileExistsError, 연/월 바꾸기가 실패하면 만든 사본 삭제
+    """
+    copy_new_file(source, dest)
+    try:
+        return patch_next_month_copy(source, dest) if patch_contents else 0
+    except Exception:
+        if os.path.isfile(dest):
+            try:
+                os.remove(dest)
+            except OSError:
+                pass
+        raise
+
+
+def run_folder_rollover(
+    plan: RolloverPlan,
+    log: Optional[Callable[[str], None]] = None,
+    copy_workers: int = COPY_WORKERS,
+    pool_size: int = EXCEL_POOL_SIZE,
+    patch_contents: bool = PATCH_MONTH_CONTENTS,
+    on_result: Optional[Callable[[CopyResult], None]] = None,
+    warm_excel: Optional[WarmExcel] = None,
+    excel_slots: Optional[threading.Semaphore] = None,
+) -> list[CopyResult]:
+    """
+    계획대로 실행: .xlsx/.xlsm은 스레드 풀로 복사, .xls는 ExcelConversionPool로 변환
+    on_result: 파일 하나가 끝날 때마다 호출
+    warm_excel: .xls 변환에 빌려 쓸 미리 띄워 둔 Excel
+    excel_slots: 다른 작업과 같이 쓰는 변환 자리 (ExcelConversionPool 참고)
+    Returns: 건너뛴 항목을 뺀 CopyResult 목록
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    log = log or print
+    copies = [item for item in plan.items if item.action == "copy"]
+    converts = [item for item in plan.items if item.action == "convert"]
+
+    # 폴더는 먼저 한 번에 만듦 (작업자끼리 makedirs 경합 방지)
+    for dest_dir in sorted({os.path.dirname(item.dest) for item in copies + converts}):
+        os.makedirs(dest_dir, exist_ok=True)
+
+    results: list[CopyResult] = []
+    if copies:
+        log(f"복사 {len(copies)}개 (스레드 {min(copy_workers, len(copies))}개)")
+        with ThreadPoolExecutor(max_workers=max(1, copy_workers)) as pool:
+            futures = {}
+            for item in copies:
+                future = pool.submit(_copy_file, item.source, item.dest, patch_contents)
+                futures[future] = (item, time.perf_counter())
+            for done, future in enumerate(as_completed(futures), 1):
+                item, started = futures[future]
+                result = CopyResult(item.source, item.dest, seconds=time.perf_counter() - started)
+                try:
+                    result.changed = future.result()
+                    changed = f" (연/월 {result.changed}곳 수정)" if result.changed else ""
+                    log(f"[{done}/{len(copies)}] ✅ {os.path.relpath(item.dest, plan.dest_root)}{changed}")
+                except Exception as e:
+                    result.error = str(e)
+                    log(f"[{done}/{len(copies)}] ❌ {os.path.relpath(item.source, plan.root)}: {e}")
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+
+    if converts:
+        log(f"변환 {len(converts)}개")
+        pool = ExcelConversionPool(size=pool_size, log=log, patch_contents=patch_contents,
+                                   on_result=on_result, warm_excel=warm_excel, excel_slots=excel_slots)
+        results.extend(pool.run([item.source for item in converts], [item.dest for item in converts]))
+    return results
+
+
+# -------------------- 폴더 감시 (이번 달 파일이 생기면 자동으로 다음달 사본) -------------------- #
+
+# 감시 설정 파일 (없으면 --watch 뒤에 적은 폴더만 감시)
+# 예: {"folders": ["D:/정산"], "recursive": true, "debounce_seconds": 5, "poll_interval": 10, "patch_contents": false,
+#      "process_existing": false}
+WATCH_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "watch_config.json")
+# 이미 처리한 파일 목록 (다시 시작해도 같은 파일을 두 번 처리하지 않음)
+WATCH_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "watch_index.json")
+
+
+@dataclass
+class WatchConfig:
+    folders: list[str] = field(default_factory=list)
+    recursive: bool = True              # 하위 폴더까지 감시
+    debounce_seconds: float = 5.0       # 마지막 변경 후 이만큼 조용해야 처리 (저장/복사 중인 파일 방지)
+    poll_interval: float = 10.0         # watchdog이 없을 때 폴더를 다시 훑는 간격
+    patch_contents: bool = PATCH_MONTH_CONTENTS
+    process_existing: bool = False      # 시작할 때 이미 있던 이번 달 파일도 처리 (기본: 시작 후 생긴 파일만)
+
+
+def load_watch_config() -> WatchConfig:
+    """watch_config.json에서 감시 설정 불러오기 (없거나 잘못되면 기본값)"""
+    if not os.path.exists(WATCH_CONFIG_FILE):
+        return WatchConfig()
+    try:
+        with open(WATCH_CONFIG_FILE, "r", encoding="utf-8") as f:
+            return WatchConfig(**json.load(f))
+    except Exception as e:
+        print(f"감시 설정 파일 로드 실패: {e}")
+        return WatchConfig()
+
+
+class ProcessedIndex:
+    """
+    처리한 원본 경로 → {사본, 처리 시각, 오류} (JSON, 스레드 안전)
+    - 만든 사본 경로도 포함으로 봄 (다음 달이 되면 사본이 '이번 달 파일'이 되어 다시 복사되는 것 방지)
+    """
+
+    def __init__(self, path: str = WATCH_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except Exception as e:
+                print(f"처리 목록 로드 실패 (새로 시작): {e}")
+        self._dests = {os.path.normcase(entry["dest"]) for entry in self._entries.values() if entry.get("dest")}
+
+    def __contains__(self, path: str) -> bool:
+        key = os.path.normcase(path)
+        with self._lock:
+            return key in self._entries or key in self._dests
+
+    def add(self, source: str, dest: str = "", error: str = ""):
+        with self._lock:
+            self._entries[os.path.normcase(source)] = {
+                "source": source, "dest": dest, "error": error,
+                "processed_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            if dest:
+                self._dests.add(os.path.normcase(dest))
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+
+
+class FolderWatcher:
+    """
+    감시 폴더에 이번 달 파일(파일명의 연/월 = 오늘 연/월)이 생기면 다음달 사본 생성
+    - watchdog이 설치되어 있으면 파일 시스템 이벤트, 없으면 poll_interval마다 폴더를 훑어서 비교
+    - 이벤트가 debounce_seconds 동안 없고 크기가 그대로인 파일만 처리 (저장 중인 파일 방지)
+    - 처리 결과는 ProcessedIndex에 남겨서 (실패 포함) 같은 파일을 다시 처리하지 않음
+    - 다음달 사본이 이미 있는 파일은 처리한 것으로 기록만 함
+    - 시작할 때 이미 있던 파일은 건드리지 않음 (process_existing이면 꺼져 있는 동안 생긴 파일도 처리)
+    """
+
+    def __init__(
+        self,
+        config: WatchConfig,
+        log: Optional[Callable[[str], None]] = None,
+        index: Optional[ProcessedIndex] = None,
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        self.config = config
+        self.folders = [normalize_path(folder) for folder in config.folders]
+        self.log = log or print
+        self.index = index or ProcessedIndex()
+        # 감시 중에는 Excel을 계속 재사용 (유휴 시간이 지나면 알아서 종료)
+        self.warm_excel = WarmExcel(log=self.log)
+        self.now = now
+        self._lock = threading.Lock()
+        # 정규화 경로 → [원본 경로, 마지막 이벤트 시각, 마지막으로 본 크기]
+        self._pending: dict[str, list] = {}
+        # 폴링용 이전 상태: 정규화 경로 → (크기, 수정시간)
+        self._seen: dict[str, tuple[int, int]] = {}
+        # 시작할 때 이미 있던 파일 (나중에 수정돼도 새 파일로 보지 않음)
+        self._existing: set[str] = set()
+
+    def is_candidate(self, path: str) -> bool:
+        name = os.path.basename(path)
+        if name.startswith("~$") or os.path.splitext(name)[1].lower() not in EXCEL_EXTENSIONS:
+            return False
+        info = extract_year_month_from_filename(name)
+        today = self.now()
+        return bool(info) and (info[0], info[1]) == (today.year, today.month) and path not in self.index
+
+    def notify(self, path: str):
+        """파일이 생기거나 바뀌었음 (watchdog 스레드 / 폴링에서 호출)"""
+        if os.path.normcase(path) in self._existing or not self.is_candidate(path):
+            return
+        with self._lock:
+            entry = self._pending.setdefault(os.path.normcase(path), [path, 0.0, -1])
+            entry[1] = time.monotonic()
+
+    def scan(self, notify: bool = True):
+        """폴더를 훑어서 새로 생기거나 바뀐 파일 알림 (폴링 / notify=False면 지금 상태만 기억)"""
+        for folder in self.folders:
+            for dirpath, dirnames, filenames in os.walk(folder):
+                if not self.config.recursive:
+                    dirnames[:] = []
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    key = os.path.normcase(path)
+                    state = (stat.st_size, stat.st_mtime_ns)
+                    if self._seen.get(key) != state:
+                        self._seen[key] = state
+                        if notify:
+                            self.notify(path)
+
+    def _take_ready(self) -> list[str]:
+        """debounce가 지났고 크기가 그대로인 파일을 대기 목록에서 꺼냄"""
+        ready = []
+        now = time.monotonic()
+        with self._lock:
+            for key, entry in list(self._pending.items()):
+                path, last_event, last_size = entry
+                if now - last_event < self.config.debounce_seconds:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    del self._pending[key]  # 그새 지워지거나 이름이 바뀜
+                    continue
+                if size != last_size:
+                    entry[1], entry[2] = now, size  # 아직 쓰는 중일 수 있으니 한 번 더 기다림
+                    continue
+                del self._pending[key]
+                ready.append(path)
+        return ready
+
+    def process_ready(self) -> list[CopyResult]:
+        files = []
+        for path in self._take_ready():
+            try:
+                dest = os.path.join(os.path.dirname(path), next_month_filename(path))
+            except ValueError:
+                continue
+            if os.path.exists(dest):
+                self.log(f"⏭ 다음달 사본이 이미 있음: {os.path.basename(dest)}")
+                self.index.add(path, dest)
+                continue
+            files.append(path)
+        if not files:
+            return []
+
+        self.log(f"{datetime.now():%H:%M:%S} 새 파일 {len(files)}개 → 다음달 사본 생성")
+        pool = ExcelConversionPool(
+            log=self.log, patch_contents=self.config.patch_contents, warm_excel=self.warm_excel
+        )
+        results = pool.run(files)
+        for result in results:
+            self.index.add(result.source, result.dest if result.ok else "", result.error)
+        return results
+
+    def _start_observer(self):
+        """watchdog 감시 시작 (없으면 None → 폴링)"""
+        try:
+            from watchdog.events import FileSystemEventHandler  # pip install watchdog
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.dest_path)  # 임시 이름으로 저장 후 이름 바꾸는 경우
+
+        observer = Observer()
+        for folder in self.folders:
+            observer.schedule(Handler(), folder, recursive=self.config.recursive)
+        observer.start()
+        return observer
+
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """stop_event가 설정되거나 Ctrl+C를 누를 때까지 감시"""
+        stop_event = stop_event or threading.Event()
+        missing = [folder for folder in self.folders if not os.path.isdir(folder)]
+        if missing or not self.folders:
+            raise ValueError(f"감시할 폴더가 없음: {', '.join(missing) or '(설정 없음)'}")
+
+        observer = self._start_observer()
+        mode = "watchdog 이벤트" if observer else f"{self.config.poll_interval:g}초마다 폴더 확인 (watchdog 없음)"
+        self.log(f"폴더 감시 시작 ({mode}): {', '.join(self.folders)}")
+        # 지금 있는 파일 기억 (process_existing이면 꺼져 있는 동안 생긴 파일도 처리)
+        self.scan(notify=self.config.process_existing)
+        if not self.config.process_existing:
+            self._existing = set(self._seen)
+        last_scan = time.monotonic()
+        try:
+            while not stop_event.wait(1.0):
+                if observer is None and time.monotonic() - last_scan >= self.config.poll_interval:
+                    self.scan()
+                    last_scan = time.monotonic()
+                self.process_ready()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            self.warm_excel.close()
+            self.log("폴더 감시 종료")
+
+
+# -------------------- 드롭 작업 큐 (처리 중에도 계속 드롭 가능) -------------------- #
+
+# 동시에 처리할 드롭 배치 수 (Excel 인스턴스는 모든 배치를 합쳐서 EXCEL_POOL_SIZE개까지)
+DROP_CONCURRENCY = max(1, int(os.environ.get("EXCEL_COPY_DROP_CONCURRENCY", "2")))
+# 끝나지 않은 드롭 항목 (창을 닫거나 프로그램이 죽어도 다음에 열 때 이어서 처리)
+DROP_QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "drop_queue.json")
+
+
+class DropQueue:
+    """
+    드롭한 파일/폴더를 쌓아두고 배치로 처리
+    - 같은 경로가 대기 중이거나 처리 중이면 다시 넣지 않음
+    - 대기 중인 항목을 한 배치로 묶어 handler(경로 목록, patch_contents, planner, excel_slots) 실행
+    - 배치는 최대 concurrency개까지 동시에 실행 (앞 배치가 변환 중이어도 새 드롭이 바로 시작)
+    - 동시에 도는 배치는 DestinationPlanner 하나를 같이 써서 서로 같은 사본 이름을 배정하지 않음
+      (모두 끝나고 새로 드롭하면 폴더 목록을 다시 읽도록 새로 만듦)
+    - Excel 인스턴스/변환 프로세스 수는 배치끼리 excel_slots(pool_size개) 하나를 같이 써서 제한
+    - expect / record로 전체 진행(완료/전체) 집계, 모두 끝나고 새로 드롭하면 0부터 다시 셈
+    - 끝나지 않은 항목은 state_file에 저장 (파일은 결과가 나오면, 폴더는 배치가 끝나면 빠짐),
+      resume()으로 다시 넣음 (폴더는 이미 만든 사본을 건너뛰므로 이어서 처리됨)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[str], bool, DestinationPlanner, threading.Semaphore], None],
+        concurrency: int = DROP_CONCURRENCY,
+        pool_size: int = EXCEL_POOL_SIZE,
+        state_file: Optional[str] = DROP_QUEUE_FILE,
+    ):
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.excel_slots = threading.BoundedSemaphore(max(1, pool_size))
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, bool]] = []
+        self._active: set[str] = set()    # 대기 + 처리 중인 경로 (normcase)
+        self._unfinished: dict[str, tuple[str, bool]] = {}   # normcase → (경로, patch_contents), 저장용
+        self._running = 0
+        self.planner = DestinationPlanner()
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+
+    def add(self, paths: list[str], patch_contents: bool) -> tuple[int, int]:
+        """경로를 큐에 추가하고 (추가한 수, 중복이라 뺀 수) 반환"""
+        added = duplicates = 0
+        with self._lock:
+            if self.idle_locked():
+                self.total = self.done = self.failed = 0
+                self.planner = DestinationPlanner()
+            for path in paths:
+                key = os.path.normcase(path)
+                if key in self._active:
+                    duplicates += 1
+                    continue
+                self._active.add(key)
+                self._pending.append((path, patch_contents))
+                self._unfinished[key] = (path, patch_contents)
+                added += 1
+            if added:
+                self._save_locked()
+            self._start_batches_locked()
+        return added, duplicates
+
+    def resume(self) -> int:
+        """지난번에 끝내지 못한 항목을 다시 큐에 넣고 넣은 수 반환 (창을 열 때 한 번)"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return 0
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                items = [(item["path"], bool(item["patch_contents"])) for item in json.load(f)]
+        except Exception as e:
+            print(f"드롭 작업 목록 로드 실패 (무시): {e}")
+            return 0
+        added = 0
+        for patch_contents in (False, True):
+            paths = [path for path, flag in items if flag == patch_contents]
+            if paths:
+                added += self.add(paths, patch_contents)[0]
+        return added
+
+    def idle_locked(self) -> bool:
+        return not self._pending and self._running == 0
+
+    @property
+    def idle(self) -> bool:
+        with self._lock:
+            return self.idle_locked()
+
+    def expect(self, count: int):
+        """처리할 파일 수가 정해지면 전체 수에 더함"""
+        with self._lock:
+            self.total += count
+
+    def record(self, result: CopyResult):
+        with self._lock:
+            self.done += 1
+            if not result.ok:
+                self.failed += 1
+            # 드롭한 파일이면 결과가 나왔으므로 다음에 다시 처리하지 않음 (실패도 같은 이유로 다시 실패하므로)
+            if self._unfinished.pop(os.path.normcase(result.source), None) is not None:
+                self._save_locked()
+
+    def status(self) -> str:
+        with self._lock:
+            if self.idle_locked() and not self.total:
+                return "대기 중"
+            text = f"전체 진행: {self.done}/{self.total}"
+            if self.failed:
+                text += f" (실패 {self.failed})"
+            if self._running:
+                text += f" · 처리 중 배치 {self._running}"
+            if self._pending:
+                text += f" · 대기 {len(self._pending)}개"
+            return text
+
+    def _save_locked(self):
+        """끝나지 않은 항목 저장 (없으면 파일 삭제, 실패해도 처리는 계속)"""
+        if not self.state_file:
+            return
+        try:
+            if not self._unfinished:
+                if os.path.exists(self.state_file):
+                    os.remove(self.state_file)
+                return
+            items = [{"path": path, "patch_contents": flag} for path, flag in self._unfinished.values()]
+            temp_path = f"{self.state_file}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(items, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.state_file)
+        except OSError as e:
+            print(f"드롭 작업 목록 저장 실패 (계속 진행): {e}")
+
+    def _start_batches_locked(self):
+        while self._pending and self._running < self.concurrency:
+            # 체크박스 설정이 같은 항목끼리 한 배치로
+            patch_contents = self._pending[0][1]
+            batch = [path for path, flag in self._pending if flag == patch_contents]
+            self._pending = [item for item in self._pending if item[1] != patch_contents]
+            self._running += 1
+            threading.Thread(
+                target=self._run_batch, args=(batch, patch_contents, self.planner), daemon=True
+            ).start()
+
+    def _run_batch(self, batch: list[str], patch_contents: bool, planner: DestinationPlanner):
+        try:
+            self.handler(batch, patch_contents, planner, self.excel_slots)
+        finally:
+            with self._lock:
+                self._running -= 1
+                for path in batch:
+                    key = os.path.normcase(path)
+                    self._active.discard(key)
+                    self._unfinished.pop(key, None)
+                self._save_locked()
+                self._start_batches_locked()
+
+
 # -------------------- GUI (드래그앤드롭 창) -------------------- #
 
+# 로그 창 갱신: 작업 스레드는 큐에 넣기만 하고, 창은 LOG_FLUSH_MS마다 모아서 한 번에 그림
+LOG_FLUSH_MS = 100
+LOG_BATCH_LINES = 2000                                          # 한 번에 그리는 최대 줄 수
+LOG_MAX_LINES = int(os.environ.get("EXCEL_COPY_LOG_LINES", "5000"))  # 창에 남겨둘 줄 수 (오래된 줄부터 지움)
+# 로그를 파일에도 남기려면 경로 지정 (1MB씩 최대 3개 보관)
+LOG_FILE = os.environ.get("EXCEL_COPY_LOG_FILE", "")
+
+
+class LogSink:
+    """여러 스레드에서 받은 로그 줄을 모아두는 큐 (+ 선택: 회전 로그 파일)"""
+
+    def __init__(self, log_file: str = LOG_FILE):
+        self._queue: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._file_logger = None
+        if log_file:
+            handler = RotatingFileHandler(log_file, maxBytes=1024 * 1024, backupCount=3, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._file_logger = logging.getLogger(f"excel_copy.{id(self)}")
+            self._file_logger.propagate = False
+            self._file_logger.setLevel(logging.INFO)
+            self._file_logger.addHandler(handler)
+
+    def put(self, msg: str):
+        self._queue.put(msg)
+        if self._file_logger is not None:
+            self._file_logger.info(msg)
+
+    def drain(self, limit: int = LOG_BATCH_LINES) -> list[str]:
+        """쌓인 줄을 최대 limit개 꺼냄 (없으면 빈 리스트)"""
+        lines = []
+        while len(lines) < limit:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+
 class ExcelDnDApp(TkinterDnD.Tk):
     def __init__(self):
         super().__init__()
@@ -250,13 +1775,28 @@ class ExcelDnDApp(TkinterDnD.Tk):
         # 안내 라벨
         self.label = tk.Label(
             self,
-            text="(.xlsx / .xls / .xlsm)",
+            text="(.xlsx / .xls / .xlsm / 폴더)",
             bg="#f0f0f0",
             font=("맑은 고딕", 14)
         )
         self.label.pack(fill="x", pady=(10, 5))
 
-        # 로그 영역
+        # 사본 안의 연/월 문자열도 바꿀지 (기본값: EXCEL_COPY_PATCH 환경변수)
+        self.patch_var = tk.BooleanVar(value=PATCH_MONTH_CONTENTS)
+        self.patch_check = tk.Checkbutton(
+            self,
+            text="사본 안의 지난달 연/월(셀 문자열, 외부 링크)도 다음 달로 바꾸기",
+            variable=self.patch_var,
+            bg="#f0f0f0",
+        )
+        self.patch_check.pack(anchor="w", padx=10)
+
+        # 전체 진행 (여러 번 드롭해도 합쳐서 표시)
+        self.status_label = tk.Label(self, text="대기 중", bg="#f0f0f0", anchor="w")
+        self.status_label.pack(fill="x", padx=10)
+
+        # 로그 영역 (작업 스레드 → self.log_sink 큐 → _flush_log가 모아서 표시)
+        self.log_sink = LogSink()
         self.log = tk.Text(
             self,
             height=20,
@@ -270,75 +1810,92 @@ class ExcelDnDApp(TkinterDnD.Tk):
         self.drop_target_register(DND_FILES)
         self.dnd_bind("<<Drop>>", self.on_drop)
         
-        # 처리 중 플래그 (동시 처리 방지용, 하지만 완료 후에는 다시 처리 가능)
-        # 메인 스레드에서만 수정하도록 주의
-        self._processing = False
+        # 드롭 작업 큐 (처리 중에 드롭해도 기다리지 않고 쌓아서 처리)
+        self.jobs = DropQueue(self._process_files)
+
+        # Excel을 미리 띄워 둠 (.xls를 처음 드롭할 때 Excel 시작을 기다리지 않도록)
+        # Excel 없이만 변환하는 설정이면 띄우지 않음
+        self.warm_excel = WarmExcel(log=self.append_log)
+        if XLS_ENGINE != "native":
+            self.warm_excel.start()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # 지난번에 끝내지 못한 드롭 항목 이어서 처리
+        resumed = self.jobs.resume()
+        if resumed:
+            self.append_log(f"↻ 지난번에 끝나지 않은 항목 {resumed}개를 다시 처리")
+
+        self.after(LOG_FLUSH_MS, self._flush_log)
 
     def append_log(self, msg: str):
-        """아래 텍스트 박스에 로그 추가 (스레드 안전)."""
-        self.after(0, self._append_log_sync, msg)
-    
-    def _append_log_sync(self, msg: str):
-        """로그 추가 (메인 스레드에서 실행)."""
-        self.log.configure(state="normal")
-        self.log.insert("end", msg + "\n")
-        self.log.see("end")
-        self.log.configure(state="disabled")
-        self.update()  # GUI 업데이트 강제
-    
-    def _set_processing_flag_and_log(self, value: bool, msg: str = None):
-        """처리 플래그 설정 및 로그 (메인 스레드에서 실행)."""
-        self._processing = value
-        if msg:
-            self._append_log_sync(msg)
+        """아래 텍스트 박스에 로그 추가 (스레드 안전, 실제 표시는 _flush_log가 모아서)."""
+        self.log_sink.put(msg)
+
+    def _flush_log(self):
+        """큐에 쌓인 로그를 한 번에 추가하고 오래된 줄 정리 (메인 스레드에서 주기적으로 실행)."""
+        lines = self.log_sink.drain()
+        if lines:
+            self.log.configure(state="normal")
+            self.log.insert("end", "\n".join(lines) + "\n")
+            excess = int(self.log.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+            if excess > 0:
+                self.log.delete("1.0", f"{excess + 1}.0")
+            self.log.see("end")
+            self.log.configure(state="disabled")
+        self.status_label.configure(text=self.jobs.status())
+        # 아직 남아 있으면 바로 이어서, 아니면 다음 주기에
+        self.after(1 if len(lines) >= LOG_BATCH_LINES else LOG_FLUSH_MS, self._flush_log)
+
+    def _on_close(self):
+        self.warm_excel.close()
+        self.destroy()
 
     def on_drop(self, event):
-        """드롭 이벤트 핸들러 - 백그라운드 스레드에서 처리."""
-        # 처리 중이면 무시 (동시 처리 방지)
-        if self._processing:
-            self.append_log("⚠️ 이미 처리 중입니다. 완료 후 다시 시도해주세요.")
-            return
-        
-        files = self.splitlist(event.data)
+        """드롭 이벤트 핸들러 - 작업 큐에 넣기만 함 (처리는 DropQueue가 백그라운드 스레드에서)."""
+        files = []
+        for file_path in self.splitlist(event.data):
+            file_path = file_path.strip()
+            if not file_path:
+                continue
+            # 경로 정규화 (URL 디코딩 등, 중복 확인도 정규화한 경로로)
+            try:
+                file_path = normalize_path(file_path)
+            except Exception:
+                pass  # 정규화 실패해도 원본 경로 사용
+            files.append(file_path)
         if not files:
             return
-        
-        # 플래그를 먼저 설정 (메인 스레드에서 동기적으로)
-        self._processing = True
-        
-        # 백그라운드 스레드에서 처리하여 GUI가 멈추지 않도록
-        thread = threading.Thread(target=self._process_files, args=(files,), daemon=True)
-        thread.start()
-
-    def _process_files(self, files):
-        """파일 처리 (백그라운드 스레드에서 실행)."""
-        import pythoncom
-        excel_app = None
-        com_initialized = False
-        
+
+        # Tk 변수는 메인 스레드에서 읽어서 넘김
+        was_busy = not self.jobs.idle
+        added, duplicates = self.jobs.add(files, self.patch_var.get())
+        if duplicates:
+            self.append_log(f"⏭ 이미 대기 중이거나 처리 중인 항목 {duplicates}개는 건너뜀")
+        if added and was_busy:
+            self.append_log(f"➕ {added}개 항목을 작업 큐에 추가")
+
+    def _process_files(
+        self, files, patch_contents: bool = False,
+        planner: Optional[DestinationPlanner] = None, excel_slots: Optional[threading.Semaphore] = None,
+    ):
+        """
+        드롭 배치 하나 처리 (DropQueue 스레드에서 실행, 실제 복사/변환은 ExcelConversionPool 작업자들이 함).
+        planner / excel_slots: 동시에 도는 다른 배치와 같이 쓰는 사본 이름 배정 / 변환 자리 (DropQueue가 넘김)
+        """
         try:
-            # 백그라운드 스레드에서 COM 초기화
-            pythoncom.CoInitialize()
-            com_initialized = True
-            
             self.append_log("=" * 60)
-            self.append_log("드롭 처리 시작")
+            self.append_log(f"드롭 처리 시작 ({len(files)}개 항목)")
 
-            # 파일 목록 정리 및 검증
+            # 파일 목록 정리 및 검증 (경로는 on_drop에서 정규화됨)
             valid_files = []
+            folders = []
             skipped = []
             
             for file_path in files:
-                file_path = file_path.strip()
-                if not file_path:
+                if os.path.isdir(file_path):
+                    folders.append(file_path)  # 폴더는 통째로 다음 달 폴더로
                     continue
 
-                # 경로 정규화 (URL 디코딩 등)
-                try:
-                    file_path = normalize_path(file_path)
-                except Exception:
-                    pass  # 정규화 실패해도 원본 경로 사용
-
                 if not os.path.isfile(file_path):
                     skipped.append(f"(파일 아님) {file_path}")
                     continue
@@ -350,41 +1907,31 @@ class ExcelDnDApp(TkinterDnD.Tk):
                 
                 valid_files.append(file_path)
 
-            # .xls 파일이 있는지 확인하여 Excel 객체 미리 생성
-            has_xls = any(os.path.splitext(f)[1].lower() == ".xls" for f in valid_files)
-            
-            if has_xls:
-                try:
-                    self.append_log("Excel 객체 생성 중...")
-                    excel_app = win32.DispatchEx("Excel.Application")
-                    excel_app.Visible = False
-                    excel_app.DisplayAlerts = False
-                    excel_app.ScreenUpdating = False  # 화면 업데이트 비활성화
-                    excel_app.EnableEvents = False  # 이벤트 비활성화
-                    # Calculation 속성은 일부 Excel 버전에서 지원하지 않을 수 있음
-                    try:
-                        excel_app.Calculation = -4105  # xlCalculationManual - 자동 계산 비활성화
-                    except Exception:
-                        pass  # 실패해도 계속 진행
-                    self.append_log("Excel 객체 생성 완료 (재사용 모드)")
-                except Exception as e:
-                    self.append_log(f"⚠️ Excel 객체 생성 실패: {e}")
-
-            success_files = []
-            failed = []
-
-            # 각 파일 처리
-            for i, file_path in enumerate(valid_files, 1):
-                file_name = os.path.basename(file_path)
-                self.append_log(f"[{i}/{len(valid_files)}] 처리 중: {file_name}")
-                
+            # 각 파일 처리 (.xls는 작업자마다 전용 Excel 인스턴스로 병렬 변환)
+            started = time.perf_counter()
+            self.jobs.expect(len(valid_files))
+            pool = ExcelConversionPool(
+                log=self.append_log, patch_contents=patch_contents,
+                on_result=self.jobs.record, warm_excel=self.warm_excel, excel_slots=excel_slots,
+            )
+            results = pool.run(valid_files, planner=planner) if valid_files else []
+            for folder in folders:
                 try:
-                    dest, _ = make_next_month_copy(file_path, excel_app)
-                    success_files.append(dest)
-                    self.append_log(f"  ✅ 완료: {os.path.basename(dest)}")
+                    plan = plan_folder_rollover(folder, planner=planner)
                 except Exception as e:
-                    failed.append(f"{file_name} → {e}")
-                    self.append_log(f"  ❌ 실패: {e}")
+                    skipped.append(f"(폴더) {os.path.basename(folder)}: {e}")
+                    continue
+                for line in plan.summary(limit=10):
+                    self.append_log(line)
+                self.jobs.expect(plan.count("copy") + plan.count("convert"))
+                results.extend(run_folder_rollover(
+                    plan, log=self.append_log, patch_contents=patch_contents,
+                    on_result=self.jobs.record, warm_excel=self.warm_excel, excel_slots=excel_slots,
+                ))
+            success_files = [r.dest for r in results if r.ok]
+            failed = [f"{os.path.basename(r.source)} → {r.error}" for r in results if not r.ok]
+            if results:
+                self.append_log(f"처리 시간: {time.perf_counter() - started:.1f}초")
 
             # 최종 로그 출력
             self.append_log("")
@@ -412,30 +1959,54 @@ class ExcelDnDApp(TkinterDnD.Tk):
             import traceback
             self.append_log(traceback.format_exc())
         finally:
-            # Excel 객체 정리
-            if excel_app is not None:
-                try:
-                    self.append_log("Excel 객체 종료 중...")
-                    excel_app.Quit()
-                    self.append_log("Excel 객체 종료 완료")
-                except Exception as e:
-                    self.append_log(f"⚠️ Excel 객체 종료 중 오류: {e}")
-            
-            # COM 정리
-            if com_initialized:
-                try:
-                    pythoncom.CoUninitialize()
-                except Exception:
-                    pass
-            
-            # 준비 완료 메시지 먼저 표시
-            self.append_log("✅ 준비 완료 - 다음 파일을 드롭할 수 있습니다.")
-            
-            # 처리 완료 플래그 해제 (메인 스레드에서 실행, 약간의 지연을 두어 로그 메시지 표시 후 해제)
-            # 200ms 지연으로 로그 메시지가 표시된 후 플래그 해제
-            self.after(200, self._set_processing_flag_and_log, False, None)
+            # COM 호출 통계 (COM_PROFILE=1일 때만)
+            com_profiler.print_report(out=self.append_log)
+
+            # 처리 중에도 드롭은 계속 받으므로 기다리라는 안내는 없음 (전체 진행은 위 상태 줄에)
+            self.append_log("✅ 이 드롭 처리 완료")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="엑셀 다음달 사본 생성 (인자 없으면 드래그앤드롭 창)")
+    parser.add_argument("--rollover", metavar="폴더", help="폴더 트리 전체를 다음 달 폴더로 복사")
+    parser.add_argument("--dest", metavar="폴더", help="대상 폴더 (기본: 폴더 이름의 연/월을 다음 달로 바꾼 옆 폴더)")
+    parser.add_argument("--dry-run", action="store_true", help="계획만 출력하고 복사하지 않음")
+    parser.add_argument("--workers", type=int, default=COPY_WORKERS, help="복사 스레드 수")
+    parser.add_argument("--patch", action="store_true", default=PATCH_MONTH_CONTENTS,
+                        help="사본 안의 지난달 연/월 문자열과 외부 링크도 다음 달로")
+    parser.add_argument("--watch", nargs="*", metavar="폴더",
+                        help="폴더를 감시해서 이번 달 파일이 생기면 다음달 사본 생성 (폴더 생략 시 watch_config.json)")
+    args = parser.parse_args()
+
+    if args.watch is not None:
+        config = load_watch_config()
+        if args.watch:
+            config.folders = args.watch
+        if args.patch:
+            config.patch_contents = True
+        FolderWatcher(config).run()
+        return
+
+    if not args.rollover:
+        app = ExcelDnDApp()
+        app.mainloop()
+        return
+
+    plan = plan_folder_rollover(args.rollover, args.dest)
+    for line in plan.summary(limit=len(plan.items) if args.dry_run else 30):
+        print(line)
+    if args.dry_run:
+        return
+    started = time.perf_counter()
+    results = run_folder_rollover(plan, copy_workers=args.workers, patch_contents=args.patch)
+    failed = [r for r in results if not r.ok]
+    print(f"완료: 성공 {len(results) - len(failed)}개 / 실패 {len(failed)}개, {time.perf_counter() - started:.1f}초")
+    com_profiler.print_report()
+    if failed:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
-    app = ExcelDnDApp()
-    app.mainloop()
+    main()
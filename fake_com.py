@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+가짜 COM 객체 모델 (Excel / Outlook)
+
+Windows + Excel/Outlook 없이 (Linux 포함) COM 자동화 코드를 돌려보기 위한 메모리 내 모델.
+- win32com의 CDispatch처럼 `_oleobj_` 속성을 가지므로 com_profiler가 COM 객체로 인식함
+- invoice_builder / excel_copy / send_mail이 실제로 쓰는 멤버만 구현
+- 셀 값, NumberFormat, 글꼴(굵게/색상)은 실제로 저장되므로 결과 확인도 가능
+
+사용 예:
+    excel = FakeExcelApplication()
+    wb = excel.Workbooks.Add("상세내역", "ID")
+    ws = wb.Sheets("상세내역")
+    ws.Range("A1:B2").Value = ((1, 2), (3, 4))
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+MAX_ROWS = 1048576
+MAX_COLS = 16384
+
+XL_SHIFT_DOWN = -4121
+XL_PASTE_ALL = -4104
+
+_CELL_PAT = re.compile(r"^\$?([A-Za-z]{1,3})?\$?(\d+)?$")
+
+
+def _col_to_num(letters: str) -> int:
+    result = 0
+    for ch in letters.upper():
+        result = result * 26 + (ord(ch) - ord("A") + 1)
+    return result
+
+
+def _parse_address(address: str) -> Tuple[int, int, int, int]:
+    """'A1', 'A1:C5', '3:5'(행 전체), 'B:B'(열 전체) → (r1, c1, r2, c2)"""
+    parts = address.replace("$", "").split(":")
+    if len(parts) == 1:
+        parts = parts * 2
+    bounds = []
+    for i, part in enumerate(parts):
+        m = _CELL_PAT.match(part.strip())
+        if not m or not (m.group(1) or m.group(2)):
+            raise ValueError(f"잘못된 주소: {address}")
+        col = _col_to_num(m.group(1)) if m.group(1) else (1 if i == 0 else MAX_COLS)
+        row = int(m.group(2)) if m.group(2) else (1 if i == 0 else MAX_ROWS)
+        bounds.append((row, col))
+    (r1, c1), (r2, c2) = bounds
+    return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+
+class FakeComObject:
+    """가짜 COM 객체 공통 베이스 (win32com CDispatch와 같은 표식)"""
+    _oleobj_ = True
+
+
+class FakeFont(FakeComObject):
+    def __init__(self, rng: "FakeRange"):
+        object.__setattr__(self, "_range", rng)
+
+    def __getattr__(self, name):
+        if name in ("Bold", "Color"):
+            rng = self._range
+            return rng.sheet._fonts.get((rng.r1, rng.c1), {}).get(name)
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name not in ("Bold", "Color"):
+            raise AttributeError(name)
+        for key in self._range.cells():
+            self._range.sheet._fonts.setdefault(key, {})[name] = value
+
+
+class FakeBorder(FakeComObject):
+    def __init__(self):
+        self.LineStyle = None
+        self.Weight = None
+
+
+class FakeCount(FakeComObject):
+    def __init__(self, count: int):
+        self.Count = count
+
+
+class FakeRange(FakeComObject):
+    def __init__(self, sheet: "FakeWorksheet", r1: int, c1: int, r2: int, c2: int):
+        self.sheet = sheet
+        self.r1, self.c1, self.r2, self.c2 = r1, c1, r2, c2
+
+    def cells(self):
+        for r in range(self.r1, self.r2 + 1):
+            for c in range(self.c1, self.c2 + 1):
+                yield r, c
+
+    @property
+    def Row(self) -> int:
+        return self.r1
+
+    @property
+    def Column(self) -> int:
+        return self.c1
+
+    @property
+    def Rows(self) -> FakeCount:
+        return FakeCount(self.r2 - self.r1 + 1)
+
+    @property
+    def Columns(self) -> FakeCount:
+        return FakeCount(self.c2 - self.c1 + 1)
+
+    @property
+    def Value(self):
+        data = self.sheet._cells
+        if self.r1 == self.r2 and self.c1 == self.c2:
+            return data.get((self.r1, self.c1))
+        return tuple(
+            tuple(data.get((r, c)) for c in range(self.c1, self.c2 + 1))
+            for r in range(self.r1, self.r2 + 1)
+        )
+
+    @Value.setter
+    def Value(self, value):
+        if isinstance(value, (tuple, list)):
+            for i, row in enumerate(value):
+                row = row if isinstance(row, (tuple, list)) else (row,)
+                for j, v in enumerate(row):
+                    self.sheet._set(self.r1 + i, self.c1 + j, v)
+        else:
+            for key in self.cells():
+                self.sheet._set(key[0], key[1], value)
+
+    @property
+    def NumberFormat(self):
+        return self.sheet._formats.get((self.r1, self.c1), "General")
+
+    @NumberFormat.setter
+    def NumberFormat(self, value):
+        for key in self.cells():
+            self.sheet._formats[key] = value
+
+    @property
+    def Font(self) -> FakeFont:
+        return FakeFont(self)
+
+    def Borders(self, edge: int) -> FakeBorder:
+        return FakeBorder()
+
+    def Insert(self, Shift: int = XL_SHIFT_DOWN):
+        """행 범위 삽입 (아래로 밀기)"""
+        self.sheet._insert_rows(self.r1, self.r2 - self.r1 + 1)
+
+    def Copy(self, Destination: Optional["FakeRange"] = None):
+        if Destination is not None:
+            Destination._paste_from(self)
+        else:
+            self.sheet.Application.clipboard = self
+
+    def PasteSpecial(self, Paste: int = XL_PASTE_ALL):
+        source = self.sheet.Application.clipboard
+        if source is not None:
+            self._paste_from(source)
+
+    def _paste_from(self, source: "FakeRange"):
+        """원본 범위를 대상 범위 크기에 맞게 반복해서 붙여넣기 (Excel 타일 붙여넣기)"""
+        height = source.r2 - source.r1 + 1
+        width = source.c2 - source.c1 + 1
+        rows = max(self.r2 - self.r1 + 1, height)
+        cols = max(self.c2 - self.c1 + 1, width)
+        for i in range(rows):
+            for j in range(cols):
+                src = (source.r1 + i % height, source.c1 + j % width)
+                dst = (self.r1 + i, self.c1 + j)
+                self.sheet._set(dst[0], dst[1], source.sheet._cells.get(src))
+                if src in source.sheet._formats:
+                    self.sheet._formats[dst] = source.sheet._formats[src]
+
+
+class FakeWorksheet(FakeComObject):
+    def __init__(self, workbook: "FakeWorkbook", name: str):
+        self.Parent = workbook
+        self.Application = workbook.Application
+        self.Name = name
+        self.Visible = True
+        self._cells: Dict[Tuple[int, int], object] = {}
+        self._formats: Dict[Tuple[int, int], str] = {}
+        self._fonts: Dict[Tuple[int, int], Dict[str, object]] = {}
+
+    def _set(self, r: int, c: int, value):
+        if value is None or value == "":
+            self._cells.pop((r, c), None)
+        else:
+            self._cells[(r, c)] = value
+
+    def _insert_rows(self, row: int, count: int):
+        def shift(d):
+            return {((r + count if r >= row else r), c): v for (r, c), v in d.items()}
+        self._cells = shift(self._cells)
+        self._formats = shift(self._formats)
+        self._fonts = shift(self._fonts)
+
+    def Cells(self, row: int, col: int) -> FakeRange:
+        return FakeRange(self, row, col, row, col)
+
+    def Range(self, first, second=None) -> FakeRange:
+        if isinstance(first, FakeRange):
+            last = second if isinstance(second, FakeRange) else first
+            return FakeRange(
+                self, min(first.r1, last.r1), min(first.c1, last.c1),
+                max(first.r2, last.r2), max(first.c2, last.c2),
+            )
+        r1, c1, r2, c2 = _parse_address(first)
+        if second is not None:
+            sr1, sc1, sr2, sc2 = _parse_address(second)
+            r1, c1, r2, c2 = min(r1, sr1), min(c1, sc1), max(r2, sr2), max(c2, sc2)
+        return FakeRange(self, r1, c1, r2, c2)
+
+    @property
+    def UsedRange(self) -> FakeRange:
+        if not self._cells:
+            return FakeRange(self, 1, 1, 1, 1)
+        rows = [r for r, _ in self._cells]
+        cols = [c for _, c in self._cells]
+        return FakeRange(self, min(rows), min(cols), max(rows), max(cols))
+
+
+class FakeSheets(FakeComObject):
+    def __init__(self, workbook: "FakeWorkbook"):
+        self._workbook = workbook
+        self._items: List[FakeWorksheet] = []
+
+    def __call__(self, key) -> FakeWorksheet:
+        if isinstance(key, int):
+            return self._items[key - 1]  # COM 컬렉션은 1부터
+        for sheet in self._items:
+            if sheet.Name == key:
+                return sheet
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    @property
+    def Count(self) -> int:
+        return len(self._items)
+
+    def Add(self, name: Optional[str] = None) -> FakeWorksheet:
+        sheet = FakeWorksheet(self._workbook, name or f"Sheet{len(self._items) + 1}")
+        self._items.append(sheet)
+        return sheet
+
+
+class FakeWorkbook(FakeComObject):
+    def __init__(self, app: "FakeExcelApplication", full_name: str = ""):
+        self.Application = app
+        self.FullName = full_name
+        self.Sheets = FakeSheets(self)
+        self.Worksheets = self.Sheets
+        self.saved_as: List[str] = []
+        self.closed = False
+
+    def SaveAs(self, path: str, FileFormat: int = 51, ConflictResolution: int = 1):
+        self.saved_as.append(path)
+        with open(path, "wb") as f:
+            f.write(b"fake-xlsx")
+
+    def Close(self, SaveChanges: bool = False):
+        self.closed = True
+
+
+class FakeWorkbooks(FakeComObject):
+    def __init__(self, app: "FakeExcelApplication"):
+        self._app = app
+        self.templates: Dict[str, FakeWorkbook] = {}
+        self._opened: List[FakeWorkbook] = []
+
+    @property
+    def Count(self) -> int:
+        """열려 있는 통합문서 수 (Excel 상태 확인용)"""
+        return sum(1 for wb in self._opened if not wb.closed)
+
+    def Add(self, *sheet_names: str) -> FakeWorkbook:
+        wb = FakeWorkbook(self._app)
+        for name in sheet_names or ("Sheet1",):
+            wb.Sheets.Add(name)
+        self._opened.append(wb)
+        return wb
+
+    def Open(self, path: str, ReadOnly: bool = False, UpdateLinks: int = 0) -> FakeWorkbook:
+        """register()로 등록한 통합문서가 있으면 반환, 없으면 빈 시트 1개짜리 통합문서"""
+        wb = self.templates.get(path)
+        if wb is None:
+            wb = self.Add("Sheet1")
+            wb.FullName = path
+        return wb
+
+    def register(self, path: str, workbook: FakeWorkbook):
+        workbook.FullName = path
+        self.templates[path] = workbook
+
+
+class FakeExcelApplication(FakeComObject):
+    def __init__(self):
+        self.Visible = True
+        self.DisplayAlerts = True
+        self.ScreenUpdating = True
+        self.EnableEvents = True
+        self.Calculation = -4105
+        self.CutCopyMode = False
+        self.clipboard: Optional[FakeRange] = None
+        self.Workbooks = FakeWorkbooks(self)
+        self.quit_called = False
+
+    def Quit(self):
+        self.quit_called = True
+
+
+class FakePropertyAccessor(FakeComObject):
+    def __init__(self):
+        self.properties: Dict[str, object] = {}
+
+    def SetProperty(self, name: str, value):
+        self.properties[name] = value
+
+
+class FakeAttachment(FakeComObject):
+    def __init__(self, path: str):
+        self.FileName = path
+        self.PropertyAccessor = FakePropertyAccessor()
+
+
+class FakeAttachments(FakeComObject):
+    def __init__(self):
+        self.items: List[FakeAttachment] = []
+
+    def Add(self, path: str) -> FakeAttachment:
+        attachment = FakeAttachment(path)
+        self.items.append(attachment)
+        return attachment
+
+    @property
+    def Count(self) -> int:
+        return len(self.items)
+
+
+class FakeMailItem(FakeComObject):
+    def __init__(self, outbox: List["FakeMailItem"]):
+        self._outbox = outbox
+        self.To = ""
+        self.CC = ""
+        self.Subject = ""
+        self.HTMLBody = ""
+        self.Attachments = FakeAttachments()
+
+    def Send(self):
+        self._outbox.append(self)
+
+
+class FakeFolder(FakeComObject):
+    def __init__(self, items: List[FakeMailItem]):
+        self._items = items
+
+    @property
+    def Items(self) -> FakeCount:
+        return FakeCount(len(self._items))
+
+
+class FakeNamespace(FakeComObject):
+    def __init__(self, app: "FakeOutlookApplication"):
+        self._app = app
+
+    def GetDefaultFolder(self, folder_type: int) -> FakeFolder:
+        return FakeFolder(self._app.sent)
+
+
+class FakeOutlookApplication(FakeComObject):
+    def __init__(self):
+        self.sent: List[FakeMailItem] = []
+
+    def GetNamespace(self, name: str) -> FakeNamespace:
+        return FakeNamespace(self)
+
+    def CreateItem(self, item_type: int) -> FakeMailItem:
+        return FakeMailItem(self.sent)
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+invoice_builder 성능 측정 (Excel 없이 Linux에서도 실행 가능)
+
+- 합성 전체리스트: 1천~20만 매장 (등록된 업체마다 최대 VENDOR_MAX_STORES개, 나머지는 다른 기업)
+  (테스트 계정 / 최근로그인 없는 행도 섞어서 필터링 비용 포함)
+- 합성 거래명세서 양식: 업체 설정(시트, 헤더, 날짜 셀, 보호 테이블, ID 시트)에 맞춰 업체별 생성
+- 가짜 Excel(fake_com) 위에서 COM 백엔드 함수를 그대로 실행하고 com_profiler로 COM 호출 수 집계
+- 단계별 시간:
+    list_raw       전체리스트 원본 읽기 (pandas, 캐시 끔)
+    list_snapshot  스냅샷 캐시에서 읽기
+    extract        업체별 추출 (extract_stores_from_list, 첫 업체는 매장 마스터 반영 포함)
+    com_read       계획용 값 읽기 (ID 시트 매핑, 레이아웃 감지, 기존 매장명) - 레이아웃 캐시 없음
+    com_read_warm  같은 읽기를 레이아웃 캐시 적중 상태로
+    plan           diff 계산 (plan_build)
+    com_apply      계획 적용 (행 삽입, 제외 목록, ID 시트)
+    openpyxl       openpyxl 백엔드 run_build 전체 (--skip-openpyxl로 생략)
+
+회귀 확인: --save-baseline으로 COM 호출 수를 저장해 두고, 다음에 --baseline으로 비교
+(COM 호출 수는 실행 환경과 관계없이 같으므로 늘어나면 종료 코드 1)
+
+사용법:
+    python invoice_bench.py --stores 1000,20000 --vendor 할리스커피
+    python invoice_bench.py --stores 200000 --skip-openpyxl --json result.json
+    python invoice_bench.py --save-baseline bench_baseline.json
+    python invoice_bench.py --baseline bench_baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl import Workbook, load_workbook
+
+import com_profiler
+import list_cache
+import store_master
+import invoice_builder as ib
+from fake_com import FakeExcelApplication, FakeWorkbook
+
+
+DEFAULT_STORE_COUNTS = [1000, 10000]
+NEW_STORES_PER_VENDOR = 50        # 업체별로 명세서에 없는(새로 추가될) 매장 수
+EXCLUDED_STORES_PER_VENDOR = 5    # 명세서에만 있는(전체리스트에 없는) 매장 수
+# 업체별 매장 수 상한 - invoice_builder의 읽기 범위(상세내역 1000행, ID 시트 2000행) 안쪽
+# 전체 매장 수가 더 크면 나머지는 다른 기업 매장으로 채움 (실제 전체리스트처럼 대부분이 다른 기업)
+VENDOR_MAX_STORES = 900
+NOISE_RATIO = 0.1                 # 업체와 무관한 행 비율 (다른 기업명 / 테스트 계정 / 최근로그인 없음)
+HEADER_ROW = 14                   # 합성 양식의 상세내역 헤더 행
+COM_CALL_TOLERANCE = 1.05         # 기준보다 5% 넘게 늘면 회귀로 판단
+LIST_COLUMNS = ["기업명", "그룹명", "매장명", "로그인ID", "최근로그인시간",
+                "F", "G", "H", "I", "J", "K", "L", "월"]   # 월 = M열 (month_col)
+
+
+class BenchCheckError(Exception):
+    """합성 데이터로 기대한 결과와 실제 결과가 다름 (측정 전에 동작 오류부터 확인)"""
+
+
+@dataclass
+class PhaseResult:
+    phase: str
+    seconds: float
+    com_calls: int = 0
+
+
+@dataclass
+class BenchRun:
+    stores: int
+    vendor: str
+    list_stores: int = 0      # 이 업체로 추출된 매장 수
+    expected_stores: int = 0  # 합성 데이터상 추출돼야 하는 매장 수
+    new_stores: int = 0       # 계획상 추가 매장 수
+    phases: List[PhaseResult] = field(default_factory=list)
+
+    def phase(self, name: str) -> Optional[PhaseResult]:
+        return next((p for p in self.phases if p.phase == name), None)
+
+
+# ----------------------------
+# 1) 합성 데이터
+# ----------------------------
+def vendor_rows(vendor: ib.VendorConfig, vendor_index: int, count: int) -> List[list]:
+    """업체 필터를 통과하는 전체리스트 행 (로그인ID는 업체별로 겹치지 않게)"""
+    rows = []
+    for i in range(count):
+        group = vendor.group_value or f"{vendor.company_value} 그룹{i % 7}"
+        month = f"{vendor.month_value}-15" if vendor.month_value else ""
+        rows.append([
+            vendor.company_value, group, f"{vendor.name} {i:06d}호점", f"V{vendor_index:02d}{i:06d}",
+            "2025-11-30 10:00", "", "", "", "", "", "", "", month,
+        ])
+    return rows
+
+
+def other_company_rows(count: int) -> List[list]:
+    """등록된 업체가 아닌 기업 매장 (기업명 필터에서 바로 빠지는 행)"""
+    return [
+        [f"기업{i % 500:03d}", "", f"기업{i % 500:03d} {i:07d}호점", f"C{i:07d}",
+         "2025-11-30 10:00", "", "", "", "", "", "", "", ""]
+        for i in range(max(0, count))
+    ]
+
+
+def noise_rows(count: int, rng: random.Random) -> List[list]:
+    """어느 업체로도 추출되면 안 되는 행 (다른 기업명 / 테스트 계정 / 최근로그인시간 없음)"""
+    rows = []
+    for i in range(count):
+        kind = i % 3
+        company = "기타기업" if kind == 0 else "할리스커피"
+        store = f"테스트매장{i}" if kind == 1 else f"기타 {i:06d}호점"
+        recent = None if kind == 2 else "2025-11-30 10:00"
+        rows.append([company, "", store, f"N{i:07d}", recent, "", "", "", "", "", "", "", ""])
+    rng.shuffle(rows)
+    return rows
+
+
+def generate_list(path: str, total_stores: int, vendor_keys: List[str], seed: int = 0) -> Dict[str, int]:
+    """
+    합성 전체리스트 저장 (헤더 3행 = 업체 설정의 header_row)
+    Returns: {업체: 이 업체로 추출돼야 하는 매장 수} (잡음 행은 모두 제외돼야 하므로 넣은 매장 수와 같음)
+    """
+    rng = random.Random(seed)
+    per_vendor = max(1, min(VENDOR_MAX_STORES, total_stores // len(vendor_keys)))
+    counts: Dict[str, int] = {}
+    rows: List[list] = []
+    for index, key in enumerate(vendor_keys):
+        vendor = ib.VENDOR_CONFIGS[key]
+        rows += vendor_rows(vendor, index, per_vendor)
+        counts[key] = per_vendor
+    rows += other_company_rows(total_stores - len(rows))
+    rows += noise_rows(int(total_stores * NOISE_RATIO), rng)
+    rng.shuffle(rows)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("전체리스트")
+    ws.append(["합성 전체리스트"])
+    ws.append([])
+    ws.append(LIST_COLUMNS)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+    return counts
+
+
+def generate_template(path: str, vendor_key: str, vendor_index: int, list_count: int):
+    """
+    업체 설정에 맞는 합성 거래명세서 양식
+    - ID 시트: 전체리스트 매장 중 NEW_STORES_PER_VENDOR개를 뺀 나머지 + 제외될 매장
+    - 상세내역: ID 시트와 같은 매장, 그 아래 보호 테이블
+    """
+    vendor = ib.VENDOR_CONFIGS[vendor_key]
+    list_rows = vendor_rows(vendor, vendor_index, list_count)
+    known = list_rows[:max(0, list_count - NEW_STORES_PER_VENDOR)]
+    excluded = [[vendor.company_value, "", f"{vendor.name} 폐점{i:03d}", f"X{vendor_index:02d}{i:04d}"]
+                for i in range(EXCLUDED_STORES_PER_VENDOR)]
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    store_col = ib.col_letter_to_num(vendor.store_col_letter)
+    detail_stores = [(r[2], r[3]) for r in known + excluded]
+
+    for sheet_name in (vendor.invoice_sheets or [vendor.invoice_sheet]):
+        ws = wb.create_sheet(sheet_name)
+        ws.cell(1, 1, f"{vendor.name} 거래명세서")
+        if vendor.date_cell:
+            ws[vendor.date_cell] = "2025-11-30"
+        headers = ["No", "지역", "구분", "수량", "단가", "금액", "비고", "확인"]
+        headers[store_col - 1] = vendor.table_header_text
+        for c, text in enumerate(headers, start=1):
+            ws.cell(HEADER_ROW, c, text)
+        for i, (store, _) in enumerate(detail_stores):
+            r = HEADER_ROW + 1 + i
+            ws.cell(r, 1, i + 1)
+            ws.cell(r, store_col, store)
+            ws.cell(r, 6, 33000)
+        protected = HEADER_ROW + len(detail_stores) + 2
+        for offset, header in enumerate(vendor.protected_table_headers or []):
+            ws.cell(protected + offset, store_col, header)
+            ws.cell(protected + offset, store_col + 1, 0)
+
+    if vendor.id_sheet:
+        id_ws = wb.create_sheet(vendor.id_sheet)
+        id_ws.cell(1, 1, "전체리스트 매장명")
+        id_ws.cell(1, 2, "명세서 매장명")
+        id_ws.cell(1, 3, "로그인ID")
+        list_col = ib.col_letter_to_num(vendor.id_list_store_col)
+        store_id_col = ib.col_letter_to_num(vendor.id_store_col)
+        login_col = ib.col_letter_to_num(vendor.id_login_col)
+        for i, row in enumerate(known + excluded):
+            r = vendor.id_start_row + i
+            id_ws.cell(r, list_col, row[2])
+            id_ws.cell(r, store_id_col, row[2])
+            id_ws.cell(r, login_col, row[3])
+        id_ws.sheet_state = "hidden"
+    wb.save(path)
+
+
+def fake_workbook_from_xlsx(app: FakeExcelApplication, path: str) -> FakeWorkbook:
+    """xlsx 값을 가짜 Excel 통합문서로 옮기고 Workbooks.Open(path)에서 열리게 등록"""
+    source = load_workbook(path)
+    wb = FakeWorkbook(app)
+    for sheet in source.worksheets:
+        fake = wb.Sheets.Add(sheet.title)
+        fake.Visible = sheet.sheet_state == "visible"
+        for row in sheet.iter_rows():
+            for cell in row:
+                if cell.value is not None:
+                    fake._set(cell.row, cell.column, cell.value)
+    source.close()
+    app.Workbooks.register(path, wb)
+    return wb
+
+
+# ----------------------------
+# 2) 단계별 측정
+# ----------------------------
+class _Phase:
+    """with 블록 시간과 그동안의 COM 호출 수를 BenchRun에 기록"""
+
+    def __init__(self, run: BenchRun, name: str):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        profiler = com_profiler.get_profiler()
+        if profiler:
+            profiler.reset()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        profiler = com_profiler.get_profiler()
+        calls = profiler.total_calls if profiler else 0
+        if exc[0] is None:
+            self.run.phases.append(PhaseResult(self.name, elapsed, calls))
+        return False
+
+
+def _com_book(template_path: str) -> Tuple[ib.ComInvoiceBackend, object]:
+    """가짜 Excel을 붙인 COM 백엔드 (start() 대신 직접 연결)"""
+    book = ib.ComInvoiceBackend()
+    app = FakeExcelApplication()
+    fake_workbook_from_xlsx(app, template_path)
+    book.excel = com_profiler.wrap(app, "Excel")
+    return book, book.open(template_path)
+
+
+def bench_vendor(run: BenchRun, list_path: str, template_path: str, work_dir: str, skip_openpyxl: bool):
+    vendor_key = run.vendor
+    vendor = ib.VENDOR_CONFIGS[vendor_key]
+    sheet_names = vendor.invoice_sheets or [vendor.invoice_sheet]
+
+    with _Phase(run, "extract"):
+        id_to_store, id_to_group, id_to_extra = ib.extract_stores_from_list(list_path, vendor)
+        run.list_stores = len(id_to_store)
+        if run.list_stores != run.expected_stores:
+            raise BenchCheckError(
+                f"[{vendor_key}] 전체 {run.stores}매장: 추출 {run.list_stores}개, 기대 {run.expected_stores}개"
+            )
+
+    # 레이아웃 캐시 없는 상태 → 있는 상태 순서로 읽기
+    shutil.rmtree(ib.LAYOUT_CACHE_DIR, ignore_errors=True)
+    for phase in ("com_read", "com_read_warm"):
+        book, wb = _com_book(template_path)
+        with _Phase(run, phase):
+            store_to_id, id_to_store_invoice, sheet_store_names, layouts = ib.read_plan_sources(
+                book, wb, vendor_key, vendor, sheet_names
+            )
+
+    with _Phase(run, "plan"):
+        plan = ib.plan_build(
+            vendor_key, vendor, id_to_store, id_to_group, id_to_extra,
+            store_to_id, id_to_store_invoice, sheet_store_names, date_value="2025-12-01",
+        )
+    run.new_stores = len(plan.stores_to_add)
+
+    with _Phase(run, "com_apply"):
+        ib.apply_build_plan(book, wb, plan, vendor, sheet_names, layouts)
+
+    if not skip_openpyxl:
+        output_path = os.path.join(work_dir, f"{vendor_key}_완성.xlsx")
+        with _Phase(run, "openpyxl"):
+            ib.run_build(list_path, template_path, vendor_key, output_path,
+                         backend="openpyxl", force=True, preflight=False)
+
+
+def bench_list_read(run: BenchRun, list_path: str):
+    vendor = ib.VENDOR_CONFIGS[run.vendor]
+    engine = ib.get_excel_engine(list_path)
+    list_cache.ENABLED = False
+    with _Phase(run, "list_raw"):
+        list_cache.read_excel_cached(list_path, header=vendor.header_row - 1, engine=engine)
+    list_cache.ENABLED = True
+    list_cache.read_excel_cached(list_path, header=vendor.header_row - 1, engine=engine)  # 스냅샷 생성
+    list_cache.clear_memory_cache()
+    with _Phase(run, "list_snapshot"):
+        list_cache.read_excel_cached(list_path, header=vendor.header_row - 1, engine=engine)
+
+
+def run_benchmarks(store_counts: List[int], vendor_keys: List[str], skip_openpyxl: bool = False,
+                   log=print) -> List[BenchRun]:
+    """업체 수만큼 양식을 만들고 매장 수별로 측정 (캐시/출력은 임시 폴더에만 씀)"""
+    com_profiler.enable()
+    all_vendors = list(ib.VENDOR_CONFIGS)
+    work_dir = tempfile.mkdtemp(prefix="invoice_bench_")
+    saved_dirs = (ib.BUILD_MANIFEST_DIR, ib.LAYOUT_CACHE_DIR, ib.BUILD_PLAN_DIR, list_cache.CACHE_DIR,
+                  store_master.DB_PATH)
+    ib.BUILD_MANIFEST_DIR = os.path.join(work_dir, "build_manifests")
+    ib.LAYOUT_CACHE_DIR = os.path.join(work_dir, "layout_cache")
+    ib.BUILD_PLAN_DIR = os.path.join(work_dir, "build_plans")
+    list_cache.CACHE_DIR = os.path.join(work_dir, "list_cache")
+    store_master.DB_PATH = os.path.join(work_dir, "store_master.db")
+    runs: List[BenchRun] = []
+    try:
+        for total in store_counts:
+            list_path = os.path.join(work_dir, f"전체리스트_{total}.xlsx")
+            started = time.perf_counter()
+            counts = generate_list(list_path, total, all_vendors)
+            log(f"전체리스트 {total}매장 생성 ({time.perf_counter() - started:.1f}s)")
+
+            for n, vendor_key in enumerate(vendor_keys):
+                template_path = os.path.join(work_dir, f"{vendor_key}_{total}.xlsx")
+                generate_template(template_path, vendor_key, all_vendors.index(vendor_key), counts[vendor_key])
+                run = BenchRun(total, vendor_key, expected_stores=counts[vendor_key])
+                if n == 0:
+                    bench_list_read(run, list_path)
+                bench_vendor(run, list_path, template_path, work_dir, skip_openpyxl)
+                runs.append(run)
+                log(format_run(run))
+            list_cache.clear_memory_cache()
+    finally:
+        (ib.BUILD_MANIFEST_DIR, ib.LAYOUT_CACHE_DIR, ib.BUILD_PLAN_DIR, list_cache.CACHE_DIR,
+         store_master.DB_PATH) = saved_dirs
+        shutil.rmtree(work_dir, ignore_errors=True)
+        com_profiler.disable()
+    return runs
+
+
+# ----------------------------
+# 3) 결과 / 회귀 비교
+# ----------------------------
+def format_run(run: BenchRun) -> str:
+    lines = [f"[{run.vendor}] 전체 {run.stores}매장, 업체 {run.list_stores}개, 추가 {run.new_stores}개"]
+    for p in run.phases:
+        calls = f"{p.com_calls:>9} COM" if p.com_calls else ""
+        lines.append(f"  {p.phase:<14}{p.seconds * 1000:>11.1f}ms {calls}")
+    return "\n".join(lines)
+
+
+def baseline_key(run: BenchRun, phase: str) -> str:
+    return f"{run.stores}/{run.vendor}/{phase}"
+
+
+def make_baseline(runs: List[BenchRun]) -> Dict[str, Dict[str, float]]:
+    return {
+        baseline_key(run, p.phase): {"com_calls": p.com_calls, "seconds": round(p.seconds, 4)}
+        for run in runs for p in run.phases
+    }
+
+
+def compare_baseline(runs: List[BenchRun], baseline: Dict[str, Dict[str, float]]) -> List[str]:
+    """기준보다 COM 호출 수가 늘어난 단계 목록 (시간은 참고용으로만 표시)"""
+    regressions = []
+    for run in runs:
+        for p in run.phases:
+            base = baseline.get(baseline_key(run, p.phase))
+            if not base:
+                continue
+            if p.com_calls > base["com_calls"] * COM_CALL_TOLERANCE:
+                regressions.append(
+                    f"{baseline_key(run, p.phase)}: COM 호출 {base['com_calls']} → {p.com_calls}"
+                    f" (시간 {base['seconds'] * 1000:.1f} → {p.seconds * 1000:.1f}ms)"
+                )
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="invoice_builder 합성 데이터 성능 측정")
+    parser.add_argument("--stores", default=",".join(str(n) for n in DEFAULT_STORE_COUNTS),
+                        help="전체리스트 매장 수 (쉼표 구분, 예: 1000,50000,200000)")
+    parser.add_argument("--vendor", action="append", help="측정할 업체 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--skip-openpyxl", action="store_true", help="openpyxl run_build 단계 생략")
+    parser.add_argument("--json", help="결과를 JSON으로 저장")
+    parser.add_argument("--baseline", help="기준 파일과 COM 호출 수 비교 (늘어나면 종료 코드 1)")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준 파일로 저장")
+    args = parser.parse_args(argv)
+
+    store_counts = [int(x) for x in args.stores.split(",") if x.strip()]
+    vendor_keys = args.vendor or list(ib.VENDOR_CONFIGS)
+    unknown = [v for v in vendor_keys if v not in ib.VENDOR_CONFIGS]
+    if unknown:
+        print(f"등록되지 않은 업체: {unknown}")
+        return 2
+
+    try:
+        runs = run_benchmarks(store_counts, vendor_keys, skip_openpyxl=args.skip_openpyxl)
+    except BenchCheckError as e:
+        print(f"결과 확인 실패: {e}")
+        return 1
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(run) for run in runs], f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(make_baseline(runs), f, ensure_ascii=False, indent=2)
+        print(f"기준 저장: {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_baseline(runs, json.load(f))
+        if regressions:
+            print("COM 호출 수 증가:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("기준 대비 COM 호출 수 증가 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,20 @@
 import re
 import os
+import copy
 import json
+import time
+import hashlib
 import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime
 from dataclasses import dataclass, field, asdict
 from typing import Dict, List, Set, Optional, Tuple, Callable
 
-import pandas as pd
+
+import com_profiler  # COM 호출 프로파일링 (COM_PROFILE=1일 때만 동작)
+import list_cache  # 전체리스트 스냅샷 캐시
+import store_master  # 매장 마스터 (SQLite)
 
 # 설정 파일 경로
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vendor_configs.json")
@@ -63,6 +72,9 @@ class VendorConfig:
     
     # 날짜 셀 (첫번째 시트에 오늘 날짜 입력)
     date_cell: Optional[str] = None       # 날짜 셀 (예: "A1", "B2") - 형식: YYYY-MM-DD
+    
+    # 거래명세서 처리 백엔드
+    backend: str = "com"                  # "com" (Excel, Windows 전용) 또는 "openpyxl" (순수 Python)
 
 
 VENDOR_CONFIGS: Dict[str, VendorConfig] = {
@@ -206,7 +218,8 @@ TEST_PAT = re.compile(r"(테스트|test)", re.IGNORECASE)
 STORE_SUFFIX_PAT = re.compile(r"(점|지점|매장|센터|스토어|store)$", re.IGNORECASE)
 
 def norm_text(x) -> str:
-    if x is None:
+    # pandas가 빈 셀을 NaN으로 읽으므로 None과 같이 빈 문자열로 ("nan"이 되면 빈 값 필터를 통과함)
+    if x is None or (isinstance(x, float) and x != x):
         return ""
     return str(x).strip()
 
@@ -232,25 +245,281 @@ def find_col_idx_by_header(headers: List[str], header_name: str) -> int:
     raise KeyError(f"헤더 '{header_name}' 컬럼을 못 찾았어. 실제 헤더명을 확인해봐.")
 
 
+# ----------------------------
+# 2-1) 추적 로그 (JSONL)
+# ----------------------------
+# 추적 설정 파일 (없으면 추적 안 함)
+# 예: {"vendors": ["맘스터치"], "login_ids": ["E08886"], "all_rows": false, "trace_dir": "traces"}
+TRACE_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trace_config.json")
+
+
+@dataclass
+class TraceConfig:
+    vendors: List[str] = field(default_factory=list)     # 추적할 업체명 (부분 일치, "*"면 전체 업체)
+    login_ids: List[str] = field(default_factory=list)   # 행 단위로 추적할 로그인ID (모든 업체에 적용)
+    all_rows: bool = False                               # True면 모든 행의 포함/제외 사유 기록
+    trace_dir: str = "traces"                            # JSONL 저장 폴더 (상대경로면 이 스크립트 폴더 기준)
+
+    def matches_vendor(self, vendor_name: str) -> bool:
+        return any(v == "*" or (v and v in vendor_name) for v in self.vendors)
+
+
+def load_trace_config() -> TraceConfig:
+    """trace_config.json에서 추적 설정 불러오기 (없거나 잘못되면 추적 끔)"""
+    if not os.path.exists(TRACE_CONFIG_FILE):
+        return TraceConfig()
+    try:
+        with open(TRACE_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            return TraceConfig(**json.load(f))
+    except Exception as e:
+        print(f"추적 설정 파일 로드 실패: {e}")
+        return TraceConfig()
+
+
+class BuildTracer:
+    """
+    run_build 추적 로그 - 이벤트마다 JSON 한 줄 기록
+    - 메시지는 기록할 때만 format (필드 값이 callable이면 그때 호출)
+    - 추적이 꺼져 있으면 객체 자체가 None이므로 호출하는 쪽은 `if tracer:` 한번만 검사
+    """
+
+    def __init__(self, path: str, vendor_name: str, login_ids: Optional[List[str]] = None, all_rows: bool = False):
+        self.path = path
+        self.vendor_name = vendor_name
+        self.login_ids = frozenset(norm_text(x) for x in (login_ids or []) if norm_text(x))
+        self.all_rows = all_rows
+        self._start = time.perf_counter()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def tracks(self, login_id: str) -> bool:
+        """이 로그인ID의 행 단위 이벤트를 기록할지"""
+        return self.all_rows or login_id in self.login_ids
+
+    def event(self, event: str, message: str = "", **fields):
+        if self._file is None:
+            return
+        values = {k: (v() if callable(v) else v) for k, v in fields.items()}
+        record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "elapsed_ms": round((time.perf_counter() - self._start) * 1000, 1),
+            "vendor": self.vendor_name,
+            "event": event,
+        }
+        if message:
+            try:
+                record["message"] = message.format(**values)
+            except (KeyError, IndexError, ValueError):
+                record["message"] = message
+        record.update(values)
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def row(self, login_id: str, event: str, message: str = "", **fields):
+        """행 단위 이벤트 - 추적 대상 로그인ID(또는 all_rows)일 때만 기록"""
+        if self.tracks(login_id):
+            self.event(event, message, login_id=login_id, **fields)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def open_build_tracer(vendor_name: str, config: Optional[TraceConfig] = None) -> Optional[BuildTracer]:
+    """
+    업체명/로그인ID 설정에 해당하면 추적 로그 열기
+    Returns: BuildTracer 또는 None (추적 안 함)
+    """
+    config = config or load_trace_config()
+    if not config.matches_vendor(vendor_name) and not config.login_ids:
+        return None
+    trace_dir = config.trace_dir
+    if not os.path.isabs(trace_dir):
+        trace_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), trace_dir)
+    safe_name = re.sub(r'[\\/:*?"<>|]', "_", vendor_name)
+    path = os.path.join(trace_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{safe_name}.jsonl")
+    return BuildTracer(path, vendor_name, config.login_ids, config.all_rows)
+
+
+# ----------------------------
+# 2-2) 매칭 실패 제안 인덱스
+# ----------------------------
+MATCH_NGRAM = 2             # 문자 n-gram 크기 (로그인ID/매장명이 짧아서 bigram)
+MATCH_MIN_SCORE = 0.5       # 이 점수 미만의 n-gram 후보는 제안하지 않음
+MATCH_MAX_POSTINGS = 200    # 너무 흔한 n-gram(예: "커피")으로는 후보를 고르지 않음 → 전체 비교 방지 (점수에는 포함)
+
+
+def match_id_key(login_id: str) -> str:
+    """로그인ID 비교 키: 대소문자 무시 + 앞뒤/내부 공백 제거"""
+    return re.sub(r"\s+", "", norm_text(login_id)).casefold()
+
+
+def match_store_key(store_name: str) -> str:
+    """매장명 비교 키: normalize_store_name + 대소문자 무시 + 공백 제거"""
+    return re.sub(r"\s+", "", normalize_store_name(store_name)).casefold()
+
+
+def char_ngrams(text: str, n: int = MATCH_NGRAM) -> Set[str]:
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+@dataclass
+class MatchSuggestion:
+    login_id: str
+    store_name: str
+    score: float      # 1.0 = 키 완전 일치, 그 외는 n-gram 유사도 (Dice)
+    reason: str       # "id_key" / "store_key" / "id_ngram" / "store_ngram"
+
+
+class MatchIndex:
+    """
+    로그인ID ↔ 매장명 후보 인덱스 (실행당 한 번 생성)
+    - 로그인ID 키(casefold, 공백 제거) → 로그인ID 목록
+    - 매장명 키(normalize_store_name) → 로그인ID 목록
+    - 문자 n-gram → 로그인ID 집합 (ID/매장명 각각)
+    조회는 질의 문자열의 n-gram 포스팅만 훑으므로 전체 목록과 하나씩 비교하지 않음
+    - 너무 흔한 n-gram은 후보를 고를 때만 빼고, 점수(Dice)는 후보의 전체 n-gram 집합과 정확히 계산
+      (그래야 점수가 업체 규모와 상관없이 두 문자열의 유사도만으로 정해짐)
+    """
+
+    def __init__(self, id_to_store: Dict[str, str]):
+        self.id_to_store = id_to_store
+        self.by_id_key: Dict[str, List[str]] = {}
+        self.by_store_key: Dict[str, List[str]] = {}
+        self.id_grams: Dict[str, Set[str]] = {}
+        self.store_grams: Dict[str, Set[str]] = {}
+        self._id_gram_sets: Dict[str, Set[str]] = {}  # 로그인ID별 n-gram 집합 (Dice 계산용)
+        self._store_gram_sets: Dict[str, Set[str]] = {}
+
+        for login_id, store_name in id_to_store.items():
+            id_key = match_id_key(login_id)
+            if id_key:
+                self.by_id_key.setdefault(id_key, []).append(login_id)
+                grams = char_ngrams(id_key)
+                self._id_gram_sets[login_id] = grams
+                for gram in grams:
+                    self.id_grams.setdefault(gram, set()).add(login_id)
+
+            store_key = match_store_key(store_name)
+            if store_key:
+                self.by_store_key.setdefault(store_key, []).append(login_id)
+                grams = char_ngrams(store_key)
+                self._store_gram_sets[login_id] = grams
+                for gram in grams:
+                    self.store_grams.setdefault(gram, set()).add(login_id)
+
+    @staticmethod
+    def _ngram_candidates(
+        key: str, postings: Dict[str, Set[str]], gram_sets: Dict[str, Set[str]], exclude: Set[str]
+    ) -> List[Tuple[str, float]]:
+        grams = char_ngrams(key)
+        if not grams:
+            return []
+        # 후보: 흔하지 않은 n-gram을 하나라도 같이 가진 ID
+        candidates: Set[str] = set()
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids and len(ids) <= MATCH_MAX_POSTINGS:
+                candidates.update(ids)
+        candidates -= exclude
+        # 점수: 흔한 n-gram까지 포함한 정확한 Dice
+        results = []
+        for login_id in candidates:
+            other = gram_sets[login_id]
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            if score >= MATCH_MIN_SCORE:
+                results.append((login_id, score))
+        return results
+
+    def suggest(self, login_id: str = "", store_name: str = "", limit: int = 3) -> List[MatchSuggestion]:
+        """
+        로그인ID/매장명과 비슷한 후보를 점수 순으로 반환
+        - 로그인ID 자체가 인덱스에 그대로 있으면 후보에서 제외 (이미 매칭된 것)
+        """
+        best: Dict[str, Tuple[float, str]] = {}
+
+        def offer(candidate: str, score: float, reason: str):
+            if candidate not in best or score > best[candidate][0]:
+                best[candidate] = (score, reason)
+
+        exclude = {login_id} if login_id else set()
+        id_key = match_id_key(login_id)
+        store_key = match_store_key(store_name)
+
+        if id_key:
+            for candidate in self.by_id_key.get(id_key, []):
+                if candidate != login_id:
+                    offer(candidate, 1.0, "id_key")
+            for candidate, score in self._ngram_candidates(id_key, self.id_grams, self._id_gram_sets, exclude):
+                offer(candidate, score, "id_ngram")
+        if store_key:
+            for candidate in self.by_store_key.get(store_key, []):
+                if candidate != login_id:
+                    offer(candidate, 0.99, "store_key")
+            for candidate, score in self._ngram_candidates(
+                store_key, self.store_grams, self._store_gram_sets, exclude
+            ):
+                offer(candidate, score * 0.9, "store_ngram")  # 매장명 유사는 ID 유사보다 약한 근거
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [
+            MatchSuggestion(candidate, self.id_to_store.get(candidate, ""), round(score, 3), reason)
+            for candidate, (score, reason) in ranked
+        ]
+
+
+def build_match_report(
+    unmatched: List[Tuple[str, str]],
+    index: MatchIndex,
+    limit: int = 3,
+) -> List[Dict[str, object]]:
+    """
+    매칭 실패 목록 [(로그인ID, 매장명)] 각각에 대한 후보 제안 보고서
+    Returns: [{"login_id", "store_name", "suggestions": [{login_id, store_name, score, reason}]}]
+    """
+    return [
+        {
+            "login_id": login_id,
+            "store_name": store_name,
+            "suggestions": [asdict(s) for s in index.suggest(login_id, store_name, limit)],
+        }
+        for login_id, store_name in unmatched
+    ]
+
+
 # ----------------------------
 # 3) 전체리스트에서 "추가해야 할 매장" 뽑기 (로그인ID → 매장명 딕셔너리)
 # ----------------------------
 def extract_stores_from_list(
     list_path: str,
     vendor: VendorConfig,
-    debug: bool = False,
+    tracer: Optional[BuildTracer] = None,
 ) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
     """
     Returns: ({로그인ID: 매장명}, {로그인ID: 그룹명}, {로그인ID: 추가열데이터}) 튜플
+    - tracer가 있으면 설정/샘플/제외 사유를 추적 로그(JSONL)에 기록
     """
+    sheet_name = vendor.list_sheet if vendor.list_sheet else 0
     engine = get_excel_engine(list_path)
-    df = pd.read_excel(
-        list_path,
-        sheet_name=vendor.list_sheet if vendor.list_sheet else 0,
-        header=vendor.header_row - 1,
-        engine=engine,
-        dtype=object,
-    )
+
+    # 매장 마스터에서 이 업체 기업명 행만 인덱스로 조회 (전체리스트 전체 행을 돌지 않음)
+    # 마스터가 꺼져 있거나 이 파일이 최신 스냅샷이 아니면 스냅샷 캐시에서 전체 읽기
+    df = None
+    source = "store_master"
+    if vendor.company_value:
+        try:
+            df = store_master.company_frame(
+                list_path, vendor.company_value, sheet_name=sheet_name, header=vendor.header_row - 1,
+                engine=engine, id_col=vendor.list_id_col, group_col=vendor.group_col,
+            )
+        except Exception as e:
+            print(f"매장 마스터 조회 실패 (전체리스트에서 직접 읽음): {e}")
+    if df is None:
+        # 스냅샷 캐시에서 읽기 (같은 파일은 한 번만 xlrd/openpyxl로 변환, 결과 DataFrame은 수정하지 않음)
+        source = "list_cache"
+        df = list_cache.read_excel_cached(list_path, sheet_name=sheet_name, header=vendor.header_row - 1, engine=engine)
 
     # 필요한 컬럼 인덱스 찾기
     headers = [norm_text(h) for h in df.columns.tolist()]
@@ -263,45 +532,54 @@ def extract_stores_from_list(
     group_idx = None
     if vendor.group_col:
         group_idx = col_letter_to_num(vendor.group_col) - 1  # 0-based index
-    
+
     # 월 열 인덱스 (있는 경우)
     month_idx = None
     if vendor.month_col:
         month_idx = col_letter_to_num(vendor.month_col) - 1  # 0-based index
-    
+
     # 추가 열 인덱스 (있는 경우, 예: M열)
     extra_col_idx = None
     if vendor.list_extra_col:
         extra_col_idx = col_letter_to_num(vendor.list_extra_col) - 1  # 0-based index
-    
+
     # 로그인ID 열 인덱스 (D열 = 인덱스 3)
     id_col_idx = col_letter_to_num(vendor.list_id_col) - 1  # 0-based index
-    
-    if debug:
-        print(f"\n[디버그] === 전체리스트 읽기 설정 ===")
-        print(f"파일 경로: {list_path}")
-        print(f"시트: {vendor.list_sheet if vendor.list_sheet else '첫 번째 시트'}")
-        print(f"헤더 행: {vendor.header_row} (pandas는 {vendor.header_row - 1}행을 헤더로 사용)")
-        print(f"로그인ID 읽는 열: {vendor.list_id_col} (열 인덱스: {id_col_idx})")
-        print(f"전체 행 수: {len(df)}")
-        print(f"전체 컬럼 수: {len(headers)}")
-        print(f"컬럼 목록 (전체): {headers}")
-        if id_col_idx < len(headers):
-            print(f"로그인ID 열({vendor.list_id_col}, 인덱스 {id_col_idx})의 헤더명: '{headers[id_col_idx]}'")
-        else:
-            print(f"⚠️ 경고: 로그인ID 열 인덱스 {id_col_idx}가 컬럼 수 {len(headers)}를 초과합니다!")
-        
-        # 실제로 읽은 로그인ID 샘플 확인 (처음 10행)
-        print(f"\n[실제 읽은 데이터 샘플] (처음 10행):")
-        for i in range(min(10, len(df))):
-            row = df.iloc[i]
-            login_id_val = row.iloc[id_col_idx] if id_col_idx < len(row) else None
-            company_val = row.iloc[company_idx] if company_idx < len(row) else None
-            store_val = row.iloc[store_idx] if store_idx < len(row) else None
-            print(f"  행 {i}: 기업명='{company_val}', 매장명='{store_val}', 로그인ID={repr(login_id_val)} (타입: {type(login_id_val)})")
-        print(f"========================================\n")
-
-    # 디버깅용 카운터
+
+    if tracer:
+        def sample_rows():
+            rows = []
+            for i in range(min(10, len(df))):
+                row = df.iloc[i]
+                rows.append({
+                    "row": i,
+                    "company": row.iloc[company_idx] if company_idx < len(row) else None,
+                    "store": row.iloc[store_idx] if store_idx < len(row) else None,
+                    "login_id": repr(row.iloc[id_col_idx]) if id_col_idx < len(row) else None,
+                })
+            return rows
+
+        tracer.event(
+            "list.config",
+            "전체리스트 읽기({source}): {total_rows}행, 로그인ID 열 {id_col} (헤더 '{id_header}')",
+            path=list_path,
+            source=source,
+            sheet=vendor.list_sheet or "첫 번째 시트",
+            header_row=vendor.header_row,
+            id_col=vendor.list_id_col,
+            id_header=headers[id_col_idx] if id_col_idx < len(headers) else None,
+            total_rows=len(df),
+            headers=headers,
+            samples=sample_rows,
+        )
+        if id_col_idx >= len(headers):
+            tracer.event(
+                "list.id_col_out_of_range",
+                "로그인ID 열 인덱스 {id_col_idx}가 컬럼 수 {columns}를 초과",
+                id_col_idx=id_col_idx, columns=len(headers),
+            )
+
+    # 제외 사유별 카운터
     total_rows = len(df)
     excluded_company = 0
     excluded_group_value = 0
@@ -315,82 +593,51 @@ def extract_stores_from_list(
     id_to_store: Dict[str, str] = {}
     id_to_group: Dict[str, str] = {}
     id_to_extra: Dict[str, str] = {}
-    
-    # 필터링 전 로그인ID 읽기 테스트 (디버깅용)
-    if debug:
-        print(f"\n[디버그] === 필터링 전 로그인ID 읽기 테스트 ===")
-        login_ids_before_filter = []
-        for i in range(min(20, len(df))):  # 처음 20행만 테스트
-            row = df.iloc[i]
-            if id_col_idx < len(row):
-                login_id_val = row.iloc[id_col_idx]
-                login_ids_before_filter.append((i, login_id_val, type(login_id_val)))
-        print(f"필터링 전 로그인ID 샘플 (처음 20행):")
-        for row_idx, login_id_val, val_type in login_ids_before_filter:
-            print(f"  행 {row_idx}: {repr(login_id_val)} (타입: {val_type})")
-        print(f"========================================\n")
 
     for row_idx, row in df.iterrows():
         # 열 인덱스 범위 확인
         if id_col_idx >= len(row):
-            if debug and row_idx < 5:  # 처음 5행만 경고 출력
-                print(f"[디버그] ⚠️ 경고: 행 {row_idx}에서 로그인ID 열 인덱스 {id_col_idx}가 범위를 벗어남 (행 길이: {len(row)})")
             continue
-        
+
         company = norm_text(row.iloc[company_idx])
         store = norm_text(row.iloc[store_idx])
         recent_login = norm_text(row.iloc[recent_login_idx])
-        login_id_raw = row.iloc[id_col_idx]  # 원본 값 (필터링 전)
-        login_id = norm_text(login_id_raw)
-        
-        # E08886 추적 (디버깅용)
-        track_e08886 = debug and ('E08886' in str(login_id_raw) or 'E08886' in login_id)
-        
+        login_id = norm_text(row.iloc[id_col_idx])
+
         # 그룹명 가져오기 (있는 경우)
         group_name = ""
         if group_idx is not None:
             group_name = norm_text(row.iloc[group_idx])
-        
+
         # 추가 열 데이터 가져오기 (있는 경우, 예: M열)
         extra_data = ""
         if extra_col_idx is not None and extra_col_idx < len(row):
             extra_data = norm_text(row.iloc[extra_col_idx])
-        
-        if track_e08886:
-            print(f"\n[디버그] === E08886 추적 시작 ===")
-            print(f"원본 로그인ID 값: {repr(login_id_raw)} (타입: {type(login_id_raw)})")
-            print(f"정규화된 로그인ID: '{login_id}'")
-            print(f"기업명: '{company}', 매장명: '{store}'")
-            print(f"최근로그인시간: '{recent_login}'")
-            if group_name:
-                print(f"그룹명: '{group_name}'")
 
         # 업체별: 기업명 매칭
         if vendor.company_value and company != vendor.company_value:
             excluded_company += 1
-            if debug or track_e08886:
-                reason = f"기업명 불일치 제외: 기업명='{company}', 기대값='{vendor.company_value}', 매장명='{store}'"
-                print(f"[디버그] {reason}")
-                if track_e08886:
-                    print(f"[디버그] E08886이 {reason}로 제외됨")
+            if tracer:
+                tracer.row(login_id, "list.excluded", "기업명 불일치: '{company}' (기대값 '{expected}')",
+                           reason="company", company=company, expected=vendor.company_value, store=store)
             continue
-        
+
         # 업체별: 그룹명 매칭 (있는 경우)
         if vendor.group_value and group_idx is not None:
-            group = norm_text(row.iloc[group_idx])
-            if group != vendor.group_value:
+            if group_name != vendor.group_value:
                 excluded_group_value += 1
-                if debug:
-                    print(f"[디버그] 그룹명 불일치 제외: 그룹명='{group}', 기대값='{vendor.group_value}', 매장명='{store}'")
+                if tracer:
+                    tracer.row(login_id, "list.excluded", "그룹명 불일치: '{group}' (기대값 '{expected}')",
+                               reason="group_value", group=group_name, expected=vendor.group_value, store=store)
                 continue
-        
+
         # 업체별: 그룹명 제외 (있는 경우)
         if vendor.group_exclude and group_idx is not None:
-            group = norm_text(row.iloc[group_idx])
-            if group in vendor.group_exclude:
+            if group_name in vendor.group_exclude:
                 excluded_group_exclude += 1
-                if debug:
-                    print(f"[디버그] 그룹명 제외 목록에 포함: 그룹명='{group}', 매장명='{store}'")
+                if tracer:
+                    tracer.row(login_id, "list.excluded", "그룹명 제외 목록에 포함: '{group}'",
+                               reason="group_exclude", group=group_name, store=store)
                 continue
 
         # 업체별: 월 필터링 (있는 경우) - month_value로 시작하는 데이터만 포함
@@ -398,29 +645,26 @@ def extract_stores_from_list(
             month = norm_text(row.iloc[month_idx])
             if not month.startswith(vendor.month_value):
                 excluded_month += 1
-                if debug:
-                    print(f"[디버그] 월 불일치 제외: 월='{month}', 기대값(시작): '{vendor.month_value}'로 시작해야 함, 매장명='{store}'")
+                if tracer:
+                    tracer.row(login_id, "list.excluded", "월 불일치: '{month}' ('{expected}'로 시작해야 함)",
+                               reason="month", month=month, expected=vendor.month_value, store=store)
                 continue
 
         # 공통: 최근로그인시간 비어있으면 제외
         if recent_login == "":
             excluded_no_login += 1
-            if debug or track_e08886:
-                reason = f"최근로그인시간 없음 제외: 매장명='{store}', 로그인ID='{login_id}'"
-                print(f"[디버그] {reason}")
-                if track_e08886:
-                    print(f"[디버그] E08886이 {reason}로 제외됨")
+            if tracer:
+                tracer.row(login_id, "list.excluded", "최근로그인시간 없음: 매장명='{store}'",
+                           reason="no_recent_login", store=store)
             continue
 
         # 공통: 테스트 계정 제외 (A~D 검사)
         a_to_d = row.iloc[0:4].tolist()
         if is_test_account(a_to_d):
             excluded_test += 1
-            if debug or track_e08886:
-                reason = f"테스트 계정 제외: 매장명='{store}', 로그인ID='{login_id}', A~D={a_to_d}"
-                print(f"[디버그] {reason}")
-                if track_e08886:
-                    print(f"[디버그] E08886이 {reason}로 제외됨")
+            if tracer:
+                tracer.row(login_id, "list.excluded", "테스트 계정: 매장명='{store}'",
+                           reason="test_account", store=store, a_to_d=a_to_d)
             continue
 
         if login_id and store:
@@ -429,72 +673,41 @@ def extract_stores_from_list(
                 id_to_group[login_id] = group_name
             if extra_data:
                 id_to_extra[login_id] = extra_data
-            if track_e08886:
-                print(f"[디버그] E08886이 성공적으로 추출됨! 매장명='{store}'")
-                print(f"========================================\n")
+            if tracer:
+                tracer.row(login_id, "list.included", "추출됨: 매장명='{store}'",
+                           store=store, group=group_name, extra=extra_data)
         else:
             excluded_no_id_or_store += 1
-            if debug or track_e08886:
-                reason = f"로그인ID 또는 매장명 없음 제외: 로그인ID='{login_id}', 매장명='{store}'"
-                print(f"[디버그] {reason}")
-                if track_e08886:
-                    print(f"[디버그] E08886이 {reason}로 제외됨")
-                    print(f"========================================\n")
-
-    # 디버깅 정보 출력
-    if debug:
-        total_excluded = (excluded_company + excluded_group_value + excluded_group_exclude + 
-                         excluded_month + excluded_no_login + excluded_test + excluded_no_id_or_store)
-        print(f"\n[디버그] === {vendor.name} 업체 필터링 결과 ===")
-        print(f"전체 행 수: {total_rows}")
-        print(f"기업명 불일치로 제외: {excluded_company}")
-        if vendor.company_value:
-            print(f"  (기대 기업명: '{vendor.company_value}')")
-        print(f"그룹명 불일치로 제외: {excluded_group_value}")
-        if vendor.group_value:
-            print(f"  (기대 그룹명: '{vendor.group_value}')")
-        print(f"그룹명 제외 목록으로 제외: {excluded_group_exclude}")
-        if vendor.group_exclude:
-            print(f"  (제외 그룹명: {vendor.group_exclude})")
-        print(f"월 불일치로 제외: {excluded_month}")
-        if vendor.month_value:
-            print(f"  (기대 월: '{vendor.month_value}')")
-        print(f"최근로그인시간 없음으로 제외: {excluded_no_login}")
-        print(f"테스트 계정으로 제외: {excluded_test}")
-        print(f"로그인ID 또는 매장명 없음으로 제외: {excluded_no_id_or_store}")
-        print(f"총 제외된 행 수: {total_excluded}")
-        print(f"최종 추출된 매장 수: {len(id_to_store)}")
-        
-        if len(id_to_store) == 0:
-            print(f"\n⚠️ 경고: 추출된 매장이 0개입니다!")
-            print(f"  - 필터링 조건이 너무 엄격하거나")
-            print(f"  - 로그인ID 열({vendor.list_id_col})이 잘못 설정되었을 수 있습니다.")
-            print(f"  - 헤더 행({vendor.header_row})이 잘못 설정되었을 수 있습니다.")
-        
-        # 추출된 로그인ID 샘플 출력
-        if id_to_store:
-            sample_ids = list(id_to_store.items())[:10]
-            print(f"\n추출된 로그인ID 샘플 (처음 10개):")
-            for login_id, store_name in sample_ids:
-                print(f"  로그인ID='{login_id}' (길이: {len(login_id)}, 바이트: {repr(login_id.encode('utf-8'))}) -> 매장명='{store_name}'")
-                if login_id in id_to_group:
-                    print(f"    그룹명: '{id_to_group[login_id]}'")
-            
-            # E로 시작하는 로그인ID 찾기 (맘스터치용)
-            e_ids = [lid for lid in id_to_store.keys() if lid.upper().startswith('E')]
-            if e_ids:
-                print(f"\nE로 시작하는 로그인ID (처음 10개): {e_ids[:10]}")
-                # E08886이 있는지 확인
-                if 'E08886' in id_to_store:
-                    print(f"  ✓ 'E08886' 발견! 매장명: '{id_to_store['E08886']}'")
-                else:
-                    e08886_variants = [lid for lid in e_ids if '08886' in lid or 'E08886' in lid.upper()]
-                    if e08886_variants:
-                        print(f"  'E08886'과 유사한 ID: {e08886_variants}")
-                    else:
-                        print(f"  ✗ 'E08886'을 찾을 수 없음")
-        
-        print(f"========================================\n")
+            if tracer:
+                tracer.row(login_id, "list.excluded", "로그인ID 또는 매장명 없음: 매장명='{store}'",
+                           reason="no_id_or_store", store=store)
+
+    # 필터링 결과 요약
+    if tracer:
+        tracer.event(
+            "list.summary",
+            "{vendor_name}: 전체 {total_rows}행 중 {extracted}개 매장 추출",
+            vendor_name=vendor.name,
+            total_rows=total_rows,
+            extracted=len(id_to_store),
+            excluded={
+                "company": excluded_company,
+                "group_value": excluded_group_value,
+                "group_exclude": excluded_group_exclude,
+                "month": excluded_month,
+                "no_recent_login": excluded_no_login,
+                "test_account": excluded_test,
+                "no_id_or_store": excluded_no_id_or_store,
+            },
+            samples=lambda: [
+                {"login_id": lid, "store": name, "group": id_to_group.get(lid, "")}
+                for lid, name in list(id_to_store.items())[:10]
+            ],
+        )
+        # 추적 대상 로그인ID가 결과에 없으면 기록
+        for tracked_id in sorted(tracer.login_ids):
+            if tracked_id not in id_to_store:
+                tracer.event("list.tracked_missing", "추적 로그인ID '{login_id}'가 추출 결과에 없음", login_id=tracked_id)
 
     return id_to_store, id_to_group, id_to_extra
 
@@ -507,9 +720,62 @@ def col_letter_to_num(letter: str) -> int:
     return result
 
 
+def num_to_col_letter(n: int) -> str:
+    """1=A, 2=B, ..., 26=Z, 27=AA, ..."""
+    result = ""
+    while n > 0:
+        n, remainder = divmod(n - 1, 26)
+        result = chr(65 + remainder) + result
+    return result
+
+
 # ----------------------------
 # 4) Excel COM을 사용한 거래명세서 처리 (이미지 보존)
 # ----------------------------
+def write_column_values(ws, start_row: int, col_num: int, values: List[object]):
+    """
+    한 열에 여러 행 값을 한번에 입력 (2차원 배열 1회 대입 = COM 호출 1번)
+    """
+    if not values:
+        return
+    end_row = start_row + len(values) - 1
+    target = ws.Range(ws.Cells(start_row, col_num), ws.Cells(end_row, col_num))
+    target.Value = tuple((v,) for v in values)
+
+
+def read_range_values(ws, start_row: int, end_row: int, start_col: int, end_col: int) -> List[tuple]:
+    """
+    사각형 범위를 한번에 읽기 (COM 호출 1번) → 행별 튜플 목록
+    - 셀 하나짜리 범위는 COM이 값 하나만 돌려주므로 같은 모양으로 맞춤
+    """
+    values = ws.Range(ws.Cells(start_row, start_col), ws.Cells(end_row, end_col)).Value
+    if not isinstance(values, tuple):
+        return [(values,)]
+    return [tuple(row) for row in values]
+
+
+def find_first_empty_row(ws, col_num: int, start_row: int) -> int:
+    """
+    start_row부터 아래로 내려가며 col_num 열의 첫 빈 행 찾기
+    - UsedRange 끝까지 한번에 읽어서 메모리에서 검사 (셀마다 COM 호출하지 않음)
+    """
+    used_range = ws.UsedRange
+    last_used_row = used_range.Row + used_range.Rows.Count - 1
+    if last_used_row < start_row:
+        return start_row
+    
+    values = ws.Range(ws.Cells(start_row, col_num), ws.Cells(last_used_row, col_num)).Value
+    # 셀 1개만 읽으면 튜플이 아니라 값 자체가 반환됨
+    if not isinstance(values, tuple):
+        values = ((values,),)
+    
+    for i, row in enumerate(values):
+        val = row[0] if isinstance(row, tuple) else row
+        if norm_text(val) == "":
+            return start_row + i
+    return last_used_row + 1
+
+
 def find_id_sheet(wb, vendor: VendorConfig) -> Tuple[object, bool]:
     """
     ID 시트 찾기 (숨겨져 있어도 찾음)
@@ -533,7 +799,7 @@ def find_id_sheet(wb, vendor: VendorConfig) -> Tuple[object, bool]:
     return id_ws, was_hidden
 
 
-def read_id_sheet_mapping(wb, vendor: VendorConfig, debug: bool = False) -> Tuple[Dict[str, str], Dict[str, str]]:
+def read_id_sheet_mapping(wb, vendor: VendorConfig, tracer: Optional[BuildTracer] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
     """
     ID 시트에서 매핑 읽기
     Returns: ({매장명: 로그인ID}, {로그인ID: 매장명})
@@ -545,8 +811,8 @@ def read_id_sheet_mapping(wb, vendor: VendorConfig, debug: bool = False) -> Tupl
     id_ws, _ = find_id_sheet(wb, vendor)
     
     if id_ws is None:
-        if debug:
-            print(f"[디버그] ID 시트 '{vendor.id_sheet}'를 찾을 수 없습니다.")
+        if tracer:
+            tracer.event("id_sheet.missing", "ID 시트 '{sheet}'를 찾을 수 없음", sheet=vendor.id_sheet)
         return {}, {}
     
     store_col = col_letter_to_num(vendor.id_store_col)
@@ -558,6 +824,16 @@ def read_id_sheet_mapping(wb, vendor: VendorConfig, debug: bool = False) -> Tupl
     range_str = f"{vendor.id_store_col}{start}:{vendor.id_login_col}{end_row}"
     values = id_ws.Range(range_str).Value
     
+    return parse_id_sheet_rows(values, vendor, range_str, tracer=tracer)
+
+
+def parse_id_sheet_rows(
+    values, vendor: VendorConfig, range_str: str, tracer: Optional[BuildTracer] = None
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    ID 시트에서 읽은 (명세서 매장명, 로그인ID) 행들을 양방향 매핑으로 변환 (백엔드 공통)
+    Returns: ({매장명: 로그인ID}, {로그인ID: 매장명})
+    """
     store_to_id: Dict[str, str] = {}
     id_to_store_invoice: Dict[str, str] = {}
     empty_rows = 0
@@ -576,20 +852,19 @@ def read_id_sheet_mapping(wb, vendor: VendorConfig, debug: bool = False) -> Tupl
             store_to_id[store_name] = login_id
             id_to_store_invoice[login_id] = store_name
     
-    if debug:
-        print(f"\n[디버그] === ID 시트 매핑 읽기 결과 ===")
-        print(f"ID 시트명: {vendor.id_sheet}")
-        print(f"읽기 범위: {range_str}")
-        print(f"매장명→로그인ID 매핑 수: {len(store_to_id)}")
-        print(f"로그인ID→매장명 매핑 수: {len(id_to_store_invoice)}")
-        print(f"빈 행 수: {empty_rows}")
-        print(f"잘못된 행 수: {invalid_rows}")
-        if len(id_to_store_invoice) > 0:
-            sample_mappings = list(id_to_store_invoice.items())[:10]
-            print(f"\nID 시트의 로그인ID 샘플 (처음 10개):")
-            for login_id, store_name in sample_mappings:
-                print(f"  로그인ID='{login_id}' (길이: {len(login_id)}, 바이트: {repr(login_id.encode('utf-8'))}) -> 매장명='{store_name}'")
-        print(f"========================================\n")
+    if tracer:
+        tracer.event(
+            "id_sheet.mapping",
+            "ID 시트 '{sheet}' 매핑 {mapped}개 (빈 행 {empty_rows}, 잘못된 행 {invalid_rows})",
+            sheet=vendor.id_sheet,
+            range=range_str,
+            mapped=len(id_to_store_invoice),
+            empty_rows=empty_rows,
+            invalid_rows=invalid_rows,
+            samples=lambda: [
+                {"login_id": lid, "store": name} for lid, name in list(id_to_store_invoice.items())[:10]
+            ],
+        )
     
     return store_to_id, id_to_store_invoice
 
@@ -597,7 +872,7 @@ def read_id_sheet_mapping(wb, vendor: VendorConfig, debug: bool = False) -> Tupl
 def get_existing_login_ids_dynamic(
     ws, vendor: VendorConfig, store_to_id: Dict[str, str], 
     data_start_row: int, protected_row: Optional[int],
-    debug: bool = False
+    tracer: Optional[BuildTracer] = None
 ) -> Tuple[Set[str], List[str]]:
     """
     상세내역 시트의 기존 매장명들을 ID 시트 매핑으로 로그인ID로 변환 (동적 레이아웃)
@@ -611,6 +886,17 @@ def get_existing_login_ids_dynamic(
     range_str = f"{vendor.store_col_letter}{start}:{vendor.store_col_letter}{end_row}"
     values = ws.Range(range_str).Value
     
+    return map_store_names_to_ids(values, store_to_id, tracer=tracer)
+
+
+def map_store_names_to_ids(
+    values, store_to_id: Dict[str, str], tracer: Optional[BuildTracer] = None
+) -> Tuple[Set[str], List[str]]:
+    """
+    상세내역 매장명 열 값들을 ID 시트 매핑으로 로그인ID로 변환 (백엔드 공통)
+    - 첫 빈 셀에서 중단
+    Returns: (기존 로그인ID set, 기존 매장명 리스트)
+    """
     existing_ids: Set[str] = set()
     existing_store_names: List[str] = []  # 기존 매장명 목록
     unmapped_stores: List[str] = []  # 매핑되지 않은 매장명
@@ -628,21 +914,16 @@ def get_existing_login_ids_dynamic(
                 existing_ids.add(login_id)
             else:
                 unmapped_stores.append(store_name)
-                if debug:
-                    print(f"[디버그] 매핑 실패: 상세내역 매장명='{store_name}' (ID 시트에 매핑 없음)")
-    
-    if debug:
-        print(f"\n[디버그] === 상세내역 시트 매장명→로그인ID 변환 ===")
-        print(f"읽은 매장명 수: {len(existing_store_names)}")
-        print(f"매핑 성공한 로그인ID 수: {len(existing_ids)}")
-        print(f"매핑 실패한 매장명 수: {len(unmapped_stores)}")
-        if unmapped_stores:
-            print(f"매핑 실패한 매장명 샘플 (처음 5개): {unmapped_stores[:5]}")
-        if existing_ids:
-            print(f"매핑된 로그인ID 샘플 (처음 5개): {list(existing_ids)[:5]}")
-        if store_to_id:
-            print(f"ID 시트 매핑의 매장명 샘플 (처음 5개): {list(store_to_id.keys())[:5]}")
-        print(f"========================================\n")
+    
+    if tracer:
+        tracer.event(
+            "invoice.store_mapping",
+            "상세내역 매장명 {read}개 중 {mapped}개 로그인ID 매핑 (실패 {unmapped}개)",
+            read=len(existing_store_names),
+            mapped=len(existing_ids),
+            unmapped=len(unmapped_stores),
+            unmapped_stores=unmapped_stores,
+        )
     
     return existing_ids, existing_store_names
 
@@ -667,25 +948,21 @@ def add_to_id_sheet(wb, vendor: VendorConfig, new_ids: List[str], list_store_nam
     login_col = col_letter_to_num(vendor.id_login_col)        # 로그인ID
     list_store_col = col_letter_to_num(vendor.id_list_store_col)  # 전체리스트 매장명
     
-    # 마지막 데이터 행 찾기 (로그인ID 열 기준으로 찾기)
-    start = vendor.id_start_row
-    r = start
-    while True:
-        val = id_ws.Cells(r, login_col).Value
-        if norm_text(val) == "":
-            break
-        r += 1
+    # 마지막 데이터 행 찾기 (로그인ID 열 기준, 한번에 읽기)
+    r = find_first_empty_row(id_ws, login_col, vendor.id_start_row)
+    count = min(len(new_ids), len(list_store_names))
+    if count == 0:
+        return
     
-    # 새 매장 추가
-    for i, (login_id, list_store) in enumerate(zip(new_ids, list_store_names)):
-        # 전체리스트 매장명 입력 (주스샵 매장명) - A열
-        id_ws.Cells(r + i, list_store_col).Value = list_store
-        # 명세서 매장명은 비워둠 (id_store_col) - B열
-        id_ws.Cells(r + i, store_col).Value = ""
-        # 로그인ID 입력 (텍스트 형식) - C열
-        login_cell = id_ws.Cells(r + i, login_col)
-        login_cell.NumberFormat = "@"  # 텍스트 형식
-        login_cell.Value = str(login_id)
+    # 새 매장 추가 (열마다 배열 1회 대입)
+    # 전체리스트 매장명 입력 (주스샵 매장명) - A열
+    write_column_values(id_ws, r, list_store_col, list(list_store_names[:count]))
+    # 명세서 매장명은 비워둠 (id_store_col) - B열
+    write_column_values(id_ws, r, store_col, [""] * count)
+    # 로그인ID 입력 (텍스트 형식) - C열: 서식을 먼저 범위 전체에 한번 적용
+    login_range = id_ws.Range(id_ws.Cells(r, login_col), id_ws.Cells(r + count - 1, login_col))
+    login_range.NumberFormat = "@"  # 텍스트 형식
+    write_column_values(id_ws, r, login_col, [str(login_id) for login_id in new_ids[:count]])
 
 
 def hide_id_sheet(wb, vendor: VendorConfig):
@@ -748,14 +1025,17 @@ def write_excluded_stores_list(
     start_row = supply_cell_row + 3
     
     # 헤더 작성
-    ws.Cells(start_row, supply_cell_col).Value = "※ 제외된 매장 (전체리스트에 없음)"
-    ws.Cells(start_row, supply_cell_col).Font.Bold = True
-    ws.Cells(start_row, supply_cell_col).Font.Color = 0x0000FF  # 빨간색 (BGR 형식)
+    header_cell = ws.Cells(start_row, supply_cell_col)
+    header_cell.Value = "※ 제외된 매장 (전체리스트에 없음)"
+    header_cell.Font.Bold = True
+    
+    # 제외된 매장 목록 작성 (한번에 입력)
+    lines = [f"- {store_name}" for store_name in sorted(excluded_stores)]
+    write_column_values(ws, start_row + 1, supply_cell_col, lines)
     
-    # 제외된 매장 목록 작성
-    for i, store_name in enumerate(sorted(excluded_stores)):
-        ws.Cells(start_row + 1 + i, supply_cell_col).Value = f"- {store_name}"
-        ws.Cells(start_row + 1 + i, supply_cell_col).Font.Color = 0x0000FF  # 빨간색
+    # 헤더 + 목록 전체에 빨간색 한번에 적용
+    list_range = ws.Range(header_cell, ws.Cells(start_row + len(lines), supply_cell_col))
+    list_range.Font.Color = 0x0000FF  # 빨간색 (BGR 형식)
 
 
 def detect_table_layout(ws, vendor: VendorConfig) -> Tuple[int, int, int]:
@@ -901,6 +1181,16 @@ def read_existing_stores_via_com_dynamic(
     range_str = f"{vendor.store_col_letter}{start}:{vendor.store_col_letter}{end_row}"
     values = ws.Range(range_str).Value
     
+    existing_normalized, last_data_row = scan_store_column(values, start)
+    return existing_normalized, last_data_row, protected_row
+
+
+def scan_store_column(values, start: int) -> Tuple[Set[str], int]:
+    """
+    매장명 열 값들에서 정규화된 매장명과 마지막 데이터 행 계산 (백엔드 공통)
+    - 첫 빈 셀에서 중단
+    Returns: (정규화된 매장명 set, 마지막 데이터 행 번호)
+    """
     existing_normalized: Set[str] = set()
     last_data_row = start - 1
     
@@ -913,7 +1203,7 @@ def read_existing_stores_via_com_dynamic(
             existing_normalized.add(normalize_store_name(text))
             last_data_row = start + i
     
-    return existing_normalized, last_data_row, protected_row
+    return existing_normalized, last_data_row
 
 
 def insert_stores_via_com_dynamic(
@@ -925,7 +1215,7 @@ def insert_stores_via_com_dynamic(
     protected_row: Optional[int] = None,
     new_groups: Optional[List[str]] = None,
     new_extra: Optional[List[str]] = None,
-    debug: bool = False,
+    tracer: Optional[BuildTracer] = None,
     progress_callback: Optional[Callable[[int, int, str], None]] = None
 ):
     """
@@ -961,81 +1251,57 @@ def insert_stores_via_com_dynamic(
         progress_callback(20, total, f"행 내용 복사 중... ({total}개)")
     
     # 테이블 범위만 복사 (동적으로 감지된 열 범위)
+    # 템플릿 행 1줄을 삽입된 블록 전체에 한번에 붙여넣기 (행마다 PasteSpecial 하지 않음)
     if template_row:
-        # 열 번호를 문자로 변환
-        def num_to_col_letter(n):
-            result = ""
-            while n > 0:
-                n, remainder = divmod(n - 1, 26)
-                result = chr(65 + remainder) + result
-            return result
-        
         start_col_letter = num_to_col_letter(table_start_col)
         end_col_letter = num_to_col_letter(table_end_col)
         
         source_range = ws.Range(f"{start_col_letter}{template_row}:{end_col_letter}{template_row}")
-        source_range.Copy()
-        for i in range(total):
-            dest_range = ws.Range(f"{start_col_letter}{insert_row + i}:{end_col_letter}{insert_row + i}")
-            # xlPasteAll = -4104 (전체 붙여넣기: 서식 + 값 + 수식)
-            dest_range.PasteSpecial(-4104)
-    
-    # 클립보드 모드 해제
-    try:
-        ws.Application.CutCopyMode = False
-    except:
-        pass
+        dest_range = ws.Range(f"{start_col_letter}{insert_row}:{end_col_letter}{insert_row + total - 1}")
+        # Destination 지정 복사 = 전체 붙여넣기(서식 + 값 + 수식)와 같지만 클립보드를 거치지 않음
+        # (여러 Excel 인스턴스가 동시에 돌 때 클립보드를 서로 덮어쓰는 문제 방지)
+        source_range.Copy(Destination=dest_range)
     
     if progress_callback:
         progress_callback(50, total, f"매장명 입력 중... ({total}개)")
     
-        # 매장명만 교체
-    for i, store in enumerate(new_stores):
-        ws.Cells(insert_row + i, col_num).Value = store
-        
-        if progress_callback and (i + 1) % 10 == 0:
-            pct = 50 + int((i + 1) / total * 30)
-            progress_callback(pct, total, f"매장명 입력 중: {i + 1}/{total}")
+    # 매장명만 교체 (열 단위로 한번에 입력)
+    write_column_values(ws, insert_row, col_num, new_stores)
+    
+    if progress_callback:
+        progress_callback(70, total, f"매장명 입력 완료: {total}/{total}")
     
     # 그룹명 입력 (group_name_target_col이 설정된 경우)
     if vendor.group_name_target_col and new_groups:
         group_col_num = col_letter_to_num(vendor.group_name_target_col)
-        if debug:
-            print(f"\n[디버그] === 그룹명 입력 ===")
-            print(f"그룹명 저장 열: {vendor.group_name_target_col} (열 번호: {group_col_num})")
-            print(f"추가할 매장 수: {len(new_stores)}")
-            print(f"그룹명 수: {len(new_groups)}")
-            if new_groups:
-                print(f"그룹명 샘플 (처음 5개): {[g for g in new_groups[:5] if g]}")
-            print(f"========================================\n")
+        if tracer:
+            tracer.event(
+                "insert.groups",
+                "그룹명 {count}개 → {col}열",
+                col=vendor.group_name_target_col, count=len(new_groups),
+                samples=lambda: [g for g in new_groups[:5] if g],
+            )
         if progress_callback:
             progress_callback(75, total, f"그룹명 입력 중... ({total}개)")
         
-        for i, group in enumerate(new_groups):
-            if i < len(new_stores):  # 매장 수와 그룹 수가 일치하는지 확인
-                ws.Cells(insert_row + i, group_col_num).Value = group
-                if debug and group:
-                    print(f"[디버그] 그룹명 입력: 행={insert_row + i}, 열={group_col_num}, 그룹명='{group}'")
+        # 매장 수와 그룹 수가 일치하는 범위까지만 입력
+        write_column_values(ws, insert_row, group_col_num, list(new_groups[:total]))
     
     # 추가 열 데이터 입력 (extra_col_target이 설정된 경우)
     if vendor.extra_col_target and new_extra:
         extra_col_num = col_letter_to_num(vendor.extra_col_target)
-        if debug:
-            print(f"\n[디버그] === 추가 열 데이터 입력 ===")
-            print(f"추가 열 저장 위치: {vendor.extra_col_target} (열 번호: {extra_col_num})")
-            print(f"추가할 매장 수: {len(new_stores)}")
-            print(f"추가 열 데이터 수: {len(new_extra)}")
-            if new_extra:
-                print(f"추가 열 데이터 샘플 (처음 5개): {[e for e in new_extra[:5] if e]}")
-            print(f"========================================\n")
+        if tracer:
+            tracer.event(
+                "insert.extra",
+                "추가 열 데이터 {count}개 → {col}열",
+                col=vendor.extra_col_target, count=len(new_extra),
+                samples=lambda: [e for e in new_extra[:5] if e],
+            )
         if progress_callback:
             progress_callback(77, total, f"추가 열 데이터 입력 중... ({total}개)")
         
-        for i, extra_data in enumerate(new_extra):
-            if i < len(new_stores):  # 매장 수와 데이터 수가 일치하는지 확인
-                ws.Cells(insert_row + i, extra_col_num).Value = extra_data
-                if debug and extra_data:
-                    print(f"[디버그] 추가 열 데이터 입력: 행={insert_row + i}, 열={extra_col_num}, 데이터='{extra_data}'")
+        # 매장 수와 데이터 수가 일치하는 범위까지만 입력
+        write_column_values(ws, insert_row, extra_col_num, list(new_extra[:total]))
     
     if progress_callback:
         progress_callback(80, total, "테두리 적용 중...")
@@ -1045,388 +1311,1743 @@ def insert_stores_via_com_dynamic(
 
 
 # ----------------------------
-# 5) 실행 함수 (Excel COM 사용)
+# 4-1) 거래명세서 백엔드 (Excel COM / openpyxl)
 # ----------------------------
-def run_build(
-    list_path: str,
-    invoice_path: str,
-    vendor_key: str,
-    output_path: str,
-    progress_callback: Optional[Callable[[int, int, str], None]] = None,
-) -> Tuple[List[str], str, int, List[str]]:
+class InvoiceBackend(ABC):
     """
-    Returns: (missing_stores, actual_output_path, existing_count, excluded_stores)
-    - missing_stores: 새로 추가된 매장 목록
-    - excluded_stores: 명세서에 있지만 전체리스트에 없어서 제외된 매장 목록
+    거래명세서 읽기/쓰기 백엔드 공통 인터페이스
+    - run_build는 이 인터페이스만 사용 (업체 설정의 backend로 선택)
+    - 읽기: ID 시트, 테이블 레이아웃, 보호 테이블/공급가액 위치, 기존 매장
+    - 쓰기: 행 삽입, 테두리, ID 시트 추가, 제외 매장 목록, 날짜 셀, 저장
+    - start / shutdown 말고는 모두 추상 메서드 (빠진 게 있으면 인스턴스를 만들 때 TypeError)
     """
-    import pythoncom
-    import win32com.client as win32
-    
-    # COM 초기화 (스레드에서 호출 시 필요)
-    pythoncom.CoInitialize()
-    
-    if vendor_key not in VENDOR_CONFIGS:
-        raise KeyError(f"등록되지 않은 업체야: {vendor_key}")
+    name = ""
+
+    def start(self):
+        """백엔드 준비 (Excel 실행 등)"""
+
+    def shutdown(self):
+        """백엔드 정리 (Excel 종료 등)"""
+
+    @abstractmethod
+    def open(self, invoice_path: str):
+        ...
+
+    @abstractmethod
+    def save(self, wb, output_path: str):
+        ...
+
+    @abstractmethod
+    def close_workbook(self, wb):
+        ...
+
+    @abstractmethod
+    def sheet_names(self, wb) -> List[str]:
+        ...
+
+    @abstractmethod
+    def get_sheet(self, wb, sheet_name: str):
+        ...
+
+    @abstractmethod
+    def write_date_cell(self, wb, cell: str, value: str):
+        ...
+
+    @abstractmethod
+    def find_id_sheet(self, wb, vendor: VendorConfig) -> Tuple[object, bool]:
+        ...
+
+    @abstractmethod
+    def read_id_sheet_mapping(
+        self, wb, vendor: VendorConfig, tracer: Optional[BuildTracer] = None
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        ...
+
+    @abstractmethod
+    def detect_table_layout(self, ws, vendor: VendorConfig) -> Tuple[int, int, int]:
+        ...
+
+    @abstractmethod
+    def read_existing_stores(
+        self, ws, vendor: VendorConfig, data_start_row: int, table_end_col: int
+    ) -> Tuple[Set[str], int, Optional[int]]:
+        ...
+
+    @abstractmethod
+    def get_existing_login_ids(
+        self, ws, vendor: VendorConfig, store_to_id: Dict[str, str],
+        data_start_row: int, protected_row: Optional[int], tracer: Optional[BuildTracer] = None
+    ) -> Tuple[Set[str], List[str]]:
+        ...
+
+    @abstractmethod
+    def find_supply_amount_cell(self, ws, vendor: VendorConfig, start_row: int) -> Optional[Tuple[int, int]]:
+        ...
+
+    @abstractmethod
+    def read_block(self, ws, start_row: int, end_row: int, start_col: int, end_col: int) -> List[tuple]:
+        """사각형 범위 값을 행별 튜플 목록으로 한번에 읽기"""
+
+    @abstractmethod
+    def insert_stores(self, ws, vendor: VendorConfig, new_stores: List[str], *args, **kwargs):
+        ...
+
+    @abstractmethod
+    def write_excluded_stores_list(
+        self, ws, vendor: VendorConfig, excluded_stores: List[str],
+        supply_cell_row: int, supply_cell_col: int
+    ):
+        ...
+
+    @abstractmethod
+    def add_to_id_sheet(self, wb, vendor: VendorConfig, new_ids: List[str], list_store_names: List[str]):
+        ...
+
+    @abstractmethod
+    def hide_id_sheet(self, wb, vendor: VendorConfig):
+        ...
+
+
+class ComInvoiceBackend(InvoiceBackend):
+    """
+    Excel COM 백엔드 (Windows + Excel 필요, 이미지/차트/서식 완전 보존)
+    - 위의 COM 함수들을 그대로 사용
+    """
+    name = "com"
 
-    vendor = VENDOR_CONFIGS[vendor_key]
+    def __init__(self, separate_instance: bool = False):
+        self.excel = None
+        self._com_initialized = False
+        # True면 DispatchEx로 전용 Excel 프로세스 생성 (병렬 작업자마다 하나씩)
+        self.separate_instance = separate_instance
 
-    if progress_callback:
-        progress_callback(0, 100, "전체리스트 파일 읽는 중...")
+    def start(self):
+        import pythoncom
+        import win32com.client as win32
 
-    # 1) 전체리스트에서 {로그인ID: 매장명}, {로그인ID: 그룹명} 추출 (디버깅 모드: vendor.name에 "바빈스커피" 또는 "맘스터치" 포함 시)
-    debug_mode = "바빈스커피" in vendor.name or "맘스터치" in vendor.name
-    id_to_store, id_to_group, id_to_extra = extract_stores_from_list(list_path, vendor, debug=debug_mode)
-    
-    # 디버깅 모드일 때 콘솔에 정보 출력 (GUI에서는 보이지 않으므로 상태 메시지에도 표시)
-    if debug_mode and progress_callback:
-        progress_callback(5, 100, f"전체리스트에서 {len(id_to_store)}개 매장 추출 완료 (디버깅 정보는 콘솔 확인)")
+        # COM 초기화 (스레드에서 호출 시 필요)
+        pythoncom.CoInitialize()
+        self._com_initialized = True
 
-    if progress_callback:
-        progress_callback(20, 100, "거래명세서 파일 여는 중...")
+        dispatch = win32.DispatchEx if self.separate_instance else win32.Dispatch
+        self.excel = com_profiler.wrap(dispatch('Excel.Application'), "Excel")
+        self.excel.Visible = False           # 엑셀 창 숨김 (헤드리스)
+        self.excel.DisplayAlerts = False     # 경고창 숨김
+        self.excel.ScreenUpdating = False    # 화면 업데이트 비활성화 (속도 향상)
 
-    # 2) Excel COM으로 거래명세서 열기
-    excel = None
-    wb = None
-    try:
-        excel = win32.Dispatch('Excel.Application')
-        excel.Visible = False           # 엑셀 창 숨김 (헤드리스)
-        excel.DisplayAlerts = False     # 경고창 숨김
-        excel.ScreenUpdating = False    # 화면 업데이트 비활성화 (속도 향상)
-        
-        # 절대 경로로 변환
-        invoice_path = os.path.abspath(invoice_path)
-        output_path = os.path.abspath(output_path)
-        
+    def shutdown(self):
+        try:
+            if self.excel:
+                self.excel.ScreenUpdating = True  # 복원
+                self.excel.Quit()
+        except:
+            pass
+        self.excel = None
+        com_profiler.print_report()
+        if self._com_initialized:
+            import pythoncom
+            pythoncom.CoUninitialize()
+            self._com_initialized = False
+
+    def open(self, invoice_path: str):
         # 원본 파일을 Excel로 직접 열기 (ReadOnly로 열어서 파일 잠금 방지)
         # ReadOnly=True로 열면 원본 파일이 잠기지 않아 SaveAs가 더 안전하게 동작
-        wb = excel.Workbooks.Open(invoice_path, ReadOnly=True)
-        
-        # 날짜 셀에 오늘 날짜 입력 (첫번째 시트)
-        if vendor.date_cell:
-            from datetime import datetime
-            today_str = datetime.now().strftime("%Y-%m-%d")
-            first_sheet = wb.Sheets(1)  # 첫번째 시트
-            first_sheet.Range(vendor.date_cell).Value = today_str
-            if progress_callback:
-                progress_callback(22, 100, f"날짜 입력: {today_str} → {vendor.date_cell}")
-        
-        # 처리할 시트 목록 결정 (invoice_sheets가 있으면 여러 시트, 없으면 단일 시트)
-        sheet_names_to_process = vendor.invoice_sheets if vendor.invoice_sheets else [vendor.invoice_sheet]
-        total_sheets = len(sheet_names_to_process)
+        return self.excel.Workbooks.Open(invoice_path, ReadOnly=True)
 
-        # 4) ID 시트 찾기 (숨겨져 있으면 임시로 보이게)
-        id_ws, id_sheet_was_hidden = find_id_sheet(wb, vendor)
-        
-        # ID 시트에서 매핑 읽기 (양방향)
-        # store_to_id: {매장명: 로그인ID}, id_to_store_invoice: {로그인ID: 명세서 매장명}
-        store_to_id, id_to_store_invoice = read_id_sheet_mapping(wb, vendor, debug=debug_mode)
-        
-        # 디버깅: ID 시트의 로그인ID와 전체리스트의 로그인ID 비교
-        if debug_mode:
-            id_sheet_ids = set(id_to_store_invoice.keys())
-            list_ids = set(id_to_store.keys())
-            matched_ids = id_sheet_ids & list_ids  # 교집합
-            only_in_sheet = id_sheet_ids - list_ids  # ID 시트에만 있는 것
-            only_in_list = list_ids - id_sheet_ids  # 전체리스트에만 있는 것
-            
-            print(f"\n[디버그] === 로그인ID 매칭 분석 ===")
-            print(f"ID 시트의 로그인ID 수: {len(id_sheet_ids)}")
-            print(f"전체리스트의 로그인ID 수: {len(list_ids)}")
-            print(f"매칭된 로그인ID 수: {len(matched_ids)}")
-            print(f"ID 시트에만 있는 로그인ID 수: {len(only_in_sheet)}")
-            print(f"전체리스트에만 있는 로그인ID 수: {len(only_in_list)}")
-            
-            # 전체리스트 로그인ID 샘플 (상세)
-            if list_ids:
-                sample_list_ids = list(list_ids)[:10]
-                print(f"\n전체리스트 로그인ID 샘플 (처음 10개):")
-                for lid in sample_list_ids:
-                    print(f"  '{lid}' (길이: {len(lid)}, 바이트: {repr(lid.encode('utf-8'))})")
-            
-            # ID 시트 로그인ID 샘플 (상세)
-            if id_sheet_ids:
-                sample_sheet_ids = list(id_sheet_ids)[:10]
-                print(f"\nID 시트 로그인ID 샘플 (처음 10개):")
-                for lid in sample_sheet_ids:
-                    print(f"  '{lid}' (길이: {len(lid)}, 바이트: {repr(lid.encode('utf-8'))})")
-            
-            # 매칭 안 되는 경우 상세 비교
-            if only_in_list and id_sheet_ids:
-                print(f"\n[매칭 실패 분석] 전체리스트에만 있는 로그인ID (처음 5개):")
-                for lid in list(only_in_list)[:5]:
-                    # 유사한 ID 찾기 (대소문자 무시, 공백 제거)
-                    lid_lower = lid.lower().strip()
-                    similar = [sid for sid in id_sheet_ids if sid.lower().strip() == lid_lower]
-                    if similar:
-                        print(f"  '{lid}' -> 유사한 ID 발견: {similar}")
-                    else:
-                        # 부분 일치 찾기
-                        partial = [sid for sid in id_sheet_ids if lid_lower in sid.lower() or sid.lower() in lid_lower]
-                        if partial:
-                            print(f"  '{lid}' -> 부분 일치: {partial[:3]}")
-                        else:
-                            print(f"  '{lid}' -> 매칭 없음")
-            
-            if only_in_sheet and list_ids:
-                print(f"\n[매칭 실패 분석] ID 시트에만 있는 로그인ID (처음 5개):")
-                for lid in list(only_in_sheet)[:5]:
-                    lid_lower = lid.lower().strip()
-                    similar = [sid for sid in list_ids if sid.lower().strip() == lid_lower]
-                    if similar:
-                        print(f"  '{lid}' -> 유사한 ID 발견: {similar}")
-                    else:
-                        partial = [sid for sid in list_ids if lid_lower in sid.lower() or sid.lower() in lid_lower]
-                        if partial:
-                            print(f"  '{lid}' -> 부분 일치: {partial[:3]}")
-                        else:
-                            print(f"  '{lid}' -> 매칭 없음")
-            
-            if matched_ids:
-                print(f"\n매칭된 로그인ID 샘플 (처음 5개): {list(matched_ids)[:5]}")
-            print(f"========================================\n")
-        
-        # 전체 기존 매장 수, 추가 매장 수, 제외 매장 수 추적
-        total_existing_count = 0
-        all_missing_stores = []
-        all_missing_ids = []
-        all_missing_list_stores = []  # 전체리스트 매장명 (주스샵 매장명)
-        all_excluded_stores = []  # 제외된 매장 (전체리스트에 없음)
-        
-        # 각 시트 처리
-        for sheet_idx, sheet_name in enumerate(sheet_names_to_process):
-            sheet_progress_base = 20 + int(sheet_idx / total_sheets * 60)  # 20% ~ 80%
-            
-            if progress_callback:
-                progress_callback(sheet_progress_base, 100, f"시트 '{sheet_name}' 처리 중... ({sheet_idx + 1}/{total_sheets})")
-            
-            # 시트 찾기
-            ws = None
-            for sheet in wb.Sheets:
-                if sheet.Name == sheet_name:
-                    ws = sheet
-                    break
-            
-            if ws is None:
-                all_sheet_names = [s.Name for s in wb.Sheets]
-                wb.Close(False)
-                raise KeyError(f"시트 '{sheet_name}'가 없어. 현재 시트: {all_sheet_names}")
+    def save(self, wb, output_path: str):
+        # FileFormat: 51 = xlsx, 56 = xls
+        excel = self.excel
+        excel.DisplayAlerts = False  # 덮어쓰기 확인 대화상자 비활성화
+        excel.EnableEvents = False  # 이벤트 비활성화 (저장 속도 향상)
+        try:
+            # 변경사항 강제 저장
+            wb.SaveAs(output_path, FileFormat=51, ConflictResolution=1)  # ConflictResolution=1: 로컬 변경사항 유지
+        except Exception as save_err:
+            # SaveAs 실패 시 임시 파일로 저장 후 이동 시도
+            import tempfile
+            temp_dir = tempfile.gettempdir()
+            temp_file = os.path.join(temp_dir, f"temp_invoice_{os.getpid()}.xlsx")
+            try:
+                wb.SaveAs(temp_file, FileFormat=51)
+                # 임시 파일을 목적지로 이동
+                if os.path.exists(output_path):
+                    try:
+                        os.remove(output_path)
+                    except:
+                        pass
+                shutil.move(temp_file, output_path)
+            except Exception as move_err:
+                raise Exception(f"파일 저장 실패: {str(save_err)}\n임시 파일 이동도 실패: {str(move_err)}")
+        finally:
+            excel.DisplayAlerts = True  # 경고 복원
+            excel.EnableEvents = True  # 이벤트 복원
+
+    def close_workbook(self, wb):
+        wb.Close(False)
+
+    def sheet_names(self, wb) -> List[str]:
+        return [s.Name for s in wb.Sheets]
+
+    def get_sheet(self, wb, sheet_name: str):
+        for sheet in wb.Sheets:
+            if sheet.Name == sheet_name:
+                return sheet
+        return None
 
-            # 테이블 레이아웃 동적 감지 (헤더 행, 테이블 너비)
-            data_start_row, table_start_col, table_end_col = detect_table_layout(ws, vendor)
-            
-            if debug_mode:
-                print(f"\n[디버그] === [{sheet_name}] 테이블 레이아웃 감지 ===")
-                print(f"매장명 열: {vendor.store_col_letter}")
-                print(f"헤더 텍스트: {vendor.table_header_text}")
-                print(f"데이터 시작 행: {data_start_row}")
-                print(f"테이블 시작 열: {table_start_col}")
-                print(f"테이블 끝 열: {table_end_col}")
-                print(f"========================================\n")
-            
-            if progress_callback:
-                progress_callback(sheet_progress_base + 5, 100, f"[{sheet_name}] 테이블: {data_start_row}행, {table_start_col}~{table_end_col}열")
+    def write_date_cell(self, wb, cell: str, value: str):
+        first_sheet = wb.Sheets(1)  # 첫번째 시트
+        first_sheet.Range(cell).Value = value
 
-            # 보호 테이블 찾기
-            _, last_data_row, protected_row = read_existing_stores_via_com_dynamic(
-                ws, vendor, data_start_row, table_end_col
-            )
-            
-            if debug_mode:
-                print(f"\n[디버그] === [{sheet_name}] 기존 데이터 분석 ===")
-                print(f"마지막 데이터 행: {last_data_row}")
-                print(f"보호 테이블 행: {protected_row if protected_row else '없음'}")
-                print(f"========================================\n")
-
-            # 기존 매장의 로그인ID 확인
-            # 1) 상세내역 시트의 매장명으로 ID 시트 매핑에서 찾기
-            existing_ids_from_stores, existing_store_names = get_existing_login_ids_dynamic(
-                ws, vendor, store_to_id, data_start_row, protected_row, debug=debug_mode
-            )
-            
-            # 2) ID 시트의 모든 로그인ID를 기존 매장으로 추가 (매장명 매핑 실패를 대비)
-            # id_to_store_invoice에는 ID 시트의 모든 로그인ID가 있음
-            existing_ids = existing_ids_from_stores.copy()
-            existing_ids.update(id_to_store_invoice.keys())  # ID 시트의 모든 로그인ID 추가
-            
-            total_existing_count += len(existing_ids)
-            
-            # 디버깅: 기존 매장 정보
-            if debug_mode:
-                print(f"\n[디버그] === [{sheet_name}] 기존 매장 분석 ===")
-                print(f"상세내역 시트의 기존 매장명 수: {len(existing_store_names)}")
-                print(f"매장명 매핑으로 찾은 로그인ID 수: {len(existing_ids_from_stores)}")
-                print(f"ID 시트의 전체 로그인ID 수: {len(id_to_store_invoice)}")
-                print(f"최종 기존 로그인ID 수 (ID 시트 전체 포함): {len(existing_ids)}")
-                if existing_store_names:
-                    print(f"기존 매장명 샘플 (처음 5개): {existing_store_names[:5]}")
-                if existing_ids:
-                    print(f"기존 로그인ID 샘플 (처음 5개): {list(existing_ids)[:5]}")
-                print(f"========================================\n")
-            
-            # 명세서에 있지만 전체리스트에 없는 매장 찾기
-            excluded_stores = []
-            for store_name in existing_store_names:
-                login_id = store_to_id.get(store_name, "")
-                if login_id:
-                    # 로그인ID가 전체리스트에 있는지 확인
-                    if login_id not in id_to_store:
-                        excluded_stores.append(store_name)
-                        if debug_mode:
-                            print(f"\n[디버그] === 전체리스트에 없는 매장 발견 ===")
-                            print(f"매장명: '{store_name}'")
-                            print(f"로그인ID: '{login_id}' (길이: {len(login_id)}, 바이트: {repr(login_id.encode('utf-8'))})")
-                            print(f"전체리스트에서 읽는 로그인ID 열: {vendor.list_id_col}")
-                            
-                            # 유사한 로그인ID 찾기
-                            login_id_lower = login_id.lower().strip()
-                            similar_ids = [lid for lid in id_to_store.keys() if lid.lower().strip() == login_id_lower]
-                            if similar_ids:
-                                print(f"유사한 로그인ID 발견 (대소문자/공백 차이): {similar_ids}")
-                            else:
-                                # 부분 일치 찾기
-                                partial_match = [lid for lid in id_to_store.keys() if login_id_lower in lid.lower() or lid.lower() in login_id_lower]
-                                if partial_match:
-                                    print(f"부분 일치하는 로그인ID: {partial_match[:5]}")
-                                else:
-                                    print(f"전체리스트에 완전히 다른 로그인ID입니다.")
-                                    print(f"전체리스트 로그인ID 샘플 (처음 10개): {list(id_to_store.keys())[:10]}")
-                            print(f"========================================\n")
-                else:
-                    # ID 시트에도 없는 매장 = 전체리스트에도 없음
-                    excluded_stores.append(store_name)
-                    if debug_mode:
-                        print(f"[디버그] ID 시트에 매핑이 없는 매장: 매장명='{store_name}'")
-
-            # 새로 추가할 매장 찾기 (로그인ID로 비교)
-            missing_ids = []
-            missing_stores = []
-            missing_list_stores = []  # 전체리스트 매장명 (주스샵 매장명)
-            missing_groups = []  # 그룹명
-            missing_extra = []  # 추가 열 데이터 (예: M열)
-            already_exists_count = 0
-            not_found_details = []  # 매칭 실패 상세 정보
-            
-            for login_id, store_name_from_list in id_to_store.items():
-                if login_id not in existing_ids:
-                    # 매칭 실패 상세 분석
-                    if debug_mode:
-                        # 대소문자 무시 비교
-                        login_id_lower = login_id.lower().strip()
-                        similar_in_existing = [eid for eid in existing_ids if eid.lower().strip() == login_id_lower]
-                        if similar_in_existing:
-                            not_found_details.append(f"로그인ID '{login_id}' -> 대소문자/공백 차이로 매칭 실패 (유사: {similar_in_existing})")
-                        else:
-                            # 부분 일치 확인
-                            partial_match = [eid for eid in existing_ids if login_id_lower in eid.lower() or eid.lower() in login_id_lower]
-                            if partial_match:
-                                not_found_details.append(f"로그인ID '{login_id}' -> 부분 일치 발견 (유사: {partial_match[:2]})")
-                            else:
-                                not_found_details.append(f"로그인ID '{login_id}' -> 완전히 다른 ID")
-                    
-                    store_name = id_to_store_invoice.get(login_id, store_name_from_list)
-                    missing_ids.append(login_id)
-                    missing_stores.append(store_name)
-                    missing_list_stores.append(store_name_from_list)  # 전체리스트 매장명
-                    missing_groups.append(id_to_group.get(login_id, ""))  # 그룹명 (없으면 빈 문자열)
-                    missing_extra.append(id_to_extra.get(login_id, ""))  # 추가 열 데이터 (없으면 빈 문자열)
-                else:
-                    already_exists_count += 1
-                    if debug_mode:
-                        # 이미 있는 매장인데 왜 추가하려고 하는지 확인
-                        print(f"[디버그] 이미 존재하는 매장 (추가 안 함): 로그인ID='{login_id}', 전체리스트 매장명='{store_name_from_list}', 명세서 매장명='{id_to_store_invoice.get(login_id, store_name_from_list)}'")
-            
-            if debug_mode:
-                print(f"\n[디버그] === [{sheet_name}] 추가할 매장 분석 ===")
-                print(f"이미 존재하는 매장 수: {already_exists_count}")
-                print(f"새로 추가할 매장 수: {len(missing_ids)}")
-                if missing_stores:
-                    print(f"추가할 매장명 샘플 (처음 5개): {missing_stores[:5]}")
-                    if missing_groups and any(missing_groups):
-                        print(f"추가할 그룹명 샘플 (처음 5개): {[g for g in missing_groups[:5] if g]}")
-                
-                # 매칭 실패 상세 정보 출력
-                if not_found_details:
-                    print(f"\n[매칭 실패 상세 분석] (처음 10개):")
-                    for detail in not_found_details[:10]:
-                        print(f"  {detail}")
-                    if len(not_found_details) > 10:
-                        print(f"  ... 외 {len(not_found_details) - 10}개")
-                
-                print(f"========================================\n")
-            
-            # 매장명 기준으로 정렬
-            if missing_stores:
-                sorted_pairs = sorted(zip(missing_stores, missing_ids, missing_list_stores, missing_groups, missing_extra), key=lambda x: x[0])
-                missing_stores, missing_ids, missing_list_stores, missing_groups, missing_extra = zip(*sorted_pairs)
-                missing_stores = list(missing_stores)
-                missing_ids = list(missing_ids)
-                missing_list_stores = list(missing_list_stores)
-                missing_groups = list(missing_groups)
-                missing_extra = list(missing_extra)
+    def find_id_sheet(self, wb, vendor):
+        return find_id_sheet(wb, vendor)
 
-            if progress_callback:
-                progress_callback(sheet_progress_base + 10, 100, f"[{sheet_name}] 추가할 매장: {len(missing_stores)}개")
-
-            # 새 매장 추가 (행 삽입 방식)
-            if missing_stores:
-                def make_sub_progress(base):
-                    def sub_progress(pct, total, msg):
-                        overall_pct = base + int(pct / 100 * 10)
-                        if progress_callback:
-                            progress_callback(overall_pct, 100, f"[{sheet_name}] {msg}")
-                    return sub_progress
-                
-                insert_stores_via_com_dynamic(
-                    ws, vendor, missing_stores, last_data_row, 
-                    data_start_row, table_start_col, table_end_col,
-                    protected_row, missing_groups, missing_extra, debug_mode, make_sub_progress(sheet_progress_base + 10)
+    def read_id_sheet_mapping(self, wb, vendor, tracer=None):
+        return read_id_sheet_mapping(wb, vendor, tracer=tracer)
+
+    def detect_table_layout(self, ws, vendor):
+        return detect_table_layout(ws, vendor)
+
+    def read_existing_stores(self, ws, vendor, data_start_row, table_end_col):
+        return read_existing_stores_via_com_dynamic(ws, vendor, data_start_row, table_end_col)
+
+    def get_existing_login_ids(self, ws, vendor, store_to_id, data_start_row, protected_row, tracer=None):
+        return get_existing_login_ids_dynamic(ws, vendor, store_to_id, data_start_row, protected_row, tracer=tracer)
+
+    def find_supply_amount_cell(self, ws, vendor, start_row):
+        return find_supply_amount_cell(ws, vendor, start_row)
+
+    def read_block(self, ws, start_row, end_row, start_col, end_col):
+        return read_range_values(ws, start_row, end_row, start_col, end_col)
+
+    def insert_stores(self, ws, vendor, new_stores, *args, **kwargs):
+        return insert_stores_via_com_dynamic(ws, vendor, new_stores, *args, **kwargs)
+
+    def write_excluded_stores_list(self, ws, vendor, excluded_stores, supply_cell_row, supply_cell_col):
+        return write_excluded_stores_list(ws, vendor, excluded_stores, supply_cell_row, supply_cell_col)
+
+    def add_to_id_sheet(self, wb, vendor, new_ids, list_store_names):
+        return add_to_id_sheet(wb, vendor, new_ids, list_store_names)
+
+    def hide_id_sheet(self, wb, vendor):
+        return hide_id_sheet(wb, vendor)
+
+
+# 수식 안의 셀 참조 (예: A1, $B$12, 'Sheet 1'!C3) - 행 삽입 시 행 번호 이동용
+CELL_REF_PAT = re.compile(
+    r"(?<![A-Za-z_\d.])(?P<sheet>(?:'[^']+'|[^\s'!()=+\-*/,;:&<>^\"]+)!)?"
+    r"(?P<col>\$?[A-Z]{1,3})(?P<row_abs>\$?)(?P<row>\d+)(?![\d(A-Za-z_])"
+)
+FORMULA_STRING_PAT = re.compile(r'"[^"]*"')
+
+
+def shift_formula_rows(formula: str, sheet_title: str, insert_row: int, amount: int, same_sheet: bool) -> str:
+    """
+    행 삽입(insert_row 위치에 amount행)에 맞춰 수식의 행 참조 이동 (Excel 동작과 동일)
+    - same_sheet=True: 시트명 없는 참조 + 이 시트를 가리키는 참조 이동
+    - same_sheet=False: 이 시트를 가리키는 참조만 이동
+    - 따옴표 문자열 안은 건드리지 않음
+    - 'Sheet'!B3:B30 처럼 범위 뒤쪽 참조는 앞쪽 참조의 시트를 따름
+    """
+    previous = {"end": -1, "sheet": None}   # 바로 앞 참조의 끝 위치와 (따르는) 시트
+
+    def shift_ref(m):
+        sheet = m.group("sheet")
+        target_sheet = sheet
+        if not sheet and m.start() > 0 and m.string[m.start() - 1] == ":" and previous["end"] == m.start() - 1:
+            target_sheet = previous["sheet"]
+        previous["end"], previous["sheet"] = m.end(), target_sheet
+        if target_sheet:
+            target = target_sheet[:-1].strip("'")
+            if target != sheet_title:
+                return m.group(0)
+        elif not same_sheet:
+            return m.group(0)
+        row = int(m.group("row"))
+        if row < insert_row:
+            return m.group(0)
+        return f"{sheet or ''}{m.group('col')}{m.group('row_abs')}{row + amount}"
+
+    def shift_segment(text: str) -> str:
+        previous["end"], previous["sheet"] = -1, None
+        return CELL_REF_PAT.sub(shift_ref, text)
+
+    parts = []
+    pos = 0
+    for m in FORMULA_STRING_PAT.finditer(formula):
+        parts.append(shift_segment(formula[pos:m.start()]))
+        parts.append(m.group(0))
+        pos = m.end()
+    parts.append(shift_segment(formula[pos:]))
+    return "".join(parts)
+
+
+class OpenpyxlInvoiceBackend(InvoiceBackend):
+    """
+    openpyxl 백엔드 (순수 Python - Linux 배치 서버/병렬 실행 가능)
+    - 행 삽입 시 병합 셀, 이미지, 행 높이, 수식 참조를 Excel처럼 함께 이동
+    - 이미지 보존에는 Pillow 필요 (openpyxl이 이미지를 읽을 때 사용)
+    - 차트/도형은 openpyxl이 읽지 못하므로 그런 양식은 com 백엔드 사용
+    """
+    name = "openpyxl"
+
+    # 점선(안쪽) + 굵은 실선(바깥쪽) - COM 쪽 apply_borders_to_range와 동일
+    INNER_BORDER_STYLE = "dotted"
+    OUTER_BORDER_STYLE = "medium"
+    EXCLUDED_FONT_COLOR = "FFFF0000"  # 빨간색 (ARGB)
+
+    def open(self, invoice_path: str):
+        from openpyxl import load_workbook
+
+        if os.path.splitext(invoice_path)[1].lower() == ".xls":
+            raise ValueError(f"openpyxl 백엔드는 .xls 거래명세서를 열 수 없어. .xlsx로 변환하거나 com 백엔드를 사용해: {invoice_path}")
+        return load_workbook(invoice_path)
+
+    def save(self, wb, output_path: str):
+        wb.save(output_path)
+
+    def close_workbook(self, wb):
+        wb.close()
+
+    def sheet_names(self, wb) -> List[str]:
+        return list(wb.sheetnames)
+
+    def get_sheet(self, wb, sheet_name: str):
+        if sheet_name in wb.sheetnames:
+            return wb[sheet_name]
+        return None
+
+    def write_date_cell(self, wb, cell: str, value: str):
+        first_sheet = wb.worksheets[0]  # 첫번째 시트
+        first_sheet[cell].value = value
+
+    # ---- 읽기 ----
+    @staticmethod
+    def _read_column(ws, col_num: int, start_row: int, end_row: int) -> List[tuple]:
+        """한 열을 (값,) 튜플 목록으로 읽기 (COM Range.Value와 같은 모양)"""
+        end_row = min(end_row, ws.max_row)
+        if end_row < start_row:
+            return []
+        return list(ws.iter_rows(
+            min_row=start_row, max_row=end_row, min_col=col_num, max_col=col_num, values_only=True
+        ))
+
+    def _search_rows(self, ws, start_row: int, texts: List[str]) -> Optional[Tuple[int, int]]:
+        """start_row부터 1~14열에서 texts 중 하나를 포함하는 첫 셀 찾기"""
+        max_search = min(start_row + 2000, ws.max_row + 1)
+        max_col = min(ws.max_column, 14)
+        if max_search <= start_row:
+            return None
+        for r, row in enumerate(ws.iter_rows(
+            min_row=start_row, max_row=max_search - 1, min_col=1, max_col=max_col, values_only=True
+        ), start=start_row):
+            for c, value in enumerate(row, start=1):
+                text = norm_text(value)
+                if text and any(t in text for t in texts):
+                    return r, c
+        return None
+
+    def find_id_sheet(self, wb, vendor):
+        if not vendor.id_sheet or vendor.id_sheet not in wb.sheetnames:
+            return None, False
+        id_ws = wb[vendor.id_sheet]
+        was_hidden = id_ws.sheet_state != "visible"
+        if was_hidden:
+            id_ws.sheet_state = "visible"
+        return id_ws, was_hidden
+
+    def read_id_sheet_mapping(self, wb, vendor, tracer=None):
+        if not vendor.id_sheet:
+            return {}, {}
+        id_ws, _ = self.find_id_sheet(wb, vendor)
+        if id_ws is None:
+            if tracer:
+                tracer.event("id_sheet.missing", "ID 시트 '{sheet}'를 찾을 수 없음", sheet=vendor.id_sheet)
+            return {}, {}
+
+        store_col = col_letter_to_num(vendor.id_store_col)
+        login_col = col_letter_to_num(vendor.id_login_col)
+        start = vendor.id_start_row
+        end_row = start + 2000
+        range_str = f"{vendor.id_store_col}{start}:{vendor.id_login_col}{end_row}"
+        stores = self._read_column(id_ws, store_col, start, end_row)
+        logins = self._read_column(id_ws, login_col, start, end_row)
+        values = tuple((s[0], l[0]) for s, l in zip(stores, logins))
+        return parse_id_sheet_rows(values, vendor, range_str, tracer=tracer)
+
+    def detect_table_layout(self, ws, vendor):
+        store_col = col_letter_to_num(vendor.store_col_letter)
+        header_text = vendor.table_header_text
+
+        # 1) 헤더 행 찾기 (store_col에서 header_text 검색)
+        header_row = None
+        for r in range(1, 100):
+            if header_text in norm_text(ws.cell(r, store_col).value):
+                header_row = r
+                break
+        if header_row is None:
+            header_row = 14  # 데이터 시작 = 15
+        data_start_row = header_row + 1
+
+        # 2) 테이블 너비 감지 (헤더 행에서 데이터가 있는 열 범위)
+        start_col = 1
+        end_col = store_col
+        for c in range(1, store_col + 1):
+            if norm_text(ws.cell(header_row, c).value) != "":
+                start_col = c
+                break
+        for c in range(store_col, 30):
+            if norm_text(ws.cell(header_row, c).value) != "":
+                end_col = c
+            elif norm_text(ws.cell(header_row, c + 1).value) == "":
+                # 2개 연속 빈 셀이면 종료
+                break
+        return data_start_row, start_col, end_col
+
+    def find_protected_row(self, ws, vendor: VendorConfig, start_row: int) -> Optional[int]:
+        if not vendor.protected_table_headers:
+            return None
+        found = self._search_rows(ws, start_row, vendor.protected_table_headers)
+        return found[0] if found else None
+
+    def read_existing_stores(self, ws, vendor, data_start_row, table_end_col):
+        col_num = col_letter_to_num(vendor.store_col_letter)
+        protected_row = self.find_protected_row(ws, vendor, data_start_row)
+        end_row = protected_row - 1 if protected_row else data_start_row + 1000
+        values = self._read_column(ws, col_num, data_start_row, end_row)
+        existing_normalized, last_data_row = scan_store_column(values, data_start_row)
+        return existing_normalized, last_data_row, protected_row
+
+    def get_existing_login_ids(self, ws, vendor, store_to_id, data_start_row, protected_row, tracer=None):
+        col_num = col_letter_to_num(vendor.store_col_letter)
+        end_row = protected_row - 1 if protected_row else data_start_row + 1000
+        values = self._read_column(ws, col_num, data_start_row, end_row)
+        return map_store_names_to_ids(values, store_to_id, tracer=tracer)
+
+    def find_supply_amount_cell(self, ws, vendor, start_row):
+        if not vendor.protected_table_headers:
+            return None
+        # 첫 번째 헤더 텍스트 (보통 "공급가액")
+        return self._search_rows(ws, start_row, vendor.protected_table_headers[:1])
+
+    def read_block(self, ws, start_row, end_row, start_col, end_col):
+        return list(ws.iter_rows(
+            min_row=start_row, max_row=end_row, min_col=start_col, max_col=end_col, values_only=True
+        ))
+
+    # ---- 쓰기 ----
+    def insert_rows(self, ws, insert_row: int, amount: int):
+        """
+        Excel의 행 삽입(xlDown)과 같게 동작하도록 openpyxl insert_rows 보완
+        - 병합 셀 / 행 높이 / 이미지 위치 / 수식 참조(모든 시트) 이동
+        - 조건부 서식(범위 + 수식) / 데이터 유효성 / 이름 정의 / 인쇄 영역 이동
+        """
+        from openpyxl.formatting.formatting import ConditionalFormattingList
+        from openpyxl.worksheet.cell_range import CellRange, MultiCellRange
+
+        def shift(text: str, same_sheet: bool = True) -> str:
+            return shift_formula_rows(text, ws.title, insert_row, amount, same_sheet)
+
+        ws.insert_rows(insert_row, amount)
+
+        # 병합 셀: 삽입 위치 아래는 이동, 걸쳐 있으면 확장
+        for merged in list(ws.merged_cells.ranges):
+            if merged.min_row >= insert_row:
+                merged.shift(row_shift=amount)
+            elif merged.max_row >= insert_row:
+                ws.merged_cells.remove(merged)
+                ws.merged_cells.add(CellRange(
+                    min_col=merged.min_col, min_row=merged.min_row,
+                    max_col=merged.max_col, max_row=merged.max_row + amount,
+                ))
+
+        # 행 높이
+        moved = sorted((r for r in list(ws.row_dimensions.keys()) if r >= insert_row), reverse=True)
+        for r in moved:
+            dim = ws.row_dimensions[r]
+            new_dim = ws.row_dimensions[r + amount]
+            new_dim.height = dim.height
+            new_dim.hidden = dim.hidden
+            new_dim.outlineLevel = dim.outlineLevel
+            if dim.has_style:
+                new_dim._style = dim._style
+            del ws.row_dimensions[r]
+
+        # 이미지 (앵커 행은 0-based)
+        for image in getattr(ws, "_images", []):
+            anchor = image.anchor
+            start_marker = getattr(anchor, "_from", None)
+            if start_marker is None or start_marker.row < insert_row - 1:
+                continue
+            start_marker.row += amount
+            end_marker = getattr(anchor, "to", None)
+            if end_marker is not None:
+                end_marker.row += amount
+
+        # 수식 참조 이동 (이 시트 + 이 시트를 참조하는 다른 시트)
+        for sheet in ws.parent.worksheets:
+            same_sheet = sheet is ws
+            for row in sheet.iter_rows():
+                for cell in row:
+                    if cell.data_type == "f" and isinstance(cell.value, str):
+                        cell.value = shift_formula_rows(cell.value, ws.title, insert_row, amount, same_sheet)
+
+        # 조건부 서식: 범위와 규칙 수식 (걸쳐 있으면 병합 셀처럼 확장)
+        old_formatting = ws.conditional_formatting
+        ws.conditional_formatting = ConditionalFormattingList()
+        for formatting in old_formatting:
+            sqref = shift(str(formatting.sqref))
+            for rule in formatting.rules:
+                rule.formula = [shift(f) for f in rule.formula]
+                ws.conditional_formatting.add(sqref, rule)
+
+        # 데이터 유효성: 범위와 목록/조건 수식
+        for validation in ws.data_validations.dataValidation:
+            validation.sqref = MultiCellRange(shift(str(validation.sqref)))
+            if validation.formula1:
+                validation.formula1 = shift(validation.formula1)
+            if validation.formula2:
+                validation.formula2 = shift(validation.formula2)
+
+        # 이름 정의 (통합문서 + 시트별) - 시트명이 붙은 참조만 이동
+        for defined in ws.parent.defined_names.values():
+            if defined.attr_text:
+                defined.attr_text = shift(defined.attr_text, same_sheet=False)
+        for sheet in ws.parent.worksheets:
+            for defined in sheet.defined_names.values():
+                if defined.attr_text:
+                    defined.attr_text = shift(defined.attr_text, same_sheet=False)
+
+        # 인쇄 영역 (인쇄 제목은 보통 삽입 위치보다 위라 그대로)
+        if ws._print_area is not None:
+            ws.print_area = shift(str(ws._print_area))
+
+    def copy_row_block(self, ws, template_row: int, start_col: int, end_col: int, dest_start: int, count: int):
+        """템플릿 행(서식 + 값 + 수식)을 dest_start부터 count행에 복사 (xlPasteAll과 동일)"""
+        from openpyxl.formula.translate import Translator
+
+        template_cells = [ws.cell(template_row, c) for c in range(start_col, end_col + 1)]
+        template_height = ws.row_dimensions[template_row].height
+        for r in range(dest_start, dest_start + count):
+            for src in template_cells:
+                dst = ws.cell(r, src.column)
+                if src.data_type == "f" and isinstance(src.value, str):
+                    dst.value = Translator(src.value, origin=src.coordinate).translate_formula(dst.coordinate)
+                else:
+                    dst.value = src.value
+                if src.has_style:
+                    dst._style = copy.copy(src._style)
+            if template_height is not None:
+                ws.row_dimensions[r].height = template_height
+
+    def apply_borders(self, ws, start_row: int, end_row: int, last_col: int = 8):
+        """테두리 적용 - 안쪽 점선, 바깥쪽 굵은 실선 (A열 ~ last_col)"""
+        from openpyxl.styles import Border, Side
+
+        inner = Side(style=self.INNER_BORDER_STYLE)
+        outer = Side(style=self.OUTER_BORDER_STYLE)
+        for r in range(start_row, end_row + 1):
+            for c in range(1, last_col + 1):
+                ws.cell(r, c).border = Border(
+                    left=outer if c == 1 else inner,
+                    right=outer if c == last_col else inner,
+                    top=outer if r == start_row else inner,
+                    bottom=outer if r == end_row else inner,
                 )
-                
-                # 첫 시트에서만 all_missing 추적 (ID 시트에 한번만 추가하기 위해)
-                if sheet_idx == 0:
-                    all_missing_stores = missing_stores
-                    all_missing_ids = missing_ids
-                    all_missing_list_stores = missing_list_stores
-            
-            # 제외된 매장 목록을 공급가액 셀 아래에 기록
-            if excluded_stores:
-                # 첫 시트에서만 all_excluded 추적
-                if sheet_idx == 0:
-                    all_excluded_stores = excluded_stores
-                
-                supply_cell = find_supply_amount_cell(ws, vendor, data_start_row)
-                if supply_cell:
-                    supply_row, supply_col = supply_cell
-                    write_excluded_stores_list(ws, vendor, excluded_stores, supply_row, supply_col)
-                    if progress_callback:
-                        progress_callback(
-                            sheet_progress_base + 15, 100, 
-                            f"[{sheet_name}] 제외 매장 {len(excluded_stores)}개 기록"
-                        )
 
-        # ID 시트에 새 매장 추가 (한번만)
-        # - 명세서 매장명: 비워둠
-        # - 로그인ID: 입력
-        # - 전체리스트 매장명 (주스샵 매장명): 입력
-        if all_missing_ids:
-            if progress_callback:
-                progress_callback(85, 100, "ID 시트에 새 매핑 추가 중...")
-            
-            add_to_id_sheet(wb, vendor, all_missing_ids, all_missing_list_stores)
-        
-        missing_stores = all_missing_stores  # 결과 반환용
+    @staticmethod
+    def _write_column(ws, start_row: int, col_num: int, values: List[object]):
+        for i, value in enumerate(values):
+            ws.cell(start_row + i, col_num).value = value
+
+    def insert_stores(
+        self, ws, vendor, new_stores,
+        last_data_row, data_start_row, table_start_col, table_end_col,
+        protected_row=None, new_groups=None, new_extra=None,
+        tracer=None, progress_callback=None,
+    ):
+        if not new_stores:
+            return
+
+        col_num = col_letter_to_num(vendor.store_col_letter)
+        start = data_start_row
+        total = len(new_stores)
 
         if progress_callback:
-            progress_callback(93, 100, "ID 시트 숨기는 중...")
+            progress_callback(0, total, f"행 삽입 준비 중... ({total}개)")
 
-        # ID 시트 숨기기 (원래 숨겨져 있었든 아니든 항상 숨김)
-        hide_id_sheet(wb, vendor)
+        insert_row = last_data_row + 1 if last_data_row >= start else start
+        template_row = last_data_row if last_data_row >= start else None
+
+        if protected_row:
+            self.insert_rows(ws, insert_row, total)
 
         if progress_callback:
-            progress_callback(95, 100, "저장 중...")
+            progress_callback(20, total, f"행 내용 복사 중... ({total}개)")
 
-        # 7) 저장 (.xlsx로) - 항상 SaveAs 사용 (원본 보존)
-        # FileFormat: 51 = xlsx, 56 = xls
+        if template_row:
+            self.copy_row_block(ws, template_row, table_start_col, table_end_col, insert_row, total)
+
+        if progress_callback:
+            progress_callback(50, total, f"매장명 입력 중... ({total}개)")
+
+        self._write_column(ws, insert_row, col_num, new_stores)
+
+        if vendor.group_name_target_col and new_groups:
+            if progress_callback:
+                progress_callback(75, total, f"그룹명 입력 중... ({total}개)")
+            self._write_column(ws, insert_row, col_letter_to_num(vendor.group_name_target_col), list(new_groups[:total]))
+
+        if vendor.extra_col_target and new_extra:
+            if progress_callback:
+                progress_callback(77, total, f"추가 열 데이터 입력 중... ({total}개)")
+            self._write_column(ws, insert_row, col_letter_to_num(vendor.extra_col_target), list(new_extra[:total]))
+
+        if progress_callback:
+            progress_callback(80, total, "테두리 적용 중...")
+
+        self.apply_borders(ws, start, insert_row + total - 1, last_col=table_end_col)
+
+    def write_excluded_stores_list(self, ws, vendor, excluded_stores, supply_cell_row, supply_cell_col):
+        if not excluded_stores:
+            return
+
+        start_row = supply_cell_row + 3
+        lines = ["※ 제외된 매장 (전체리스트에 없음)"] + [f"- {name}" for name in sorted(excluded_stores)]
+        for i, line in enumerate(lines):
+            cell = ws.cell(start_row + i, supply_cell_col)
+            cell.value = line
+            font = copy.copy(cell.font)
+            font.color = self.EXCLUDED_FONT_COLOR
+            if i == 0:
+                font.bold = True
+            cell.font = font
+
+    def add_to_id_sheet(self, wb, vendor, new_ids, list_store_names):
+        if not vendor.id_sheet or not new_ids:
+            return
+        id_ws, _ = self.find_id_sheet(wb, vendor)
+        if id_ws is None:
+            return
+
+        store_col = col_letter_to_num(vendor.id_store_col)
+        login_col = col_letter_to_num(vendor.id_login_col)
+        list_store_col = col_letter_to_num(vendor.id_list_store_col)
+
+        # 마지막 데이터 행 찾기 (로그인ID 열 기준)
+        r = vendor.id_start_row
+        for (value,) in self._read_column(id_ws, login_col, r, id_ws.max_row):
+            if norm_text(value) == "":
+                break
+            r += 1
+
+        for i, (login_id, list_store) in enumerate(zip(new_ids, list_store_names)):
+            id_ws.cell(r + i, list_store_col).value = list_store
+            id_ws.cell(r + i, store_col).value = None  # 명세서 매장명은 비워둠
+            login_cell = id_ws.cell(r + i, login_col)
+            login_cell.number_format = "@"  # 텍스트 형식
+            login_cell.value = str(login_id)
+
+    def hide_id_sheet(self, wb, vendor):
+        if vendor.id_sheet and vendor.id_sheet in wb.sheetnames:
+            wb[vendor.id_sheet].sheet_state = "hidden"
+
+
+INVOICE_BACKENDS: Dict[str, type] = {
+    ComInvoiceBackend.name: ComInvoiceBackend,
+    OpenpyxlInvoiceBackend.name: OpenpyxlInvoiceBackend,
+}
+
+
+def get_invoice_backend(name: Optional[str], separate_instance: bool = False) -> InvoiceBackend:
+    """
+    백엔드 이름("com" / "openpyxl")으로 인스턴스 생성
+    - separate_instance: com 백엔드에서 전용 Excel 인스턴스 사용 (병렬 실행용)
+    """
+    key = (name or "com").strip().lower()
+    if key not in INVOICE_BACKENDS:
+        raise KeyError(f"지원하지 않는 백엔드야: {name} (가능: {', '.join(INVOICE_BACKENDS)})")
+    if key == ComInvoiceBackend.name:
+        return ComInvoiceBackend(separate_instance=separate_instance)
+    return INVOICE_BACKENDS[key]()
+
+
+def compare_invoice_outputs(expected_path: str, actual_path: str, sheet_names: Optional[List[str]] = None) -> List[str]:
+    """
+    두 거래명세서 결과 파일 비교 (COM 결과 vs openpyxl 결과 검증용)
+    - 시트 목록/숨김 상태, 셀 값, 병합 셀, 이미지 개수 비교
+    Returns: 차이점 설명 목록 (비어 있으면 동일)
+    """
+    from openpyxl import load_workbook
+
+    expected_wb = load_workbook(expected_path)
+    actual_wb = load_workbook(actual_path)
+    diffs: List[str] = []
+
+    if sheet_names is None:
+        if expected_wb.sheetnames != actual_wb.sheetnames:
+            diffs.append(f"시트 목록 다름: {expected_wb.sheetnames} != {actual_wb.sheetnames}")
+        sheet_names = [n for n in expected_wb.sheetnames if n in actual_wb.sheetnames]
+
+    for name in sheet_names:
+        if name not in expected_wb.sheetnames or name not in actual_wb.sheetnames:
+            diffs.append(f"[{name}] 한쪽 파일에 시트 없음")
+            continue
+        exp_ws = expected_wb[name]
+        act_ws = actual_wb[name]
+        if exp_ws.sheet_state != act_ws.sheet_state:
+            diffs.append(f"[{name}] 숨김 상태 다름: {exp_ws.sheet_state} != {act_ws.sheet_state}")
+
+        max_row = max(exp_ws.max_row, act_ws.max_row)
+        max_col = max(exp_ws.max_column, act_ws.max_column)
+        for r in range(1, max_row + 1):
+            for c in range(1, max_col + 1):
+                exp_val = exp_ws.cell(r, c).value
+                act_val = act_ws.cell(r, c).value
+                if norm_text(exp_val) != norm_text(act_val):
+                    diffs.append(f"[{name}] {num_to_col_letter(c)}{r}: '{norm_text(exp_val)}' != '{norm_text(act_val)}'")
+
+        exp_merged = sorted(str(m) for m in exp_ws.merged_cells.ranges)
+        act_merged = sorted(str(m) for m in act_ws.merged_cells.ranges)
+        if exp_merged != act_merged:
+            diffs.append(f"[{name}] 병합 셀 다름: {sorted(set(exp_merged) ^ set(act_merged))}")
+
+        exp_images = len(getattr(exp_ws, "_images", []))
+        act_images = len(getattr(act_ws, "_images", []))
+        if exp_images != act_images:
+            diffs.append(f"[{name}] 이미지 개수 다름: {exp_images} != {act_images}")
+
+    return diffs
+
+
+# ----------------------------
+# 4-2) 실행 매니페스트 (입력이 그대로면 이전 결과 재사용)
+# ----------------------------
+# 업체별 매니페스트 폴더 (병렬 실행 시 서로 덮어쓰지 않도록 업체마다 파일 하나)
+BUILD_MANIFEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build_manifests")
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def list_subset_hash(id_to_store: Dict[str, str], id_to_group: Dict[str, str], id_to_extra: Dict[str, str]) -> str:
+    """업체에 해당하는 전체리스트 행(필터링 결과)만의 해시 - 다른 업체 행이 바뀌어도 그대로"""
+    rows = [
+        [login_id, store, id_to_group.get(login_id, ""), id_to_extra.get(login_id, "")]
+        for login_id, store in sorted(id_to_store.items())
+    ]
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def vendor_config_hash(vendor: VendorConfig, backend: str) -> str:
+    data = {"vendor": asdict(vendor), "backend": backend}
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def build_inputs(
+    vendor: VendorConfig, backend: str, invoice_path: str, output_path: str,
+    id_to_store: Dict[str, str], id_to_group: Dict[str, str], id_to_extra: Dict[str, str],
+) -> Dict[str, str]:
+    """입력 지문: 이 업체의 전체리스트 부분, 명세서 양식, 업체 설정, 저장 경로, (날짜 셀이 있으면) 날짜"""
+    return {
+        "list_subset_hash": list_subset_hash(id_to_store, id_to_group, id_to_extra),
+        "template_hash": file_sha256(invoice_path),
+        "vendor_config_hash": vendor_config_hash(vendor, backend),
+        "requested_output_path": os.path.abspath(output_path),
+        "date": datetime.now().strftime("%Y-%m-%d") if vendor.date_cell else "",
+    }
+
+
+def build_manifest_path(vendor_key: str) -> str:
+    safe_name = re.sub(r'[\\/:*?"<>|]', "_", vendor_key)
+    return os.path.join(BUILD_MANIFEST_DIR, f"{safe_name}.json")
+
+
+def load_build_manifest(vendor_key: str) -> Optional[Dict[str, object]]:
+    path = build_manifest_path(vendor_key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"매니페스트 로드 실패 ({vendor_key}): {e}")
+        return None
+
+
+def write_json_atomic(path: str, data: object):
+    """
+    같은 폴더의 고유한 임시 파일에 쓰고 os.replace (병렬 작업자끼리 임시 파일 이름이 겹치지 않게)
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_build_manifest(vendor_key: str, manifest: Dict[str, object]):
+    os.makedirs(BUILD_MANIFEST_DIR, exist_ok=True)
+    write_json_atomic(build_manifest_path(vendor_key), manifest)
+
+
+def find_reusable_build(vendor_key: str, inputs: Dict[str, str]) -> Optional[Dict[str, object]]:
+    """
+    이전 실행의 입력(전체리스트 부분 해시, 명세서 해시, 업체 설정 해시, 저장 경로, 날짜)이 모두 같고
+    결과 파일도 그때 그대로면 매니페스트 반환, 아니면 None
+    """
+    manifest = load_build_manifest(vendor_key)
+    if not manifest or manifest.get("inputs") != inputs:
+        return None
+    output_path = manifest.get("output_path", "")
+    if not output_path or not os.path.exists(output_path):
+        return None
+    if file_sha256(output_path) != manifest.get("output_hash"):
+        return None  # 결과 파일을 누가 고쳤거나 덮어씀
+    return manifest
+
+
+# ----------------------------
+# 4-3) 사전 점검 (Excel을 띄우기 전에 openpyxl 읽기 전용으로 양식 확인)
+# ----------------------------
+PREFLIGHT_MAX_ROWS = 5000   # 시트당 읽을 최대 행 (보호 테이블 검색 범위보다 충분히 큼)
+PREFLIGHT_MAX_COLS = 30     # detect_table_layout이 보는 열 범위
+COL_LETTER_PAT = re.compile(r"^[A-Za-z]{1,3}$")
+
+
+class _PreflightSheet:
+    """
+    읽기 전용으로 한 번에 읽어 둔 시트 값 (OpenpyxlInvoiceBackend의 레이아웃 감지 함수에 그대로 넘기기 위함)
+    - ws.cell(r, c).value / max_row / max_column / iter_rows(values_only=True)만 지원
+    """
+
+    class _Cell:
+        __slots__ = ("value",)
+
+        def __init__(self, value):
+            self.value = value
+
+    def __init__(self, title: str, rows: List[tuple]):
+        self.title = title
+        self._rows = rows
+        self.max_row = len(rows)
+        self.max_column = max((len(row) for row in rows), default=0)
+
+    def _value(self, r: int, c: int):
+        if 1 <= r <= len(self._rows):
+            row = self._rows[r - 1]
+            if 1 <= c <= len(row):
+                return row[c - 1]
+        return None
+
+    def cell(self, row: int, column: int):
+        return self._Cell(self._value(row, column))
+
+    def iter_rows(self, min_row: int = 1, max_row: Optional[int] = None, min_col: int = 1,
+                  max_col: Optional[int] = None, values_only: bool = True):
+        max_row = max_row or self.max_row
+        max_col = max_col or self.max_column
+        for r in range(min_row, max_row + 1):
+            yield tuple(self._value(r, c) for c in range(min_col, max_col + 1))
+
+
+@dataclass
+class PreflightReport:
+    vendor: str
+    invoice_path: str
+    errors: List[str] = field(default_factory=list)     # 있으면 실행하지 않음
+    warnings: List[str] = field(default_factory=list)   # 실행은 되지만 결과가 예상과 다를 수 있음
+    layouts: Dict[str, Dict[str, object]] = field(default_factory=dict)  # 시트별 감지 결과
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        lines = [f"[{self.vendor}] {os.path.basename(self.invoice_path)}"]
+        lines += [f"  오류: {e}" for e in self.errors]
+        lines += [f"  경고: {w}" for w in self.warnings]
+        return "\n".join(lines)
+
+
+def preflight_invoice(invoice_path: str, vendor: VendorConfig) -> PreflightReport:
+    """
+    거래명세서 양식이 업체 설정과 맞는지 빠르게 점검 (Excel 실행 없음)
+    - invoice_sheets / ID 시트 존재, 열 문자/날짜 셀 형식
+    - 시트별 table_header_text 헤더 행, protected_table_headers(보호 테이블/공급가액) 위치
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.cell import coordinate_from_string
+    from openpyxl.utils.exceptions import CellCoordinatesException
+
+    started = time.perf_counter()
+    report = PreflightReport(vendor.name, invoice_path)
+
+    # 설정값 형식 (파일 열기 전)
+    col_fields = {
+        "store_col_letter": vendor.store_col_letter,
+        "list_id_col": vendor.list_id_col,
+        "group_col": vendor.group_col,
+        "month_col": vendor.month_col,
+        "group_name_target_col": vendor.group_name_target_col,
+        "list_extra_col": vendor.list_extra_col,
+        "extra_col_target": vendor.extra_col_target,
+        "id_list_store_col": vendor.id_list_store_col,
+        "id_store_col": vendor.id_store_col,
+        "id_login_col": vendor.id_login_col,
+    }
+    for field_name, letter in col_fields.items():
+        if letter and not COL_LETTER_PAT.match(letter):
+            report.errors.append(f"{field_name} 값이 열 문자가 아님: '{letter}'")
+    if vendor.date_cell:
+        try:
+            coordinate_from_string(vendor.date_cell)
+        except (CellCoordinatesException, ValueError):
+            report.errors.append(f"date_cell 값이 셀 주소가 아님: '{vendor.date_cell}'")
+
+    if not os.path.exists(invoice_path):
+        report.errors.append(f"거래명세서 파일이 없음: {invoice_path}")
+        report.elapsed = time.perf_counter() - started
+        return report
+    if os.path.splitext(invoice_path)[1].lower() == ".xls":
+        report.warnings.append(".xls 양식은 openpyxl로 열 수 없어 시트/헤더 점검 생략")
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    try:
+        wb = load_workbook(invoice_path, read_only=True)
+    except Exception as e:
+        report.errors.append(f"거래명세서를 열 수 없음: {e}")
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    try:
+        sheet_names = list(wb.sheetnames)
+        if vendor.id_sheet and vendor.id_sheet not in sheet_names:
+            report.errors.append(f"ID 시트 '{vendor.id_sheet}'가 없음 (현재 시트: {sheet_names})")
+
+        layout_backend = OpenpyxlInvoiceBackend()
+        for sheet_name in (vendor.invoice_sheets or [vendor.invoice_sheet]):
+            if sheet_name not in sheet_names:
+                report.errors.append(f"시트 '{sheet_name}'가 없음 (현재 시트: {sheet_names})")
+                continue
+
+            rows = list(wb[sheet_name].iter_rows(
+                min_row=1, max_row=PREFLIGHT_MAX_ROWS, max_col=PREFLIGHT_MAX_COLS, values_only=True
+            ))
+            ws = _PreflightSheet(sheet_name, rows)
+
+            data_start_row, start_col, end_col = layout_backend.detect_table_layout(ws, vendor)
+            store_col = col_letter_to_num(vendor.store_col_letter)
+            header_found = vendor.table_header_text in norm_text(ws.cell(data_start_row - 1, store_col).value)
+            if not header_found:
+                report.errors.append(
+                    f"[{sheet_name}] {vendor.store_col_letter}열 1~99행에서 헤더 '{vendor.table_header_text}'를 못 찾음"
+                    f" (기본값 15행부터 데이터로 처리됨)"
+                )
+
+            protected_row = layout_backend.find_protected_row(ws, vendor, data_start_row)
+            supply_cell = layout_backend.find_supply_amount_cell(ws, vendor, data_start_row)
+            if vendor.protected_table_headers:
+                if protected_row is None:
+                    report.errors.append(
+                        f"[{sheet_name}] {data_start_row}행 아래에서 보호 테이블 헤더 "
+                        f"{vendor.protected_table_headers}를 못 찾음 (행 삽입 위치를 정할 수 없음)"
+                    )
+                elif supply_cell is None:
+                    report.warnings.append(
+                        f"[{sheet_name}] '{vendor.protected_table_headers[0]}' 셀을 못 찾음 → 제외 매장 목록이 기록되지 않음"
+                    )
+
+            report.layouts[sheet_name] = {
+                "data_start_row": data_start_row,
+                "table_start_col": start_col,
+                "table_end_col": end_col,
+                "protected_row": protected_row,
+                "supply_cell": supply_cell,
+            }
+    finally:
+        wb.close()
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+# ----------------------------
+# 4-4) 양식 레이아웃 캐시 (업체, 시트)별
+# ----------------------------
+# 헤더 행/테이블 열/보호 테이블/공급가액 위치는 매달 거의 같으므로 한 번 찾은 결과를 저장해 두고,
+# 다음 실행에서는 몇 번의 범위 읽기로 그대로인지만 확인 (셀 하나씩 훑는 감지 생략)
+LAYOUT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layout_cache")
+LAYOUT_FINGERPRINT_COLS = 30   # 지문에 포함할 열 수 (detect_table_layout 검색 범위)
+LAYOUT_SEARCH_COLS = 14        # 보호 테이블/공급가액 검색 열 수 (find_protected_row와 동일)
+LAYOUT_SCAN_ROWS = 1000        # 매장명 열 스캔 범위 (read_existing_stores와 동일)
+
+
+@dataclass
+class TemplateLayout:
+    data_start_row: int
+    table_start_col: int
+    table_end_col: int
+    last_data_row: int
+    protected_row: Optional[int]
+    supply_cell: Optional[Tuple[int, int]]   # 행 삽입 전 기준 (행, 열)
+    from_cache: bool = False
+
+
+def layout_fingerprint(book: "InvoiceBackend", ws, vendor: VendorConfig, data_start_row: int) -> str:
+    """
+    시트 구조 지문: 헤더 행까지(1 ~ data_start_row-1행, 1~30열)의 값 + 레이아웃 관련 업체 설정
+    - 매장 데이터가 늘어나도 바뀌지 않고, 양식 머리말/헤더가 바뀌면 달라짐
+    - 날짜 셀은 매번 바뀌므로 제외
+    """
+    from openpyxl.utils.cell import coordinate_from_string
+
+    values = book.read_block(ws, 1, max(1, data_start_row - 1), 1, LAYOUT_FINGERPRINT_COLS)
+    rows = [[norm_text(v) for v in row] for row in values]
+    if vendor.date_cell:
+        date_col, date_row = coordinate_from_string(vendor.date_cell)
+        date_col = col_letter_to_num(date_col)
+        if date_row <= len(rows) and date_col <= len(rows[date_row - 1]):
+            rows[date_row - 1][date_col - 1] = ""
+    data = {
+        "rows": rows,
+        "store_col": vendor.store_col_letter,
+        "header_text": vendor.table_header_text,
+        "protected_headers": vendor.protected_table_headers,
+    }
+    return hashlib.sha1(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _layout_cache_path(vendor_key: str) -> str:
+    safe_name = re.sub(r'[\\/:*?"<>|]', "_", vendor_key)
+    return os.path.join(LAYOUT_CACHE_DIR, f"{safe_name}.json")
+
+
+def load_layout_cache(vendor_key: str) -> Dict[str, Dict[str, object]]:
+    """{시트명: 캐시 항목} (없거나 깨졌으면 빈 dict)"""
+    path = _layout_cache_path(vendor_key)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_layout_cache(vendor_key: str, sheet_name: str, entry: Dict[str, object]):
+    cache = load_layout_cache(vendor_key)
+    cache[sheet_name] = entry
+    os.makedirs(LAYOUT_CACHE_DIR, exist_ok=True)
+    write_json_atomic(_layout_cache_path(vendor_key), cache)
+
+
+def _scan_last_data_row(book: "InvoiceBackend", ws, vendor: VendorConfig, data_start_row: int) -> int:
+    col_num = col_letter_to_num(vendor.store_col_letter)
+    values = book.read_block(ws, data_start_row, data_start_row + LAYOUT_SCAN_ROWS, col_num, col_num)
+    _, last_data_row = scan_store_column(values, data_start_row)
+    return last_data_row
+
+
+def _verify_cached_layout(
+    book: "InvoiceBackend", ws, vendor: VendorConfig, entry: Dict[str, object]
+) -> Optional[TemplateLayout]:
+    """
+    캐시된 레이아웃이 지금 시트에도 맞는지 확인 (범위 읽기 2~3번)
+    - 지문 일치 + 데이터 끝에서 같은 간격에 보호 테이블/공급가액이 그대로 있어야 함
+    """
+    data_start_row = entry["data_start_row"]
+    if layout_fingerprint(book, ws, vendor, data_start_row) != entry.get("fingerprint"):
+        return None
+
+    last_data_row = _scan_last_data_row(book, ws, vendor, data_start_row)
+    protected_row = None
+    supply_cell = None
+
+    if vendor.protected_table_headers:
+        protected_offset = entry.get("protected_offset")
+        supply_offset = entry.get("supply_offset")
+        if protected_offset is None or supply_offset is None:
+            return None  # 지난번에 못 찾은 경우는 매번 다시 감지
+        protected_row = last_data_row + protected_offset
+        supply_cell = (last_data_row + supply_offset[0], supply_offset[1])
+
+        # 데이터 다음 행부터 보호 테이블/공급가액 행까지 한번에 읽어서 "처음 나오는 위치"가 같은지 확인
+        first_row = last_data_row + 1
+        last_row = max(protected_row, supply_cell[0])
+        block = book.read_block(ws, first_row, last_row, 1, LAYOUT_SEARCH_COLS)
+        supply_text = vendor.protected_table_headers[0]
+        found_protected = None
+        found_supply = None
+        for r, row in enumerate(block, start=first_row):
+            texts = [norm_text(v) for v in row]
+            if found_protected is None and any(h in t for t in texts for h in vendor.protected_table_headers):
+                found_protected = r
+            if found_supply is None:
+                for c, text in enumerate(texts, start=1):
+                    if supply_text in text:
+                        found_supply = (r, c)
+                        break
+        if found_protected != protected_row or found_supply != supply_cell:
+            return None
+
+    return TemplateLayout(
+        data_start_row, entry["table_start_col"], entry["table_end_col"],
+        last_data_row, protected_row, supply_cell, from_cache=True,
+    )
+
+
+def resolve_template_layout(
+    book: "InvoiceBackend", ws, vendor_key: str, vendor: VendorConfig, sheet_name: str
+) -> TemplateLayout:
+    """
+    (업체, 시트)의 레이아웃 - 캐시가 지금 시트와 맞으면 재사용, 아니면 전체 감지 후 캐시 갱신
+    """
+    entry = load_layout_cache(vendor_key).get(sheet_name)
+    if entry:
+        try:
+            layout = _verify_cached_layout(book, ws, vendor, entry)
+        except Exception:
+            layout = None  # 캐시 형식이 바뀌었거나 깨짐 → 다시 감지
+        if layout is not None:
+            return layout
+
+    data_start_row, table_start_col, table_end_col = book.detect_table_layout(ws, vendor)
+    _, last_data_row, protected_row = book.read_existing_stores(ws, vendor, data_start_row, table_end_col)
+    supply_cell = book.find_supply_amount_cell(ws, vendor, data_start_row)
+    supply_cell = tuple(supply_cell) if supply_cell else None
+
+    try:
+        save_layout_cache(vendor_key, sheet_name, {
+            "fingerprint": layout_fingerprint(book, ws, vendor, data_start_row),
+            "data_start_row": data_start_row,
+            "table_start_col": table_start_col,
+            "table_end_col": table_end_col,
+            "protected_offset": protected_row - last_data_row if protected_row else None,
+            "supply_offset": [supply_cell[0] - last_data_row, supply_cell[1]] if supply_cell else None,
+        })
+    except OSError as e:
+        print(f"레이아웃 캐시 저장 실패 (무시): {e}")
+
+    return TemplateLayout(data_start_row, table_start_col, table_end_col, last_data_row, protected_row, supply_cell)
+
+
+# ----------------------------
+# 4-5) 빌드 계획 (무엇을 바꿀지 먼저 계산 → 미리보기/저장 → 적용)
+# ----------------------------
+# 계획은 행 번호가 아니라 매장명/로그인ID로만 기록하므로 같은 양식의 다른 시트/파일에도 적용 가능
+# 미리보기에서 만든 계획은 업체별 파일로 저장해 두고, 입력이 같으면 실행할 때 다시 계산하지 않음
+BUILD_PLAN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build_plans")
+
+
+@dataclass
+class PlannedStore:
+    login_id: str
+    invoice_store: str   # 상세내역에 넣을 매장명 (ID 시트에 명세서 매장명이 있으면 그 이름)
+    list_store: str      # 전체리스트 매장명 (ID 시트에 기록)
+    group: str = ""
+    extra: str = ""
+
+
+@dataclass
+class SheetPlan:
+    sheet_name: str
+    existing_count: int = 0                                      # 기존 로그인ID 수
+    excluded_stores: List[str] = field(default_factory=list)     # 명세서에 있지만 전체리스트에 없는 매장
+
+
+@dataclass
+class BuildPlan:
+    vendor_key: str
+    date_cell: str = ""
+    date_value: str = ""
+    stores_to_add: List[PlannedStore] = field(default_factory=list)   # 매장명 순 정렬
+    sheets: List[SheetPlan] = field(default_factory=list)
+    id_sheet_additions: List[Tuple[str, str]] = field(default_factory=list)  # (로그인ID, 전체리스트 매장명)
+    id_sheet_mapping: List[Tuple[str, str]] = field(default_factory=list)    # 읽은 ID 시트 (로그인ID, 명세서 매장명)
+    inputs: Dict[str, str] = field(default_factory=dict)              # 계획을 만든 입력 지문 (재사용 판단용)
+    created_at: str = ""
+
+    @property
+    def missing_stores(self) -> List[str]:
+        return [s.invoice_store for s in self.stores_to_add]
+
+    @property
+    def excluded_stores(self) -> List[str]:
+        """결과 보고용 제외 매장 (첫 번째 시트 기준)"""
+        return list(self.sheets[0].excluded_stores) if self.sheets else []
+
+    @property
+    def existing_count(self) -> int:
+        return sum(s.existing_count for s in self.sheets)
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "BuildPlan":
+        data = dict(data)
+        data["date_cell"] = data.get("date_cell") or ""  # 예전 계획 파일은 null로 저장됨
+        data["stores_to_add"] = [PlannedStore(**s) for s in data.get("stores_to_add", [])]
+        data["sheets"] = [SheetPlan(**s) for s in data.get("sheets", [])]
+        data["id_sheet_additions"] = [tuple(x) for x in data.get("id_sheet_additions", [])]
+        data["id_sheet_mapping"] = [tuple(x) for x in data.get("id_sheet_mapping", [])]
+        return cls(**data)
+
+    def summary(self, limit: int = 20) -> str:
+        """미리보기 텍스트"""
+        lines = [f"[{self.vendor_key}] 추가 {len(self.stores_to_add)}개, 제외 {len(self.excluded_stores)}개"]
+        if self.date_cell:
+            lines.append(f"  날짜: {self.date_cell} ← {self.date_value}")
+        for s in self.stores_to_add[:limit]:
+            group = f" / {s.group}" if s.group else ""
+            lines.append(f"  + {s.invoice_store} ({s.login_id}{group})")
+        if len(self.stores_to_add) > limit:
+            lines.append(f"  ... 외 {len(self.stores_to_add) - limit}개")
+        for sheet in self.sheets:
+            for name in sheet.excluded_stores[:limit]:
+                lines.append(f"  - [{sheet.sheet_name}] {name}")
+        if self.id_sheet_additions:
+            lines.append(f"  ID 시트 추가: {len(self.id_sheet_additions)}행")
+        return "\n".join(lines)
+
+
+def plan_inputs_match(plan: BuildPlan, inputs: Dict[str, str]) -> bool:
+    """저장 경로는 계획에 영향이 없으므로 빼고 비교"""
+    keys = [k for k in inputs if k != "requested_output_path"]
+    return all(plan.inputs.get(k) == inputs[k] for k in keys)
+
+
+def _build_plan_path(vendor_key: str) -> str:
+    safe_name = re.sub(r'[\\/:*?"<>|]', "_", vendor_key)
+    return os.path.join(BUILD_PLAN_DIR, f"{safe_name}.json")
+
+
+def load_build_plan(vendor_key: str) -> Optional[BuildPlan]:
+    path = _build_plan_path(vendor_key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return BuildPlan.from_dict(json.load(f))
+    except Exception:
+        return None
+
+
+def save_build_plan(plan: BuildPlan):
+    os.makedirs(BUILD_PLAN_DIR, exist_ok=True)
+    write_json_atomic(_build_plan_path(plan.vendor_key), plan.to_dict())
+
+
+def plan_build(
+    vendor_key: str,
+    vendor: VendorConfig,
+    id_to_store: Dict[str, str],
+    id_to_group: Dict[str, str],
+    id_to_extra: Dict[str, str],
+    store_to_id: Dict[str, str],
+    id_to_store_invoice: Dict[str, str],
+    sheet_store_names: Dict[str, List[str]],
+    date_value: str = "",
+    inputs: Optional[Dict[str, str]] = None,
+    tracer: Optional[BuildTracer] = None,
+    list_index: Optional[MatchIndex] = None,
+    sheet_index: Optional[MatchIndex] = None,
+) -> BuildPlan:
+    """
+    전체리스트 / ID 시트 매핑 / 시트별 기존 매장명 → BuildPlan (통합문서는 건드리지 않음)
+    - sheet_store_names: {시트명: 상세내역 매장명 목록} (처리 순서대로)
+    - 추가할 매장은 ID 시트의 모든 로그인ID와 비교하므로 시트와 관계없이 한 번만 계산
+    """
+    plan = BuildPlan(
+        vendor_key=vendor_key,
+        date_cell=vendor.date_cell or "",
+        date_value=date_value if vendor.date_cell else "",
+        inputs=dict(inputs or {}),
+        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        id_sheet_mapping=list(id_to_store_invoice.items()),
+    )
+
+    for sheet_name, existing_store_names in sheet_store_names.items():
+        # 기존 로그인ID = 상세내역 매장명으로 찾은 ID + ID 시트의 모든 로그인ID (매장명 매핑 실패 대비)
+        existing_ids = {store_to_id[name] for name in existing_store_names if store_to_id.get(name)}
+        ids_from_stores = len(existing_ids)
+        existing_ids.update(id_to_store_invoice.keys())
+
+        if tracer:
+            tracer.event(
+                "sheet.existing_stores",
+                "[{sheet}] 기존 매장명 {store_count}개, 최종 기존 로그인ID {existing_id_count}개",
+                sheet=sheet_name,
+                store_count=len(existing_store_names),
+                ids_from_stores=ids_from_stores,
+                id_sheet_count=len(id_to_store_invoice),
+                existing_id_count=len(existing_ids),
+                store_samples=lambda: existing_store_names[:5],
+                id_samples=lambda: list(existing_ids)[:5],
+            )
+
+        # 명세서에 있지만 전체리스트에 없는 매장 찾기
+        excluded_stores = []
+        for store_name in existing_store_names:
+            login_id = store_to_id.get(store_name, "")
+            if login_id:
+                # 로그인ID가 전체리스트에 있는지 확인
+                if login_id not in id_to_store:
+                    excluded_stores.append(store_name)
+                    if tracer:
+                        tracer.event(
+                            "sheet.excluded_store",
+                            "[{sheet}] 전체리스트에 없는 매장: '{store}' (로그인ID {login_id!r})",
+                            sheet=sheet_name,
+                            store=store_name,
+                            login_id=login_id,
+                            list_id_col=vendor.list_id_col,
+                            suggestions=lambda: [asdict(x) for x in list_index.suggest(login_id, store_name)],
+                        )
+            else:
+                # ID 시트에도 없는 매장 = 전체리스트에도 없음
+                excluded_stores.append(store_name)
+                if tracer:
+                    tracer.event(
+                        "sheet.excluded_store", "[{sheet}] ID 시트에 매핑이 없는 매장: '{store}'",
+                        sheet=sheet_name, store=store_name, login_id="",
+                        suggestions=lambda: [asdict(x) for x in list_index.suggest("", store_name)],
+                    )
+
+        plan.sheets.append(SheetPlan(sheet_name, len(existing_ids), excluded_stores))
+
+    # 새로 추가할 매장 찾기 (로그인ID로 비교)
+    already_exists = []
+    for login_id, store_name_from_list in id_to_store.items():
+        if login_id in id_to_store_invoice:
+            already_exists.append(login_id)
+            continue
+        plan.stores_to_add.append(PlannedStore(
+            login_id=login_id,
+            invoice_store=store_name_from_list,
+            list_store=store_name_from_list,
+            group=id_to_group.get(login_id, ""),
+            extra=id_to_extra.get(login_id, ""),
+        ))
+
+    if tracer:
+        sheet_label = ", ".join(sheet_store_names)
+        for login_id in already_exists:
+            tracer.row(login_id, "sheet.already_exists",
+                       "[{sheet}] 이미 존재하는 매장 (추가 안 함): 전체리스트 '{list_store}', 명세서 '{invoice_store}'",
+                       sheet=sheet_label, list_store=id_to_store[login_id],
+                       invoice_store=id_to_store_invoice.get(login_id, id_to_store[login_id]))
+        tracer.event(
+            "sheet.missing",
+            "[{sheet}] 이미 존재 {already_exists}개, 새로 추가 {missing_count}개",
+            sheet=sheet_label,
+            already_exists=len(already_exists),
+            missing_count=len(plan.stores_to_add),
+            store_samples=lambda: [s.invoice_store for s in plan.stores_to_add[:5]],
+            group_samples=lambda: [s.group for s in plan.stores_to_add[:5] if s.group],
+            suggestions=lambda: build_match_report(
+                [(s.login_id, s.list_store) for s in plan.stores_to_add], sheet_index
+            ),
+        )
+
+    # 매장명 기준으로 정렬 (ID 시트에도 같은 순서로 추가)
+    plan.stores_to_add.sort(key=lambda s: s.invoice_store)
+    plan.id_sheet_additions = [(s.login_id, s.list_store) for s in plan.stores_to_add]
+    return plan
+
+
+def apply_build_plan(
+    book: "InvoiceBackend",
+    wb,
+    plan: BuildPlan,
+    vendor: VendorConfig,
+    sheet_names: Optional[List[str]] = None,
+    layouts: Optional[Dict[str, TemplateLayout]] = None,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    tracer: Optional[BuildTracer] = None,
+):
+    """
+    BuildPlan을 열린 통합문서에 적용 (날짜 셀, 시트별 행 삽입/제외 목록, ID 시트 추가, ID 시트 숨김)
+    - sheet_names: 적용할 시트 (None이면 계획에 있는 시트 전부)
+    - layouts: 계획 단계에서 이미 구한 {시트명: TemplateLayout} (없으면 시트마다 다시 구함)
+    """
+    layouts = layouts or {}
+    excluded_by_sheet = {s.sheet_name: s.excluded_stores for s in plan.sheets}
+    sheet_names = sheet_names or [s.sheet_name for s in plan.sheets]
+    total_sheets = len(sheet_names)
+
+    missing_stores = [s.invoice_store for s in plan.stores_to_add]
+    missing_groups = [s.group for s in plan.stores_to_add]
+    missing_extra = [s.extra for s in plan.stores_to_add]
+
+    # 날짜 셀에 계획 날짜 입력 (첫번째 시트)
+    if plan.date_cell and plan.date_value:
+        book.write_date_cell(wb, plan.date_cell, plan.date_value)
+        if progress_callback:
+            progress_callback(22, 100, f"날짜 입력: {plan.date_value} → {plan.date_cell}")
+
+    for sheet_idx, sheet_name in enumerate(sheet_names):
+        sheet_progress_base = 20 + int(sheet_idx / total_sheets * 60)  # 20% ~ 80%
+
+        ws = book.get_sheet(wb, sheet_name)
+        if ws is None:
+            raise KeyError(f"시트 '{sheet_name}'가 없어. 현재 시트: {book.sheet_names(wb)}")
+
+        layout = layouts.get(sheet_name) or resolve_template_layout(book, ws, plan.vendor_key, vendor, sheet_name)
+
+        if progress_callback:
+            progress_callback(sheet_progress_base + 10, 100, f"[{sheet_name}] 추가할 매장: {len(missing_stores)}개")
+
+        # 새 매장 추가 (행 삽입 방식)
+        if missing_stores:
+            def make_sub_progress(base, name=sheet_name):
+                def sub_progress(pct, total, msg):
+                    overall_pct = base + int(pct / 100 * 10)
+                    if progress_callback:
+                        progress_callback(overall_pct, 100, f"[{name}] {msg}")
+                return sub_progress
+
+            book.insert_stores(
+                ws, vendor, missing_stores, layout.last_data_row,
+                layout.data_start_row, layout.table_start_col, layout.table_end_col,
+                layout.protected_row, missing_groups, missing_extra, tracer, make_sub_progress(sheet_progress_base + 10)
+            )
+
+        # 제외된 매장 목록을 공급가액 셀 아래에 기록
+        excluded_stores = excluded_by_sheet.get(sheet_name, [])
+        if excluded_stores and layout.supply_cell:
+            # 공급가액 셀: 보호 테이블 위에 행을 삽입했으면 그만큼 아래로 이동
+            supply_row, supply_col = layout.supply_cell
+            if layout.protected_row and missing_stores:
+                supply_row += len(missing_stores)
+            book.write_excluded_stores_list(ws, vendor, excluded_stores, supply_row, supply_col)
+            if progress_callback:
+                progress_callback(
+                    sheet_progress_base + 15, 100,
+                    f"[{sheet_name}] 제외 매장 {len(excluded_stores)}개 기록"
+                )
+
+    # ID 시트에 새 매장 추가 (한번만)
+    # - 명세서 매장명: 비워둠
+    # - 로그인ID: 입력
+    # - 전체리스트 매장명 (주스샵 매장명): 입력
+    if plan.id_sheet_additions:
+        if progress_callback:
+            progress_callback(85, 100, "ID 시트에 새 매핑 추가 중...")
+        book.add_to_id_sheet(
+            wb, vendor,
+            [login_id for login_id, _ in plan.id_sheet_additions],
+            [list_store for _, list_store in plan.id_sheet_additions],
+        )
+
+    if progress_callback:
+        progress_callback(93, 100, "ID 시트 숨기는 중...")
+
+    # ID 시트 숨기기 (원래 숨겨져 있었든 아니든 항상 숨김)
+    book.hide_id_sheet(wb, vendor)
+
+
+def read_plan_sources(
+    book: "InvoiceBackend",
+    wb,
+    vendor_key: str,
+    vendor: VendorConfig,
+    sheet_names: List[str],
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    tracer: Optional[BuildTracer] = None,
+) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, List[str]], Dict[str, TemplateLayout]]:
+    """
+    계획에 필요한 값을 열린 통합문서에서 읽기 (수정 없음)
+    Returns: (store_to_id, id_to_store_invoice, {시트명: 기존 매장명 목록}, {시트명: TemplateLayout})
+    """
+    # ID 시트 찾기 (숨겨져 있으면 임시로 보이게)
+    book.find_id_sheet(wb, vendor)
+
+    # ID 시트에서 매핑 읽기 (양방향)
+    # store_to_id: {매장명: 로그인ID}, id_to_store_invoice: {로그인ID: 명세서 매장명}
+    store_to_id, id_to_store_invoice = book.read_id_sheet_mapping(wb, vendor, tracer=tracer)
+
+    sheet_store_names: Dict[str, List[str]] = {}
+    layouts: Dict[str, TemplateLayout] = {}
+    total_sheets = len(sheet_names)
+    for sheet_idx, sheet_name in enumerate(sheet_names):
+        sheet_progress_base = 20 + int(sheet_idx / total_sheets * 60)  # 20% ~ 80%
+        if progress_callback:
+            progress_callback(sheet_progress_base, 100, f"시트 '{sheet_name}' 처리 중... ({sheet_idx + 1}/{total_sheets})")
+
+        ws = book.get_sheet(wb, sheet_name)
+        if ws is None:
+            raise KeyError(f"시트 '{sheet_name}'가 없어. 현재 시트: {book.sheet_names(wb)}")
+
+        # 테이블 레이아웃 (헤더 행, 테이블 너비, 데이터 끝, 보호 테이블, 공급가액 셀)
+        # 지난번과 양식 지문이 같으면 캐시 재사용, 다르면 동적 감지
+        layout = resolve_template_layout(book, ws, vendor_key, vendor, sheet_name)
+        layouts[sheet_name] = layout
+
+        if tracer:
+            tracer.event(
+                "sheet.layout",
+                "[{sheet}] 데이터 시작 {data_start_row}행, 테이블 {table_start_col}~{table_end_col}열 (캐시: {from_cache})",
+                sheet=sheet_name,
+                store_col=vendor.store_col_letter,
+                header_text=vendor.table_header_text,
+                data_start_row=layout.data_start_row,
+                table_start_col=layout.table_start_col,
+                table_end_col=layout.table_end_col,
+                from_cache=layout.from_cache,
+            )
+            tracer.event(
+                "sheet.existing_rows",
+                "[{sheet}] 마지막 데이터 {last_data_row}행, 보호 테이블 {protected_row}행",
+                sheet=sheet_name, last_data_row=layout.last_data_row, protected_row=layout.protected_row,
+            )
+
+        if progress_callback:
+            progress_callback(
+                sheet_progress_base + 5, 100,
+                f"[{sheet_name}] 테이블: {layout.data_start_row}행, {layout.table_start_col}~{layout.table_end_col}열"
+            )
+
+        # 상세내역 시트의 기존 매장명 (ID 시트 매핑으로 로그인ID 변환은 계획 단계에서)
+        _, existing_store_names = book.get_existing_login_ids(
+            ws, vendor, store_to_id, layout.data_start_row, layout.protected_row, tracer=tracer
+        )
+        sheet_store_names[sheet_name] = existing_store_names
+
+    return store_to_id, id_to_store_invoice, sheet_store_names, layouts
+
+
+def trace_login_id_matching(
+    tracer: BuildTracer, id_to_store: Dict[str, str], id_to_store_invoice: Dict[str, str]
+) -> Tuple[MatchIndex, MatchIndex]:
+    """
+    추적: ID 시트의 로그인ID와 전체리스트의 로그인ID 비교
+    Returns: (전체리스트 인덱스, ID 시트 인덱스) - 매칭 실패 후보 제안용, 실행당 한 번만 생성
+    """
+    list_index = MatchIndex(id_to_store)
+    sheet_index = MatchIndex(id_to_store_invoice)
+    id_sheet_ids = set(id_to_store_invoice.keys())
+    list_ids = set(id_to_store.keys())
+    only_in_sheet = sorted(id_sheet_ids - list_ids)  # ID 시트에만 있는 것
+    only_in_list = sorted(list_ids - id_sheet_ids)  # 전체리스트에만 있는 것
+
+    tracer.event(
+        "match.login_ids",
+        "로그인ID 매칭: ID 시트 {id_sheet_count}개, 전체리스트 {list_count}개, 일치 {matched_count}개",
+        id_sheet_count=len(id_sheet_ids),
+        list_count=len(list_ids),
+        matched_count=len(id_sheet_ids & list_ids),
+        only_in_sheet_count=len(only_in_sheet),
+        only_in_list_count=len(only_in_list),
+        list_samples=lambda: [repr(lid) for lid in list(list_ids)[:10]],
+        id_sheet_samples=lambda: [repr(lid) for lid in list(id_sheet_ids)[:10]],
+    )
+    tracer.event(
+        "match.suggestions",
+        "전체리스트에만 있는 로그인ID {count}개 → ID 시트 후보",
+        side="only_in_list",
+        count=len(only_in_list),
+        report=lambda: build_match_report([(lid, id_to_store[lid]) for lid in only_in_list], sheet_index),
+    )
+    tracer.event(
+        "match.suggestions",
+        "ID 시트에만 있는 로그인ID {count}개 → 전체리스트 후보",
+        side="only_in_sheet",
+        count=len(only_in_sheet),
+        report=lambda: build_match_report([(lid, id_to_store_invoice[lid]) for lid in only_in_sheet], list_index),
+    )
+    return list_index, sheet_index
+
+
+def preview_build_plan(
+    list_path: str,
+    invoice_path: str,
+    vendor_key: str,
+    backend: Optional[str] = None,
+    save: bool = True,
+) -> BuildPlan:
+    """
+    통합문서를 수정하지 않고 계획만 계산 (.xlsx는 Excel 없이 openpyxl로 읽음)
+    - save=True면 업체별 계획 파일로 저장 → 같은 입력으로 run_build하면 계획 단계 생략
+    - backend: 실제 실행에 쓸 백엔드 (입력 지문 계산용, None이면 업체 설정)
+    """
+    if vendor_key not in VENDOR_CONFIGS:
+        raise KeyError(f"등록되지 않은 업체야: {vendor_key}")
+    vendor = VENDOR_CONFIGS[vendor_key]
+    run_backend = backend or vendor.backend
+
+    id_to_store, id_to_group, id_to_extra = extract_stores_from_list(list_path, vendor)
+    # 저장 경로는 계획에 영향이 없으므로 기본 경로로 지문 계산 (비교할 때도 제외됨)
+    inputs = build_inputs(
+        vendor, run_backend, invoice_path, default_output_path(invoice_path),
+        id_to_store, id_to_group, id_to_extra,
+    )
+
+    read_backend = run_backend if invoice_path.lower().endswith(".xls") else "openpyxl"
+    book = get_invoice_backend(read_backend)
+    wb = None
+    try:
+        book.start()
+        wb = book.open(os.path.abspath(invoice_path))
+        sheet_names = vendor.invoice_sheets if vendor.invoice_sheets else [vendor.invoice_sheet]
+        store_to_id, id_to_store_invoice, sheet_store_names, _ = read_plan_sources(
+            book, wb, vendor_key, vendor, sheet_names
+        )
+    finally:
+        if wb is not None:
+            book.close_workbook(wb)
+        book.shutdown()
+
+    plan = plan_build(
+        vendor_key, vendor, id_to_store, id_to_group, id_to_extra,
+        store_to_id, id_to_store_invoice, sheet_store_names,
+        date_value=inputs["date"], inputs=inputs,
+    )
+    if save:
+        save_build_plan(plan)
+    return plan
+
+
+# ----------------------------
+# 5) 실행 함수 (백엔드: Excel COM / openpyxl)
+# ----------------------------
+def run_build(
+    list_path: str,
+    invoice_path: str,
+    vendor_key: str,
+    output_path: str,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    backend: Optional[str] = None,
+    separate_instance: bool = False,
+    force: bool = False,
+    status: Optional[Dict[str, object]] = None,
+    preflight: bool = True,
+    plan: Optional["BuildPlan"] = None,
+) -> Tuple[List[str], str, int, List[str]]:
+    """
+    Returns: (missing_stores, actual_output_path, existing_count, excluded_stores)
+    - missing_stores: 새로 추가된 매장 목록
+    - excluded_stores: 명세서에 있지만 전체리스트에 없어서 제외된 매장 목록
+    - backend: "com" / "openpyxl" (None이면 업체 설정의 backend 사용)
+    - separate_instance: 전용 Excel 인스턴스 사용 (병렬 실행 작업자에서 True)
+    - force: 입력이 이전 실행과 같아도 다시 작성 (False면 매니페스트로 이전 결과 재사용)
+    - status: dict를 넘기면 실행 정보를 채움 (status["skipped"] = 이전 결과 재사용 여부)
+    - preflight: Excel을 띄우기 전에 양식/설정 사전 점검 (이미 점검한 일괄 실행에서는 False)
+    - plan: 미리 만든 BuildPlan (주면 계획 단계 없이 그대로 적용 - 다른 시트/파일에 같은 계획 적용용)
+    """
+    if vendor_key not in VENDOR_CONFIGS:
+        raise KeyError(f"등록되지 않은 업체야: {vendor_key}")
+
+    vendor = VENDOR_CONFIGS[vendor_key]
+
+    # 사전 점검: 시트/헤더/보호 테이블을 못 찾으면 Excel을 띄우기 전에 중단
+    if preflight:
+        report = preflight_invoice(invoice_path, vendor)
+        if not report.ok:
+            raise ValueError("거래명세서 사전 점검 실패:\n" + "\n".join(report.errors))
+        if report.warnings and progress_callback:
+            progress_callback(0, 100, "사전 점검 경고: " + " / ".join(report.warnings))
+
+    if progress_callback:
+        progress_callback(0, 100, "전체리스트 파일 읽는 중...")
+
+    # 추적 로그 (trace_config.json에 이 업체 또는 로그인ID가 지정된 경우만, 아니면 None)
+    tracer = open_build_tracer(vendor.name)
+    book = get_invoice_backend(backend or vendor.backend, separate_instance=separate_instance)
+    wb = None
+    try:
+        # 1) 전체리스트에서 {로그인ID: 매장명}, {로그인ID: 그룹명} 추출
+        id_to_store, id_to_group, id_to_extra = extract_stores_from_list(list_path, vendor, tracer=tracer)
+
+        # 추적 중이면 GUI 상태 메시지에 로그 파일 위치 표시
+        if tracer and progress_callback:
+            progress_callback(5, 100, f"전체리스트에서 {len(id_to_store)}개 매장 추출 완료 (추적 로그: {tracer.path})")
+
+        manifest_inputs = build_inputs(
+            vendor, backend or vendor.backend, invoice_path, output_path, id_to_store, id_to_group, id_to_extra
+        )
+        if status is not None:
+            status["skipped"] = False
+        if not force:
+            previous = find_reusable_build(vendor_key, manifest_inputs)
+            if previous:
+                if status is not None:
+                    status["skipped"] = True
+                if progress_callback:
+                    progress_callback(
+                        100, 100,
+                        f"변경 없음 - 이전 결과 사용: {os.path.basename(previous['output_path'])} ({previous['built_at']})"
+                    )
+                return (
+                    previous["missing_stores"], previous["output_path"],
+                    previous["existing_count"], previous["excluded_stores"],
+                )
+
+        if progress_callback:
+            progress_callback(20, 100, "거래명세서 파일 여는 중...")
+
+        # 2) 백엔드(Excel COM / openpyxl)로 거래명세서 열기
+        book.start()
+        
+        # 절대 경로로 변환
+        invoice_path = os.path.abspath(invoice_path)
+        output_path = os.path.abspath(output_path)
+        
+        # 원본 파일 열기 (원본은 수정하지 않고 항상 다른 경로로 저장)
+        wb = book.open(invoice_path)
+        
+        # 처리할 시트 목록 결정 (invoice_sheets가 있으면 여러 시트, 없으면 단일 시트)
+        sheet_names_to_process = vendor.invoice_sheets if vendor.invoice_sheets else [vendor.invoice_sheet]
+        total_sheets = len(sheet_names_to_process)
+
+        # 3) 계획: 넘겨받은 계획은 그대로 적용, 없으면 저장된 계획(미리보기)이 지금 입력과 같을 때만 재사용
+        layouts: Optional[Dict[str, TemplateLayout]] = None
+        if plan is None:
+            plan = load_build_plan(vendor_key)
+            if plan is not None and not plan_inputs_match(plan, manifest_inputs):
+                plan = None
+            if plan is not None and progress_callback:
+                progress_callback(22, 100, f"저장된 계획 사용 ({plan.created_at})")
+        if plan is None:
+            store_to_id, id_to_store_invoice, sheet_store_names, layouts = read_plan_sources(
+                book, wb, vendor_key, vendor, sheet_names_to_process, progress_callback, tracer
+            )
+            list_index = sheet_index = None
+            if tracer:
+                list_index, sheet_index = trace_login_id_matching(tracer, id_to_store, id_to_store_invoice)
+            plan = plan_build(
+                vendor_key, vendor, id_to_store, id_to_group, id_to_extra,
+                store_to_id, id_to_store_invoice, sheet_store_names,
+                date_value=manifest_inputs["date"], inputs=manifest_inputs,
+                tracer=tracer, list_index=list_index, sheet_index=sheet_index,
+            )
+
+        # 4) 계획 적용 (날짜, 행 삽입, 제외 목록, ID 시트)
+        apply_build_plan(
+            book, wb, plan, vendor, sheet_names_to_process, layouts,
+            progress_callback=progress_callback, tracer=tracer,
+        )
+        missing_stores = plan.missing_stores
+        total_existing_count = plan.existing_count
+        all_excluded_stores = plan.excluded_stores
+
+        if progress_callback:
+            progress_callback(95, 100, "저장 중...")
+
+        # 7) 저장 (.xlsx로) - 항상 다른 경로로 저장 (원본 보존)
         try:
             # 저장 경로 확인
             output_dir = os.path.dirname(output_path)
@@ -1454,31 +3075,8 @@ def run_build(
                     if progress_callback:
                         progress_callback(95, 100, f"원본 파일이 열려있어 새 파일명으로 저장: {os.path.basename(output_path)}")
             
-            # Excel 저장 시도
-            excel.DisplayAlerts = False  # 덮어쓰기 확인 대화상자 비활성화
-            excel.EnableEvents = False  # 이벤트 비활성화 (저장 속도 향상)
-            try:
-                # 변경사항 강제 저장
-                wb.SaveAs(output_path, FileFormat=51, ConflictResolution=1)  # ConflictResolution=1: 로컬 변경사항 유지
-            except Exception as save_err:
-                # SaveAs 실패 시 임시 파일로 저장 후 이동 시도
-                import tempfile
-                temp_dir = tempfile.gettempdir()
-                temp_file = os.path.join(temp_dir, f"temp_invoice_{os.getpid()}.xlsx")
-                try:
-                    wb.SaveAs(temp_file, FileFormat=51)
-                    # 임시 파일을 목적지로 이동
-                    if os.path.exists(output_path):
-                        try:
-                            os.remove(output_path)
-                        except:
-                            pass
-                    shutil.move(temp_file, output_path)
-                except Exception as move_err:
-                    raise Exception(f"파일 저장 실패: {str(save_err)}\n임시 파일 이동도 실패: {str(move_err)}")
-            finally:
-                excel.DisplayAlerts = True  # 경고 복원
-                excel.EnableEvents = True  # 이벤트 복원
+            # 백엔드별 저장 (.xlsx)
+            book.save(wb, output_path)
             
             # 저장 후 파일이 제대로 생성되었는지 확인
             import time
@@ -1498,14 +3096,11 @@ def run_build(
             if current_time - file_mtime > 10:
                 raise Exception(f"파일이 최근에 저장되지 않았습니다. 수정 시간: {time.ctime(file_mtime)}, 현재 시간: {time.ctime(current_time)}")
             
-            if debug_mode:
-                print(f"\n[디버그] === 파일 저장 확인 ===")
-                print(f"저장 경로: {output_path}")
-                print(f"파일 크기: {file_size} bytes")
-                print(f"수정 시간: {time.ctime(file_mtime)}")
-                print(f"========================================\n")
+            if tracer:
+                tracer.event("save.done", "저장 완료: {path} ({size} bytes)",
+                             path=output_path, size=file_size, mtime=time.ctime(file_mtime))
             
-            wb.Close(False)
+            book.close_workbook(wb)
             wb = None  # finally에서 중복 Close 방지
             
             # 백업 파일 삭제
@@ -1537,27 +3132,408 @@ def run_build(
             excluded_msg = f", 제외: {len(all_excluded_stores)}개" if all_excluded_stores else ""
             progress_callback(100, 100, f"완료! 시트 {total_sheets}개, 추가: {len(missing_stores)}개{excluded_msg}")
 
+        # 다음 실행에서 입력이 그대로면 건너뛸 수 있게 매니페스트 기록
+        save_build_manifest(vendor_key, {
+            "vendor": vendor_key,
+            "built_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "inputs": manifest_inputs,
+            "vendor_config": asdict(vendor),
+            "list_path": os.path.abspath(list_path),
+            "invoice_path": invoice_path,
+            "output_path": output_path,
+            "output_hash": file_sha256(output_path),
+            "missing_stores": list(missing_stores),
+            "existing_count": total_existing_count,
+            "excluded_stores": list(all_excluded_stores),
+        })
+
+        # 매장 마스터에 ID 시트 매핑 기록 (계획에 담긴 기존 매핑 + 이번에 추가한 로그인ID)
+        # - 미리보기에서 만든 계획을 재사용해도 계획을 만들 때 읽은 매핑이 그대로 기록됨
+        try:
+            store_master.record_id_mappings(
+                vendor_key,
+                [(login_id, name, "") for login_id, name in plan.id_sheet_mapping]
+                + [(s.login_id, "", s.list_store) for s in plan.stores_to_add],
+                invoice_path=output_path,
+            )
+        except Exception as e:
+            print(f"매장 마스터 기록 실패 (무시): {e}")
+
         return missing_stores, output_path, total_existing_count, all_excluded_stores
         
     finally:
         try:
             if wb:
-                wb.Close(False)
+                book.close_workbook(wb)
         except:
             pass
+        book.shutdown()
+        if tracer:
+            tracer.close()
+
+
+# ----------------------------
+# 5-1) 여러 업체 병렬 실행 (작업자 프로세스마다 전용 Excel 인스턴스)
+# ----------------------------
+# 기본 작업자 수: 코어 절반, 최대 4개 (Excel 인스턴스 하나가 메모리를 많이 쓰므로)
+DEFAULT_BUILD_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+@dataclass
+class BuildJob:
+    vendor_key: str
+    list_path: str
+    invoice_path: str
+    output_path: str
+    backend: Optional[str] = None  # None이면 업체 설정의 backend
+    force: bool = False            # 입력이 그대로여도 다시 작성
+
+
+@dataclass
+class BuildResult:
+    vendor_key: str
+    ok: bool
+    output_path: str = ""
+    missing_stores: List[str] = field(default_factory=list)
+    existing_count: int = 0
+    excluded_stores: List[str] = field(default_factory=list)
+    error: str = ""
+    elapsed: float = 0.0  # 초
+    skipped: bool = False  # 입력 변경 없음 → 이전 결과 재사용
+
+
+# 작업자 프로세스의 진행률 큐 (initializer에서 설정)
+_worker_progress_queue = None
+
+
+def _init_build_worker(progress_queue):
+    global _worker_progress_queue
+    _worker_progress_queue = progress_queue
+
+
+def _execute_build_job(job: BuildJob, progress_callback=None, separate_instance: bool = False,
+                       preflight: bool = True) -> BuildResult:
+    """작업 하나 실행 - 예외는 BuildResult.error로 담아서 반환 (다른 업체 작업은 계속)"""
+    started = time.perf_counter()
+    status: Dict[str, object] = {}
+    try:
+        missing, actual_output_path, existing_count, excluded = run_build(
+            job.list_path, job.invoice_path, job.vendor_key, job.output_path,
+            progress_callback, backend=job.backend, separate_instance=separate_instance,
+            force=job.force, status=status, preflight=preflight,
+        )
+        return BuildResult(
+            job.vendor_key, True, actual_output_path, list(missing), existing_count, list(excluded),
+            elapsed=time.perf_counter() - started, skipped=bool(status.get("skipped")),
+        )
+    except Exception as e:
+        return BuildResult(job.vendor_key, False, job.output_path, error=str(e),
+                           elapsed=time.perf_counter() - started)
+
+
+def _build_worker(job: BuildJob, index: int) -> BuildResult:
+    """작업자 프로세스에서 실행 - 진행률은 큐로 (작업 번호, 업체, %, 메시지) 전달"""
+    def progress_callback(pct, total, msg):
+        if _worker_progress_queue is not None:
+            _worker_progress_queue.put((index, job.vendor_key, pct, msg))
+
+    # 작업자마다 자기 COM 아파트(CoInitialize는 백엔드 start에서)와 전용 Excel 인스턴스 사용
+    # 사전 점검은 run_builds_parallel에서 작업을 넣기 전에 이미 함
+    return _execute_build_job(job, progress_callback, separate_instance=True, preflight=False)
+
+
+def run_builds_parallel(
+    jobs: List[BuildJob],
+    workers: int = DEFAULT_BUILD_WORKERS,
+    progress_callback: Optional[Callable[[int, str, int, str], None]] = None,
+    preflight: bool = True,
+) -> List[BuildResult]:
+    """
+    여러 업체 작업을 프로세스 풀로 나눠 실행
+    - progress_callback(index, vendor_key, pct, msg): 호출한 스레드에서 호출됨 (GUI는 root.after로 넘길 것)
+      index는 jobs 안의 작업 번호 (같은 업체 작업이 여러 개일 수 있으므로 진행률은 index로 구분)
+    - workers <= 1이거나 작업이 1개면 현재 프로세스에서 순서대로 실행
+    - preflight: 작업을 넣기 전에 모든 양식을 사전 점검, 실패한 업체는 Excel 작업 없이 바로 실패 처리
+    Returns: jobs와 같은 순서의 BuildResult 목록
+    """
+    if not jobs:
+        return []
+
+    results: Dict[int, BuildResult] = {}
+    if preflight:
+        for i, job in enumerate(jobs):
+            vendor = VENDOR_CONFIGS.get(job.vendor_key)
+            if vendor is None:
+                results[i] = BuildResult(job.vendor_key, False, job.output_path,
+                                         error=f"등록되지 않은 업체야: {job.vendor_key}")
+                continue
+            report = preflight_invoice(job.invoice_path, vendor)
+            if not report.ok:
+                results[i] = BuildResult(job.vendor_key, False, job.output_path,
+                                         error="사전 점검 실패: " + " / ".join(report.errors),
+                                         elapsed=report.elapsed)
+            if progress_callback:
+                status_msg = "사전 점검 통과" if report.ok else "사전 점검 실패"
+                progress_callback(i, job.vendor_key, 0 if report.ok else 100, status_msg)
+    queued = [i for i in range(len(jobs)) if i not in results]
+
+    # 전체리스트는 작업자들이 동시에 불러오지 않도록 여기서 한 번만 매장 마스터에 반영
+    list_vendors = {jobs[i].list_path: VENDOR_CONFIGS[jobs[i].vendor_key] for i in queued}
+    for list_path, vendor in (list_vendors.items() if store_master.ENABLED and len(queued) > 1 else []):
         try:
-            if excel:
-                excel.ScreenUpdating = True  # 복원
-                excel.Quit()
-        except:
-            pass
-        pythoncom.CoUninitialize()
+            store_master.ingest_list(
+                list_path, sheet_name=vendor.list_sheet or 0, header=vendor.header_row - 1,
+                engine=get_excel_engine(list_path), id_col=vendor.list_id_col, group_col=vendor.group_col,
+            )
+        except Exception as e:
+            print(f"매장 마스터 반영 실패 (작업자가 전체리스트를 직접 읽음): {e}")
+
+    workers = max(1, min(workers, len(queued) or 1))
+    if workers == 1:
+        for i in queued:
+            job = jobs[i]
+            callback = None
+            if progress_callback:
+                callback = lambda pct, total, msg, i=i, key=job.vendor_key: progress_callback(i, key, pct, msg)
+            results[i] = _execute_build_job(job, callback, preflight=False)
+        return [results[i] for i in range(len(jobs))]
+
+    import multiprocessing
+    import queue as queue_module
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    ctx = multiprocessing.get_context("spawn")  # Windows와 동일하게 spawn (COM은 fork 불가)
+    progress_queue = ctx.Queue()
+
+    def drain_progress():
+        while True:
+            try:
+                index, vendor_key, pct, msg = progress_queue.get_nowait()
+            except queue_module.Empty:
+                return
+            if progress_callback:
+                progress_callback(index, vendor_key, pct, msg)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx,
+        initializer=_init_build_worker, initargs=(progress_queue,),
+    ) as pool:
+        futures = {pool.submit(_build_worker, jobs[i], i): i for i in queued}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            drain_progress()
+            for future in done:
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:  # 작업자 프로세스 자체가 죽은 경우
+                    results[index] = BuildResult(jobs[index].vendor_key, False, jobs[index].output_path, error=str(e))
+        drain_progress()
+
+    return [results[i] for i in range(len(jobs))]
+
+
+def match_vendor_for_file(path: str, vendor_keys: Optional[List[str]] = None) -> Optional[str]:
+    """
+    파일명에 들어있는 업체명으로 업체 찾기 (여러 업체 일괄 실행용)
+    - 여러 개가 맞으면 가장 긴 업체명 (예: "맘스터치"보다 "맘스터치 직영")
+    """
+    filename = os.path.basename(path)
+    keys = vendor_keys if vendor_keys is not None else list(VENDOR_CONFIGS.keys())
+    matches = [key for key in keys if key and key in filename]
+    return max(matches, key=len) if matches else None
+
+
+def default_output_path(invoice_path: str) -> str:
+    """거래명세서와 같은 폴더에 _완성 붙여서 저장 (항상 .xlsx)"""
+    folder = os.path.dirname(invoice_path)
+    name, _ = os.path.splitext(os.path.basename(invoice_path))
+    return os.path.join(folder, f"{name}_완성.xlsx")
+
+
+# ----------------------------
+# 5-2) 명령줄 실행 (작업 매니페스트 → 결과 파일)
+# ----------------------------
+# 사용 예:
+#   python invoice_builder.py jobs.json --workers 3 --result result.json
+#
+# jobs.json (YAML도 가능, PyYAML 필요) - 상대경로는 매니페스트 파일 위치 기준:
+#   {
+#     "list_path": "전체리스트_20260101.xls",        ← 작업마다 생략하면 이 값 사용
+#     "output_dir": "완성",                          ← 없으면 거래명세서 옆에 _완성.xlsx
+#     "workers": 2,
+#     "jobs": [
+#       {"vendor": "할리스커피", "invoice_path": "할리스커피_거래명세서.xlsx"},
+#       {"vendor": "맘스터치", "invoice_path": "맘스터치.xlsx", "backend": "openpyxl", "force": true}
+#     ]
+#   }
+# 종료 코드: 0 = 전부 성공, 1 = 일부 실패, 2 = 전부 실패 또는 매니페스트 오류
+CLI_EXIT_OK = 0
+CLI_EXIT_PARTIAL = 1
+CLI_EXIT_FAILED = 2
+
+
+def load_job_manifest(manifest_path: str) -> Dict[str, object]:
+    """작업 매니페스트(JSON / YAML) 읽기"""
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if os.path.splitext(manifest_path)[1].lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML 매니페스트를 읽으려면 PyYAML이 필요해: pip install pyyaml")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict) or not isinstance(data.get("jobs"), list) or not data["jobs"]:
+        raise ValueError(f"매니페스트에 jobs 목록이 없어: {manifest_path}")
+    return data
+
+
+def jobs_from_manifest(
+    manifest: Dict[str, object],
+    base_dir: str,
+    backend: Optional[str] = None,
+    force: bool = False,
+) -> List[BuildJob]:
+    """
+    매니페스트 → BuildJob 목록 (상대경로는 base_dir 기준)
+    - backend/force 인자는 매니페스트 값보다 우선
+    """
+    def resolve(path):
+        return path if os.path.isabs(path) else os.path.normpath(os.path.join(base_dir, path))
+
+    output_dir = manifest.get("output_dir")
+    jobs = []
+    for i, entry in enumerate(manifest["jobs"], 1):
+        vendor_key = entry.get("vendor")
+        list_path = entry.get("list_path") or manifest.get("list_path")
+        invoice_path = entry.get("invoice_path")
+        if not vendor_key or not list_path or not invoice_path:
+            raise ValueError(f"{i}번째 작업에 vendor / list_path / invoice_path가 모두 있어야 해: {entry}")
+
+        invoice_path = resolve(invoice_path)
+        if entry.get("output_path"):
+            output_path = resolve(entry["output_path"])
+        elif output_dir:
+            output_path = os.path.join(resolve(output_dir), os.path.basename(default_output_path(invoice_path)))
+        else:
+            output_path = default_output_path(invoice_path)
+
+        jobs.append(BuildJob(
+            vendor_key,
+            resolve(list_path),
+            invoice_path,
+            output_path,
+            backend=backend or entry.get("backend") or manifest.get("backend"),
+            force=force or bool(entry.get("force", manifest.get("force", False))),
+        ))
+    return jobs
+
+
+def build_results_report(jobs: List[BuildJob], results: List[BuildResult], started_at: str, elapsed: float,
+                         workers: int) -> Dict[str, object]:
+    """결과 파일(JSON) 내용 - 작업별 추가/제외 매장 수와 소요 시간"""
+    job_reports = []
+    for job, result in zip(jobs, results):
+        job_reports.append({
+            "vendor": job.vendor_key,
+            "list_path": job.list_path,
+            "invoice_path": job.invoice_path,
+            "output_path": result.output_path,
+            "ok": result.ok,
+            "skipped": result.skipped,
+            "error": result.error,
+            "existing_count": result.existing_count,
+            "missing_count": len(result.missing_stores),
+            "excluded_count": len(result.excluded_stores),
+            "missing_stores": result.missing_stores,
+            "excluded_stores": result.excluded_stores,
+            "elapsed_sec": round(result.elapsed, 3),
+        })
+    failed = sum(1 for r in results if not r.ok)
+    return {
+        "started_at": started_at,
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "elapsed_sec": round(elapsed, 3),
+        "workers": workers,
+        "total": len(results),
+        "succeeded": len(results) - failed,
+        "skipped": sum(1 for r in results if r.skipped),
+        "failed": failed,
+        "jobs": job_reports,
+    }
+
+
+def main_cli(argv: List[str]) -> int:
+    """명령줄 진입점 - 종료 코드 반환 (0 성공 / 1 일부 실패 / 2 전부 실패)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="invoice_builder.py",
+        description="작업 매니페스트(JSON/YAML)에 적힌 업체들의 거래명세서를 GUI 없이 작성",
+    )
+    parser.add_argument("manifest", help="작업 매니페스트 파일 (.json / .yaml)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"동시 작업 수 (기본: 매니페스트 값 또는 {DEFAULT_BUILD_WORKERS})")
+    parser.add_argument("--result", default=None, help="결과 파일 경로 (기본: <매니페스트>_result.json)")
+    parser.add_argument("--backend", choices=sorted(INVOICE_BACKENDS), default=None,
+                        help="모든 작업에 사용할 백엔드 (기본: 업체 설정)")
+    parser.add_argument("--force", action="store_true", help="입력이 그대로여도 다시 작성")
+    parser.add_argument("--quiet", action="store_true", help="진행 상황 출력 안 함")
+    args = parser.parse_args(argv)
+
+    manifest_path = os.path.abspath(args.manifest)
+    try:
+        manifest = load_job_manifest(manifest_path)
+        jobs = jobs_from_manifest(manifest, os.path.dirname(manifest_path), args.backend, args.force)
+    except (OSError, ValueError) as e:
+        print(f"[오류] 매니페스트: {e}")
+        return CLI_EXIT_FAILED
+
+    workers = args.workers or int(manifest.get("workers") or DEFAULT_BUILD_WORKERS)
+    result_path = args.result or manifest.get("result_path") or os.path.splitext(manifest_path)[0] + "_result.json"
+
+    def progress_callback(index, vendor_key, pct, msg):
+        if not args.quiet:
+            print(f"[{index + 1}/{len(jobs)} {vendor_key}] {pct:3d}% {msg}", flush=True)
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    started = time.perf_counter()
+    results = run_builds_parallel(jobs, workers, progress_callback)
+    report = build_results_report(jobs, results, started_at, time.perf_counter() - started, workers)
+
+    result_dir = os.path.dirname(os.path.abspath(result_path))
+    os.makedirs(result_dir, exist_ok=True)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"완료: 성공 {report['succeeded']}개 (건너뜀 {report['skipped']}개), 실패 {report['failed']}개 "
+          f"/ {report['elapsed_sec']}초 → {result_path}")
+    for job in report["jobs"]:
+        if not job["ok"]:
+            print(f"  [실패] {job['vendor']}: {job['error']}")
+
+    if report["failed"] == 0:
+        return CLI_EXIT_OK
+    if report["failed"] < report["total"]:
+        return CLI_EXIT_PARTIAL
+    return CLI_EXIT_FAILED
 
 
 # ----------------------------
 # 6) Tkinter GUI
 # ----------------------------
 if __name__ == "__main__":
+    import sys
+    import multiprocessing
+    multiprocessing.freeze_support()  # exe로 묶었을 때 작업자 프로세스 시작용
+
+    # 인자가 있으면 GUI 없이 명령줄 실행 (작업 매니페스트)
+    if len(sys.argv) > 1:
+        sys.exit(main_cli(sys.argv[1:]))
+
     import tkinter as tk
     from tkinter import ttk, filedialog, messagebox
     import threading
@@ -1566,7 +3542,7 @@ if __name__ == "__main__":
         def __init__(self, root):
             self.root = root
             self.root.title("거래명세서 작성")
-            self.root.geometry("700x650")
+            self.root.geometry("700x690")
             self.root.resizable(False, False)
 
             # 변수들
@@ -1631,9 +3607,23 @@ if __name__ == "__main__":
             ttk.Entry(invoice_frame, textvariable=self.invoice_path_var, width=35).pack(side="left")
             ttk.Button(invoice_frame, text="찾아보기", command=self._select_invoice_file).pack(side="left", padx=5)
 
-            # 4) 실행 버튼
-            self.run_button = ttk.Button(frame, text="실행", command=self._run)
-            self.run_button.grid(row=3, column=0, columnspan=2, pady=20)
+            # 4) 실행 버튼 + 여러 업체 일괄 실행 (거래명세서 파일명에 업체명이 들어있어야 함)
+            button_frame = ttk.Frame(frame)
+            button_frame.grid(row=3, column=0, columnspan=2, pady=20)
+            self.run_button = ttk.Button(button_frame, text="실행", command=self._run)
+            self.run_button.pack(side="left", padx=5)
+            # 통합문서를 고치지 않고 추가/제외될 매장만 확인 (계획은 저장돼서 바로 실행하면 재사용)
+            self.preview_button = ttk.Button(button_frame, text="미리보기", command=self._preview)
+            self.preview_button.pack(side="left", padx=5)
+            self.batch_button = ttk.Button(button_frame, text="여러 업체 일괄 실행", command=self._run_batch)
+            self.batch_button.pack(side="left", padx=5)
+            ttk.Label(button_frame, text="동시 작업 수:").pack(side="left", padx=(15, 2))
+            self.workers_var = tk.IntVar(value=DEFAULT_BUILD_WORKERS)
+            ttk.Spinbox(button_frame, from_=1, to=max(8, DEFAULT_BUILD_WORKERS), textvariable=self.workers_var,
+                        width=4).pack(side="left")
+            # 입력(전체리스트 해당 부분/명세서/업체 설정)이 지난번과 같으면 이전 결과를 재사용 - 체크하면 무조건 다시 작성
+            self.force_var = tk.BooleanVar(value=False)
+            ttk.Checkbutton(button_frame, text="변경 없어도 다시 작성", variable=self.force_var).pack(side="left", padx=10)
 
             # 5) 진행률 바
             ttk.Label(frame, text="진행률:").grid(row=4, column=0, sticky="w", pady=5)
@@ -1690,6 +3680,7 @@ if __name__ == "__main__":
             self.ve_list_extra_col = tk.StringVar()
             self.ve_extra_col_target = tk.StringVar()
             self.ve_date_cell = tk.StringVar()
+            self.ve_backend = tk.StringVar(value="com")
 
             row = 0
             ttk.Label(form_frame, text="업체명*:").grid(row=row, column=0, sticky="w", pady=3)
@@ -1750,6 +3741,12 @@ if __name__ == "__main__":
             row += 1
             ttk.Label(form_frame, text="날짜 셀 (예: A1):").grid(row=row, column=0, sticky="w", pady=3)
             ttk.Entry(form_frame, textvariable=self.ve_date_cell, width=10).grid(row=row, column=1, sticky="w", pady=3)
+            
+            row += 1
+            ttk.Label(form_frame, text="처리 방식:").grid(row=row, column=0, sticky="w", pady=3)
+            ttk.Combobox(
+                form_frame, textvariable=self.ve_backend, values=list(INVOICE_BACKENDS.keys()), state="readonly", width=10
+            ).grid(row=row, column=1, sticky="w", pady=3)
 
             # 업체 목록 초기화
             self._refresh_vendor_list()
@@ -1802,6 +3799,7 @@ if __name__ == "__main__":
             self.ve_extra_col_target.set(config.extra_col_target or "")
             self.ve_header_text.set(config.table_header_text or "매장명")
             self.ve_date_cell.set(config.date_cell or "")
+            self.ve_backend.set(config.backend or "com")
 
         def _new_vendor(self):
             """새 업체 폼 초기화"""
@@ -1822,6 +3820,7 @@ if __name__ == "__main__":
             self.ve_extra_col_target.set("")
             self.ve_header_text.set("매장명")
             self.ve_date_cell.set("")
+            self.ve_backend.set("com")
 
         def _save_vendor(self):
             """업체 저장 (업체명 변경 지원)"""
@@ -1873,6 +3872,7 @@ if __name__ == "__main__":
                 month_col=self.ve_month_col.get().strip() or None,
                 month_value=self.ve_month_value.get().strip() or None,
                 date_cell=self.ve_date_cell.get().strip() or None,
+                backend=self.ve_backend.get().strip() or "com",
             )
             
             add_vendor_config(config)
@@ -1965,20 +3965,24 @@ if __name__ == "__main__":
             self.status_var.set(f"{pct}% - {msg}")
             self.root.update_idletasks()
 
-        def _run_task(self, vendor_key, list_path, invoice_path, output_path):
+        def _run_task(self, vendor_key, list_path, invoice_path, output_path, force=False):
             """백그라운드 스레드에서 실행되는 작업"""
             try:
                 def progress_callback(pct, total, msg):
                     # 람다에서 값을 캡처하기 위해 기본 인자 사용
                     self.root.after(0, lambda p=pct, t=total, m=msg: self._update_progress(p, t, m))
                 
+                status = {}
                 missing, actual_output_path, existing_count, excluded = run_build(
-                    list_path, invoice_path, vendor_key, output_path, progress_callback
+                    list_path, invoice_path, vendor_key, output_path, progress_callback,
+                    force=force, status=status,
                 )
                 
                 # 결과 표시
                 excluded_msg = f", 제외: {len(excluded)}개" if excluded else ""
-                if missing:
+                if status.get("skipped"):
+                    result_msg = f"100% - 변경 없음, 이전 결과 사용: {os.path.basename(actual_output_path)} | 추가: {len(missing)}개{excluded_msg}"
+                elif missing:
                     result_msg = f"100% - 완료! 저장: {os.path.basename(actual_output_path)} | 기존: {existing_count}개, 추가: {len(missing)}개{excluded_msg}"
                 else:
                     result_msg = f"100% - 완료! 저장: {os.path.basename(actual_output_path)} | 기존: {existing_count}개, 추가할 매장 없음{excluded_msg}"
@@ -1990,6 +3994,7 @@ if __name__ == "__main__":
                 self.root.after(0, lambda m=error_msg: self._update_progress(0, 100, m))
             finally:
                 self.root.after(0, lambda: self.run_button.config(state="normal"))
+                self.root.after(0, lambda: self.batch_button.config(state="normal"))
 
         def _run(self):
             vendor_key = self.vendor_var.get()
@@ -2008,25 +4013,127 @@ if __name__ == "__main__":
                 return
 
             # 저장 경로 자동 생성 (거래명세서와 같은 폴더에 _완성 붙여서 저장, 항상 .xlsx)
-            folder = os.path.dirname(invoice_path)
-            filename = os.path.basename(invoice_path)
-            name, ext = os.path.splitext(filename)
-            # 항상 .xlsx로 저장
-            output_path = os.path.join(folder, f"{name}_완성.xlsx")
+            output_path = default_output_path(invoice_path)
 
             # 버튼 비활성화
             self.run_button.config(state="disabled")
+            self.batch_button.config(state="disabled")
             self.progress_var.set(0)
             self.status_var.set("시작 중...")
 
             # 백그라운드 스레드에서 실행
             thread = threading.Thread(
                 target=self._run_task,
-                args=(vendor_key, list_path, invoice_path, output_path),
+                args=(vendor_key, list_path, invoice_path, output_path, self.force_var.get()),
                 daemon=True
             )
             thread.start()
 
+        def _preview(self):
+            """선택한 업체/파일로 BuildPlan만 계산해서 보여주기"""
+            vendor_key = self.vendor_var.get()
+            list_path = self.list_path_var.get()
+            invoice_path = self.invoice_path_var.get()
+            if not vendor_key or not list_path or not invoice_path:
+                self.status_var.set("오류: 업체명, 전체리스트, 거래명세서를 모두 선택해주세요.")
+                return
+
+            self.preview_button.config(state="disabled")
+            self.status_var.set("미리보기 계산 중...")
+
+            def task():
+                try:
+                    plan = preview_build_plan(list_path, invoice_path, vendor_key)
+                    text = plan.summary()
+                    self.root.after(0, lambda t=text: messagebox.showinfo("미리보기", t))
+                    self.root.after(0, lambda: self.status_var.set(
+                        f"미리보기: 추가 {len(plan.stores_to_add)}개, 제외 {len(plan.excluded_stores)}개"
+                    ))
+                except Exception as e:
+                    self.root.after(0, lambda m=f"오류: {e}": self.status_var.set(m))
+                finally:
+                    self.root.after(0, lambda: self.preview_button.config(state="normal"))
+
+            threading.Thread(target=task, daemon=True).start()
+
+        def _run_batch(self):
+            """여러 거래명세서를 골라서 업체별로 병렬 실행 (전체리스트는 공통)"""
+            list_path = self.list_path_var.get()
+            if not list_path:
+                self.status_var.set("오류: 전체리스트 파일을 선택해주세요.")
+                return
+
+            invoice_paths = filedialog.askopenfilenames(
+                title="거래명세서 파일 선택 (여러 개, 파일명에 업체명 포함)",
+                filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+            )
+            if not invoice_paths:
+                return
+
+            jobs = []
+            unmatched = []
+            force = self.force_var.get()
+            for invoice_path in invoice_paths:
+                vendor_key = match_vendor_for_file(invoice_path)
+                if vendor_key:
+                    jobs.append(BuildJob(vendor_key, list_path, invoice_path, default_output_path(invoice_path),
+                                         force=force))
+                else:
+                    unmatched.append(os.path.basename(invoice_path))
+            if unmatched:
+                messagebox.showwarning(
+                    "업체를 찾을 수 없음",
+                    "파일명에 등록된 업체명이 없어서 건너뜀:\n" + "\n".join(unmatched)
+                )
+            if not jobs:
+                self.status_var.set("오류: 실행할 업체가 없습니다.")
+                return
+
+            try:
+                workers = max(1, int(self.workers_var.get()))
+            except (tk.TclError, ValueError):
+                workers = DEFAULT_BUILD_WORKERS
+
+            self.run_button.config(state="disabled")
+            self.batch_button.config(state="disabled")
+            self.progress_var.set(0)
+            self.status_var.set(f"{len(jobs)}개 업체 시작 중... (동시 {min(workers, len(jobs))}개)")
+
+            thread = threading.Thread(target=self._run_batch_task, args=(jobs, workers), daemon=True)
+            thread.start()
+
+        def _run_batch_task(self, jobs, workers):
+            """백그라운드 스레드: 프로세스 풀 실행 + 작업별 진행률을 평균해서 표시"""
+            job_pct = [0] * len(jobs)  # 같은 업체 파일이 여러 개여도 서로 덮어쓰지 않게 작업 번호로
+
+            def progress_callback(index, vendor_key, pct, msg):
+                job_pct[index] = pct
+                overall = int(sum(job_pct) / len(job_pct))
+                self.root.after(0, lambda p=overall, m=f"[{vendor_key}] {msg}": self._update_progress(p, 100, m))
+
+            try:
+                results = run_builds_parallel(jobs, workers, progress_callback)
+                failed = [r for r in results if not r.ok]
+                skipped = [r for r in results if r.skipped]
+                lines = []
+                for r in results:
+                    if r.skipped:
+                        lines.append(f"{r.vendor_key}: 변경 없음 - 이전 결과 사용")
+                    elif r.ok:
+                        lines.append(f"{r.vendor_key}: 추가 {len(r.missing_stores)}개, 제외 {len(r.excluded_stores)}개 ({r.elapsed:.1f}초)")
+                    else:
+                        lines.append(f"{r.vendor_key}: 오류 - {r.error}")
+                summary = f"완료! 성공 {len(results) - len(failed)}개 (건너뜀 {len(skipped)}개), 실패 {len(failed)}개"
+                self.root.after(0, lambda m=summary: self._update_progress(100, 100, m))
+                self.root.after(0, lambda t="\n".join(lines), bad=bool(failed): (
+                    messagebox.showwarning if bad else messagebox.showinfo)("일괄 실행 결과", t))
+            except Exception as e:
+                error_msg = f"오류: {str(e)}"
+                self.root.after(0, lambda m=error_msg: self._update_progress(0, 100, m))
+            finally:
+                self.root.after(0, lambda: self.run_button.config(state="normal"))
+                self.root.after(0, lambda: self.batch_button.config(state="normal"))
+
     root = tk.Tk()
     app = InvoiceBuilderApp(root)
     root.mainloop()
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+전체리스트(.xls/.xlsx) 스냅샷 캐시
+
+xlrd로 .xls를 읽는 데 몇 초씩 걸리므로, 한 번 읽은 시트를 열 기반 스냅샷(Parquet)으로
+저장해 두고 다음부터는 스냅샷을 읽는다. 같은 프로세스 안에서는 메모리 LRU가 한 번 더 앞에 있음.
+
+캐시 키:
+    - 원본 파일 (절대경로, 크기, 수정시간) → 그대로면 해시 계산 없이 바로 스냅샷 사용
+    - 수정시간만 바뀐 경우(OneDrive 재동기화 등) 내용 해시(sha256)가 같으면 기존 스냅샷 재사용
+    - 시트 이름/헤더 행이 다르면 다른 스냅샷
+
+스냅샷 형식:
+    - Parquet (pyarrow, requirements.txt에 포함) - 읽어서 원본과 똑같은지 확인된 경우만
+      (숫자 헤더처럼 문자열이 아닌 열 이름과 object 열 위치는 메타데이터에 따로 두고 읽을 때 되돌림)
+    - 섞인 타입 열 등 Parquet으로 그대로 되돌릴 수 없는 시트만 pickle
+      (pyarrow가 빠진 설치에서는 경고를 한 번 출력하고 모두 pickle)
+
+끄는 방법: set LIST_CACHE=0
+
+사용 예:
+    df = list_cache.read_excel_cached(path, sheet_name=0, header=2, engine="xlrd")
+    # 반환된 DataFrame은 캐시와 공유되므로 수정하지 말 것 (수정하려면 .copy())
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+try:
+    import pyarrow  # Parquet 저장용 (requirements.txt)
+    import pyarrow.parquet
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "list_cache")
+MEMORY_CACHE_SIZE = 8      # 프로세스당 메모리에 둘 DataFrame 수
+MAX_SNAPSHOTS = 40         # 디스크에 남길 스냅샷 수 (오래된 것부터 삭제)
+ENABLED = os.environ.get("LIST_CACHE", "1") not in ("0", "")
+
+SheetName = Union[str, int]
+
+# (절대경로, 크기, 수정시간, 시트, 헤더) → DataFrame
+_memory: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _meta_path(abs_path: str) -> str:
+    """원본 경로별 메타 파일 (크기/수정시간/내용 해시)"""
+    key = hashlib.sha1(os.path.normcase(abs_path).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.meta.json")
+
+
+def _snapshot_base(content_hash: str, sheet_name: SheetName, header: int) -> str:
+    params = hashlib.sha1(json.dumps([sheet_name, header], ensure_ascii=False).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(CACHE_DIR, f"{content_hash[:24]}_{params}")
+
+
+def _load_meta(abs_path: str) -> Optional[Dict[str, object]]:
+    path = _meta_path(abs_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _temp_path(path: str) -> str:
+    """path 옆의 겹치지 않는 임시 파일 (병렬 작업자 여러 프로세스가 같은 캐시를 동시에 써도 안전하게)"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    return temp_path
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _save_meta(abs_path: str, meta: Dict[str, object]):
+    path = _meta_path(abs_path)
+    temp_path = _temp_path(path)
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except Exception:
+        _remove_quietly(temp_path)
+        raise
+
+
+def _read_snapshot(base: str) -> Optional[pd.DataFrame]:
+    try:
+        if HAS_PYARROW and os.path.exists(base + ".parquet"):
+            return _read_parquet(base + ".parquet")
+        if os.path.exists(base + ".pkl"):
+            return pd.read_pickle(base + ".pkl")
+    except Exception as e:
+        print(f"전체리스트 스냅샷 읽기 실패 (원본에서 다시 읽음): {e}")
+    return None
+
+
+# Parquet 스키마 메타데이터: 원래 열 이름, object 열 위치 (JSON)
+_COLUMNS_META_KEY = b"list_cache.columns"
+_OBJECT_META_KEY = b"list_cache.object_columns"
+
+
+def _write_parquet(path: str, df: pd.DataFrame):
+    """
+    열 이름은 문자열로 바꿔 저장하고 원래 이름(숫자 헤더 등)은 메타데이터에 (JSON으로 못 쓰면 예외 → pickle)
+    dtype=object로 읽은 열은 Parquet에서 int64 등으로 바뀌므로 위치를 남겨 두고 읽을 때 object로 되돌림
+    """
+    columns = json.dumps(list(df.columns), ensure_ascii=False)
+    object_columns = [i for i, dtype in enumerate(df.dtypes) if dtype == object]
+    frame = df.set_axis([str(c) for c in df.columns], axis=1)
+    for i in object_columns:
+        # NaN(float)이 섞이면 정수 열이 실수로 저장되므로 빈 셀은 None으로 넘김 (읽을 때 NaN으로 되돌림)
+        column = frame.iloc[:, i]
+        frame.isetitem(i, column.where(column.notna(), None))
+    table = pyarrow.Table.from_pandas(frame, preserve_index=True)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _COLUMNS_META_KEY: columns.encode("utf-8"),
+        _OBJECT_META_KEY: json.dumps(object_columns).encode("utf-8"),
+    })
+    pyarrow.parquet.write_table(table, path)
+
+
+def _read_parquet(path: str) -> pd.DataFrame:
+    table = pyarrow.parquet.read_table(path)
+    df = table.to_pandas(integer_object_nulls=True)   # 빈 셀이 있는 정수 열도 실수로 바꾸지 않음
+    metadata = table.schema.metadata or {}
+    for i in json.loads(metadata.get(_OBJECT_META_KEY, b"[]").decode("utf-8")):
+        column = df.iloc[:, i].astype(object)
+        # 빈 셀은 read_excel처럼 NaN (Parquet에서는 None으로 돌아옴)
+        df[df.columns[i]] = column.where(column.notna(), float("nan"))
+    if _COLUMNS_META_KEY in metadata:
+        df.columns = json.loads(metadata[_COLUMNS_META_KEY].decode("utf-8"))
+    return df
+
+
+def _same_frame(restored: pd.DataFrame, df: pd.DataFrame) -> bool:
+    """
+    값, 열 이름, object 열 값의 타입까지 같은지
+    (equals만 보면 1과 1.0이 같다고 나와서 숫자 로그인ID가 '1.0'으로 바뀌는 것을 못 잡음)
+    """
+    if not restored.equals(df) or list(restored.columns) != list(df.columns):
+        return False
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object and not (restored.iloc[:, i].map(type).values == df.iloc[:, i].map(type).values).all():
+            return False
+    return True
+
+
+_warned_no_pyarrow = False
+
+
+def _write_snapshot(base: str, df: pd.DataFrame):
+    """Parquet으로 저장하고 그대로 읽히는지 확인, 안 되면 pickle"""
+    global _warned_no_pyarrow
+    if not HAS_PYARROW and not _warned_no_pyarrow:
+        _warned_no_pyarrow = True
+        print("pyarrow가 없어 전체리스트 스냅샷을 pickle로 저장 (pip install -r requirements.txt)")
+    if HAS_PYARROW:
+        temp_path = _temp_path(base + ".parquet")
+        try:
+            _write_parquet(temp_path, df)
+            if _same_frame(_read_parquet(temp_path), df):
+                os.replace(temp_path, base + ".parquet")
+                return
+        except Exception:
+            pass  # 섞인 타입 열 / 문자열이 아닌 헤더 등 → pickle
+        _remove_quietly(temp_path)
+    temp_path = _temp_path(base + ".pkl")
+    try:
+        df.to_pickle(temp_path)
+        os.replace(temp_path, base + ".pkl")
+    except Exception:
+        _remove_quietly(temp_path)
+        raise
+
+
+def _prune_snapshots():
+    """스냅샷이 MAX_SNAPSHOTS개를 넘으면 오래된 것부터 삭제"""
+    snapshots = [
+        os.path.join(CACHE_DIR, name) for name in os.listdir(CACHE_DIR)
+        if name.endswith(".parquet") or name.endswith(".pkl")
+    ]
+    if len(snapshots) <= MAX_SNAPSHOTS:
+        return
+    snapshots.sort(key=os.path.getmtime)
+    for path in snapshots[:len(snapshots) - MAX_SNAPSHOTS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _remember(key: Tuple, df: pd.DataFrame):
+    _memory[key] = df
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+def clear_memory_cache():
+    _memory.clear()
+
+
+def content_hash(path: str) -> str:
+    """
+    파일 내용 sha256 - 크기/수정시간이 지난번과 같으면 저장된 해시 사용 (store_master도 사용)
+    """
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta = _load_meta(abs_path)
+    if meta and meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns:
+        return meta["sha256"]
+    digest = _file_sha256(abs_path)
+    try:
+        _save_meta(abs_path, {
+            "path": abs_path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest,
+        })
+    except Exception as e:
+        # 저장 못 해도 다음에 해시를 다시 계산할 뿐 (다른 작업자가 같은 파일을 동시에 쓰는 경우 등)
+        print(f"전체리스트 메타 저장 실패 (계속 진행): {e}")
+    return digest
+
+
+def read_excel_cached(
+    path: str,
+    sheet_name: SheetName = 0,
+    header: int = 0,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    pd.read_excel(path, sheet_name, header, engine, dtype=object)와 같은 결과를 캐시에서 반환
+    - 메모리 LRU → 디스크 스냅샷 → 원본 순서로 찾음
+    - 반환값은 캐시와 공유되므로 수정 금지
+    """
+    if not ENABLED:
+        return pd.read_excel(path, sheet_name=sheet_name, header=header, engine=engine, dtype=object)
+
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    memory_key = (os.path.normcase(abs_path), stat.st_size, stat.st_mtime_ns, sheet_name, header)
+    if memory_key in _memory:
+        _memory.move_to_end(memory_key)
+        return _memory[memory_key]
+
+    base = _snapshot_base(content_hash(abs_path), sheet_name, header)
+    df = _read_snapshot(base)
+    if df is None:
+        df = pd.read_excel(abs_path, sheet_name=sheet_name, header=header, engine=engine, dtype=object)
+        try:
+            _write_snapshot(base, df)
+            _prune_snapshots()
+        except Exception as e:
+            print(f"전체리스트 스냅샷 저장 실패 (캐시 없이 계속): {e}")
+
+    _remember(memory_key, df)
+    return df
+
+
+if __name__ == "__main__":
+    # 사용법: python list_cache.py 전체리스트.xls [헤더행(1부터)]
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        print("사용법: python list_cache.py <전체리스트 파일> [헤더 행 번호]")
+        sys.exit(1)
+    file_path = sys.argv[1]
+    header_row = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    file_engine = "xlrd" if file_path.lower().endswith(".xls") else "openpyxl"
+
+    for label in ("첫 번째 (원본 또는 디스크 스냅샷)", "두 번째 (메모리)"):
+        started = time.perf_counter()
+        frame = read_excel_cached(file_path, header=header_row - 1, engine=file_engine)
+        print(f"{label}: {len(frame)}행, {(time.perf_counter() - started) * 1000:.1f}ms")
+    clear_memory_cache()
+    started = time.perf_counter()
+    frame = read_excel_cached(file_path, header=header_row - 1, engine=file_engine)
+    print(f"메모리 비운 뒤 (디스크 스냅샷): {len(frame)}행, {(time.perf_counter() - started) * 1000:.1f}ms")
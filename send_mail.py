@@ -50,6 +50,8 @@ except ImportError:
     print("[오류] pywin32 없음 → pip install pywin32")
     sys.exit(1)
 
+import com_profiler  # COM 호출 프로파일링 (COM_PROFILE=1일 때만 동작)
+
 try:
     import tkinter as tk
     from tkinter import ttk, messagebox
@@ -258,7 +260,7 @@ def 발송목록_만들기(df: pd.DataFrame, 로그: logging.Logger) -> list[dic
 
 def Outlook_연결() -> Any | None:
     try:
-        outlook = win32.Dispatch("Outlook.Application")
+        outlook = com_profiler.wrap(win32.Dispatch("Outlook.Application"), "Outlook")
         outlook.GetNamespace("MAPI")
         return outlook
     except Exception as e:
@@ -808,6 +810,8 @@ def main() -> int:
         return 0
 
     finally:
+        # COM 호출 통계 (COM_PROFILE=1일 때만)
+        com_profiler.print_report()
         logging.shutdown()
 
 
@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+"""
+매장 마스터 (로컬 SQLite)
+
+전체리스트를 받을 때마다 바뀐 행만 반영해 두고(스냅샷 단위 변경 이력 포함),
+invoice_builder가 빌드 후 ID 시트 매핑(로그인ID ↔ 명세서 매장명)을 기록한다.
+로그인ID / 기업명 / 그룹명에 인덱스가 있으므로 업체별 행 조회, "지난달 이후 새로 들어온 매장" 같은 질의가 바로 나옴.
+
+테이블:
+    snapshots      불러온 전체리스트 (내용 해시, 다운로드 날짜, 추가/변경/삭제 수)
+    stores         가장 최근 스냅샷 기준 매장 (행 원본 포함, 삭제된 매장은 active=0)
+    store_history  스냅샷별 변경 (added / moved(기업 변경) / changed(매장명·그룹명) / removed)
+    id_mappings    업체별 ID 시트 매핑 (빌드 후 기록)
+
+다운로드 날짜: 파일명의 날짜(20251201, 2025-12-01 등) → 없으면 파일 수정 날짜
+읽는 형식(시트 / 헤더 행 / 로그인ID 열 / 그룹명 열)은 처음 반영한 것과 같아야 함 (다르면 ValueError)
+
+끄는 방법: set STORE_MASTER=0
+
+사용 예:
+    python store_master.py load 전체리스트_20251201.xls
+    python store_master.py joined 맘스터치                 (지난달 1일 이후 새로 들어온 매장)
+    python store_master.py joined 맘스터치 --since 2025-11-15
+    python store_master.py left KFC
+    python store_master.py id E08886
+    python store_master.py group 타코벨
+"""
+
+import os
+import re
+import json
+import math
+import sqlite3
+import hashlib
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+import list_cache
+
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "store_master.db")
+ENABLED = os.environ.get("STORE_MASTER", "1") not in ("0", "")
+LOCK_TIMEOUT = 60  # 병렬 작업자가 동시에 불러올 때 기다리는 시간(초)
+
+# 전체리스트 헤더명
+COMPANY_HEADER = "기업명"
+STORE_HEADER = "매장명"
+GROUP_HEADER = "그룹명"
+
+DATE_IN_NAME_PAT = re.compile(r"(20\d{2})[-_.]?(0[1-9]|1[0-2])[-_.]?(0[1-9]|[12]\d|3[01])")
+
+CHANGE_ADDED = "added"
+CHANGE_MOVED = "moved"       # 기업명이 바뀜 (다른 기업에서 넘어옴)
+CHANGE_CHANGED = "changed"   # 매장명/그룹명이 바뀜
+CHANGE_REMOVED = "removed"
+
+SheetName = Union[str, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    snapshot_key TEXT UNIQUE NOT NULL,
+    source_path TEXT,
+    content_hash TEXT,
+    sheet TEXT,
+    header_row INTEGER,
+    id_col TEXT,
+    download_date TEXT,
+    loaded_at TEXT,
+    row_count INTEGER,
+    headers TEXT,
+    applied INTEGER DEFAULT 0,
+    added INTEGER DEFAULT 0,
+    changed INTEGER DEFAULT 0,
+    removed INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS stores (
+    row_key TEXT PRIMARY KEY,
+    login_id TEXT NOT NULL,
+    company TEXT,
+    store_name TEXT,
+    group_name TEXT,
+    row_no INTEGER,
+    raw TEXT,
+    active INTEGER DEFAULT 1,
+    first_seen TEXT,
+    last_seen TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stores_login ON stores(login_id);
+CREATE INDEX IF NOT EXISTS idx_stores_company ON stores(company, active);
+CREATE INDEX IF NOT EXISTS idx_stores_group ON stores(group_name, active);
+CREATE TABLE IF NOT EXISTS store_history (
+    snapshot_id INTEGER,
+    download_date TEXT,
+    login_id TEXT,
+    change TEXT,
+    company TEXT,
+    store_name TEXT,
+    group_name TEXT,
+    prev_company TEXT,
+    prev_store_name TEXT,
+    prev_group_name TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_company ON store_history(company, change, download_date);
+CREATE INDEX IF NOT EXISTS idx_history_group ON store_history(group_name, change, download_date);
+CREATE INDEX IF NOT EXISTS idx_history_login ON store_history(login_id);
+CREATE TABLE IF NOT EXISTS id_mappings (
+    vendor TEXT,
+    login_id TEXT,
+    invoice_store TEXT,
+    list_store TEXT,
+    invoice_path TEXT,
+    recorded_at TEXT,
+    PRIMARY KEY (vendor, login_id)
+);
+CREATE INDEX IF NOT EXISTS idx_mappings_login ON id_mappings(login_id);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _norm(x) -> str:
+    if x is None or (isinstance(x, float) and math.isnan(x)):
+        return ""
+    return str(x).strip()
+
+
+def _col_to_index(letters: str) -> int:
+    """'A' → 0"""
+    result = 0
+    for ch in letters.upper():
+        result = result * 26 + (ord(ch) - ord("A") + 1)
+    return result - 1
+
+
+def _raw_value(value):
+    """행 원본 저장용 값 (빈 셀은 null, 날짜 등은 문자열)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT:
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path or DB_PATH, timeout=LOCK_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def download_date_for(path: str) -> str:
+    """파일명에 날짜가 있으면 그 날짜, 없으면 파일 수정 날짜 (YYYY-MM-DD)"""
+    m = DATE_IN_NAME_PAT.search(os.path.basename(path))
+    if m:
+        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+
+
+def _layout(sheet_name: SheetName, header: int, id_col: str, group_col: Optional[str]) -> str:
+    """전체리스트를 어떻게 읽었는지 (시트, 헤더 행, 로그인ID 열, 그룹명 열) - 같아야 행끼리 비교 가능"""
+    return json.dumps([sheet_name, header, id_col, group_col], ensure_ascii=False)
+
+
+def _snapshot_key(content_hash: str, layout: str) -> str:
+    return hashlib.sha1(json.dumps([content_hash, layout]).encode("utf-8")).hexdigest()
+
+
+def _current_snapshot_id(conn: sqlite3.Connection) -> Optional[int]:
+    row = conn.execute("SELECT value FROM state WHERE key = 'current_snapshot'").fetchone()
+    return int(row["value"]) if row else None
+
+
+def _check_layout(conn: sqlite3.Connection, layout: str):
+    """
+    stores는 한 가지 형식으로 읽은 행만 담음 - 다른 형식으로 읽은 전체리스트를 반영하면
+    모든 매장이 삭제 + 추가로 기록되므로 거부 (예전 DB처럼 형식 기록이 없으면 그대로 진행)
+    """
+    row = conn.execute("SELECT value FROM state WHERE key = 'current_layout'").fetchone()
+    if row and row["value"] != layout:
+        raise ValueError(
+            f"전체리스트 읽는 형식(시트, 헤더 행, 로그인ID 열, 그룹명 열)이 매장 마스터와 다름: "
+            f"{layout} (현재 {row['value']})"
+        )
+
+
+def _list_rows(df: pd.DataFrame, id_col: str, group_col: Optional[str]) -> Tuple[List[str], List[Tuple]]:
+    """
+    DataFrame → (헤더, [(row_key, login_id, 기업명, 매장명, 그룹명, 행 번호, 원본 JSON)])
+    - 로그인ID가 없는 행은 건너뜀 (어차피 추출되지 않음)
+    - 같은 로그인ID가 여러 번 나오면 두 번째부터 'ID#2', 'ID#3' 키
+    """
+    headers = [str(h) for h in df.columns]
+    norm_headers = [_norm(h) for h in headers]
+    company_idx = norm_headers.index(COMPANY_HEADER) if COMPANY_HEADER in norm_headers else None
+    store_idx = norm_headers.index(STORE_HEADER) if STORE_HEADER in norm_headers else None
+    if group_col:
+        group_idx = _col_to_index(group_col)
+    else:
+        group_idx = norm_headers.index(GROUP_HEADER) if GROUP_HEADER in norm_headers else None
+    id_idx = _col_to_index(id_col)
+
+    rows = []
+    seen: Dict[str, int] = {}
+    for row_no, values in enumerate(df.itertuples(index=False, name=None)):
+        if id_idx >= len(values):
+            continue
+        login_id = _norm(values[id_idx])
+        if not login_id:
+            continue
+        seen[login_id] = seen.get(login_id, 0) + 1
+        row_key = login_id if seen[login_id] == 1 else f"{login_id}#{seen[login_id]}"
+
+        def pick(idx):
+            return _norm(values[idx]) if idx is not None and idx < len(values) else ""
+
+        raw = json.dumps([_raw_value(v) for v in values], ensure_ascii=False)
+        rows.append((row_key, login_id, pick(company_idx), pick(store_idx), pick(group_idx), row_no, raw))
+    return headers, rows
+
+
+def _apply_snapshot(conn: sqlite3.Connection, snapshot_id: int, download_date: str, rows: List[Tuple], layout: str):
+    """현재 stores와 비교해서 바뀐 행만 쓰고 변경 이력 기록"""
+    existing = {
+        r["row_key"]: r for r in conn.execute(
+            "SELECT row_key, login_id, company, store_name, group_name, row_no, raw, active FROM stores"
+        )
+    }
+    inserts, updates, history = [], [], []
+    added = changed = 0
+    incoming = set()
+
+    for row_key, login_id, company, store_name, group_name, row_no, raw in rows:
+        incoming.add(row_key)
+        old = existing.get(row_key)
+        if old is None:
+            inserts.append((row_key, login_id, company, store_name, group_name, row_no, raw, download_date, download_date))
+            history.append((snapshot_id, download_date, login_id, CHANGE_ADDED,
+                            company, store_name, group_name, None, None, None))
+            added += 1
+            continue
+
+        change = None
+        if not old["active"]:
+            change = CHANGE_ADDED  # 삭제됐다가 다시 나타남
+        elif old["company"] != company:
+            change = CHANGE_MOVED
+        elif old["store_name"] != store_name or old["group_name"] != group_name:
+            change = CHANGE_CHANGED
+        if change:
+            history.append((snapshot_id, download_date, login_id, change, company, store_name, group_name,
+                            old["company"], old["store_name"], old["group_name"]))
+            changed += 1
+        if change or old["raw"] != raw or old["row_no"] != row_no:
+            updates.append((company, store_name, group_name, row_no, raw, download_date, row_key))
+
+    removed_rows = [r for key, r in existing.items() if r["active"] and key not in incoming]
+    for r in removed_rows:
+        history.append((snapshot_id, download_date, r["login_id"], CHANGE_REMOVED,
+                        r["company"], r["store_name"], r["group_name"], None, None, None))
+
+    conn.executemany(
+        "INSERT INTO stores (row_key, login_id, company, store_name, group_name, row_no, raw, active, first_seen, last_seen)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)", inserts
+    )
+    conn.executemany(
+        "UPDATE stores SET company = ?, store_name = ?, group_name = ?, row_no = ?, raw = ?, active = 1, last_seen = ?"
+        " WHERE row_key = ?", updates
+    )
+    conn.executemany("UPDATE stores SET active = 0 WHERE row_key = ?", [(r["row_key"],) for r in removed_rows])
+    conn.executemany("INSERT INTO store_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", history)
+    conn.execute(
+        "UPDATE snapshots SET applied = 1, added = ?, changed = ?, removed = ? WHERE id = ?",
+        (added, changed, len(removed_rows), snapshot_id),
+    )
+    conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('current_snapshot', ?)", (str(snapshot_id),))
+    conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('current_layout', ?)", (layout,))
+
+
+def ingest_list(
+    list_path: str,
+    sheet_name: SheetName = 0,
+    header: int = 2,
+    engine: Optional[str] = None,
+    id_col: str = "D",
+    group_col: Optional[str] = "B",
+    download_date: Optional[str] = None,
+    db_path: Optional[str] = None,
+) -> Tuple[int, bool]:
+    """
+    전체리스트를 매장 마스터에 반영 (같은 내용이면 아무것도 안 함)
+    - header: pandas header (0부터, header_row - 1)
+    - 지금 기준보다 다운로드 날짜가 이전인 파일은 스냅샷만 기록하고 stores에는 반영하지 않음
+    - 지금 기준과 읽는 형식(시트/헤더/로그인ID 열/그룹명 열)이 다르면 ValueError
+    Returns: (스냅샷 id, 지금 stores가 이 스냅샷 기준인지)
+    """
+    abs_path = os.path.abspath(list_path)
+    content_hash = list_cache.content_hash(abs_path)
+    layout = _layout(sheet_name, header, id_col, group_col)
+    key = _snapshot_key(content_hash, layout)
+    download_date = download_date or download_date_for(abs_path)
+
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT id FROM snapshots WHERE snapshot_key = ?", (key,)).fetchone()
+        if row:
+            return row["id"], row["id"] == _current_snapshot_id(conn)
+        _check_layout(conn, layout)
+
+        df = list_cache.read_excel_cached(abs_path, sheet_name=sheet_name, header=header, engine=engine)
+        headers, rows = _list_rows(df, id_col, group_col)
+
+        # 쓰기 잠금을 잡은 뒤 다른 작업자가 먼저 불러왔는지 다시 확인
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT id FROM snapshots WHERE snapshot_key = ?", (key,)).fetchone()
+        if row:
+            conn.rollback()
+            return row["id"], row["id"] == _current_snapshot_id(conn)
+        _check_layout(conn, layout)
+
+        current_id = _current_snapshot_id(conn)
+        current = conn.execute(
+            "SELECT download_date FROM snapshots WHERE id = ?", (current_id,)
+        ).fetchone() if current_id else None
+
+        cursor = conn.execute(
+            "INSERT INTO snapshots (snapshot_key, source_path, content_hash, sheet, header_row, id_col,"
+            " download_date, loaded_at, row_count, headers) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, abs_path, content_hash, str(sheet_name), header, id_col, download_date,
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S"), len(rows), json.dumps(headers, ensure_ascii=False)),
+        )
+        snapshot_id = cursor.lastrowid
+        is_current = current is None or download_date >= current["download_date"]
+        if is_current:
+            _apply_snapshot(conn, snapshot_id, download_date, rows, layout)
+        conn.commit()
+        return snapshot_id, is_current
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def company_frame(
+    list_path: str,
+    company: str,
+    sheet_name: SheetName = 0,
+    header: int = 2,
+    engine: Optional[str] = None,
+    id_col: str = "D",
+    group_col: Optional[str] = "B",
+    db_path: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    전체리스트 중 기업명이 company인 행만 원래 열/순서 그대로 DataFrame으로 반환 (인덱스 조회)
+    - 처음 보는 파일이면 먼저 불러옴
+    - 이 파일이 최신 스냅샷이 아니면 None (호출하는 쪽에서 엑셀을 직접 읽음)
+    - 매장 마스터와 읽는 형식이 다르면 ingest_list의 ValueError 그대로
+    """
+    if not ENABLED:
+        return None
+    snapshot_id, is_current = ingest_list(list_path, sheet_name, header, engine, id_col, group_col, db_path=db_path)
+    if not is_current:
+        return None
+
+    conn = connect(db_path)
+    try:
+        headers = json.loads(conn.execute("SELECT headers FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()["headers"])
+        rows = [
+            [float("nan") if v is None else v for v in json.loads(r["raw"])]
+            for r in conn.execute(
+                "SELECT raw FROM stores WHERE company = ? AND active = 1 ORDER BY row_no", (company,)
+            )
+        ]
+    finally:
+        conn.close()
+    return pd.DataFrame(rows, columns=headers, dtype=object) if rows else pd.DataFrame(columns=headers, dtype=object)
+
+
+def record_id_mappings(
+    vendor: str,
+    mappings: Iterable[Tuple[str, str, str]],
+    invoice_path: str = "",
+    db_path: Optional[str] = None,
+):
+    """빌드 후 ID 시트 매핑 기록 [(로그인ID, 명세서 매장명, 전체리스트 매장명)] - 빈 값은 기존 값 유지"""
+    if not ENABLED:
+        return
+    recorded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = [(vendor, login_id, invoice_store or None, list_store or None, invoice_path, recorded_at)
+            for login_id, invoice_store, list_store in mappings if login_id]
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO id_mappings (vendor, login_id, invoice_store, list_store, invoice_path, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(vendor, login_id) DO UPDATE SET"
+                " invoice_store = COALESCE(excluded.invoice_store, invoice_store),"
+                " list_store = COALESCE(excluded.list_store, list_store),"
+                " invoice_path = excluded.invoice_path, recorded_at = excluded.recorded_at",
+                rows,
+            )
+    finally:
+        conn.close()
+
+
+# ----------------------------
+# 조회
+# ----------------------------
+def first_day_of_last_month(today: Optional[date] = None) -> str:
+    today = today or date.today()
+    year, month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    return f"{year:04d}-{month:02d}-01"
+
+
+def _query(sql: str, params: Tuple, db_path: Optional[str] = None) -> List[Dict[str, object]]:
+    conn = connect(db_path)
+    try:
+        return [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def joined_since(company: str, since: Optional[str] = None, db_path: Optional[str] = None) -> List[Dict[str, object]]:
+    """since(YYYY-MM-DD, 기본 지난달 1일) 이후 company에 새로 들어온 매장 (신규 + 다른 기업에서 이동)"""
+    return _query(
+        "SELECT download_date, login_id, store_name, group_name, change, prev_company FROM store_history"
+        " WHERE company = ? AND change IN (?, ?) AND download_date >= ? ORDER BY download_date, store_name",
+        (company, CHANGE_ADDED, CHANGE_MOVED, since or first_day_of_last_month()), db_path,
+    )
+
+
+def left_since(company: str, since: Optional[str] = None, db_path: Optional[str] = None) -> List[Dict[str, object]]:
+    """since 이후 company에서 빠진 매장 (전체리스트에서 삭제 + 다른 기업으로 이동)"""
+    return _query(
+        "SELECT download_date, login_id, store_name, group_name, change, company AS new_company FROM store_history"
+        " WHERE download_date >= ? AND ((company = ? AND change = ?) OR (prev_company = ? AND change = ?))"
+        " ORDER BY download_date, store_name",
+        (since or first_day_of_last_month(), company, CHANGE_REMOVED, company, CHANGE_MOVED), db_path,
+    )
+
+
+def find_login_id(login_id: str, db_path: Optional[str] = None) -> Dict[str, List[Dict[str, object]]]:
+    """로그인ID의 현재 행, 업체별 ID 시트 매핑, 변경 이력"""
+    return {
+        "stores": _query(
+            "SELECT login_id, company, store_name, group_name, active, first_seen, last_seen FROM stores"
+            " WHERE login_id = ?", (login_id,), db_path,
+        ),
+        "mappings": _query(
+            "SELECT vendor, invoice_store, list_store, invoice_path, recorded_at FROM id_mappings WHERE login_id = ?",
+            (login_id,), db_path,
+        ),
+        "history": _query(
+            "SELECT download_date, change, company, store_name, group_name, prev_company, prev_store_name"
+            " FROM store_history WHERE login_id = ? ORDER BY download_date", (login_id,), db_path,
+        ),
+    }
+
+
+def stores_in_group(group_name: str, db_path: Optional[str] = None) -> List[Dict[str, object]]:
+    return _query(
+        "SELECT login_id, company, store_name, first_seen FROM stores"
+        " WHERE group_name = ? AND active = 1 ORDER BY store_name", (group_name,), db_path,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="매장 마스터 (SQLite)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("load", help="전체리스트 불러오기")
+    p.add_argument("path")
+    p.add_argument("--date", help="다운로드 날짜 (YYYY-MM-DD, 기본: 파일명/수정 날짜)")
+    p.add_argument("--header-row", type=int, default=3, help="헤더 행 번호 (1부터)")
+    for name, help_text in (("joined", "새로 들어온 매장"), ("left", "빠진 매장")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("company")
+        p.add_argument("--since", help="YYYY-MM-DD (기본: 지난달 1일)")
+    sub.add_parser("id", help="로그인ID 조회").add_argument("login_id")
+    sub.add_parser("group", help="그룹명으로 매장 조회").add_argument("group_name")
+    args = parser.parse_args()
+
+    if args.command == "load":
+        file_engine = "xlrd" if args.path.lower().endswith(".xls") else "openpyxl"
+        try:
+            sid, current = ingest_list(args.path, header=args.header_row - 1, engine=file_engine, download_date=args.date)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        info = _query("SELECT download_date, row_count, added, changed, removed FROM snapshots WHERE id = ?", (sid,))[0]
+        print(f"스냅샷 {sid} ({info['download_date']}): {info['row_count']}행, 추가 {info['added']}, "
+              f"변경 {info['changed']}, 삭제 {info['removed']}" + ("" if current else " (이전 날짜라 현재 기준에는 반영 안 함)"))
+    elif args.command in ("joined", "left"):
+        func = joined_since if args.command == "joined" else left_since
+        rows = func(args.company, args.since)
+        print(f"{args.company}: {len(rows)}개 ({args.since or first_day_of_last_month()} 이후)")
+        for r in rows:
+            print(f"  {r['download_date']}  {r['login_id']:<12} {r['store_name']}  [{r['change']}]")
+    elif args.command == "id":
+        print(json.dumps(find_login_id(args.login_id), ensure_ascii=False, indent=2))
+    elif args.command == "group":
+        for r in stores_in_group(args.group_name):
+            print(f"  {r['login_id']:<12} {r['company']}  {r['store_name']}")
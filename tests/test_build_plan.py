@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""BuildPlan 저장/재사용: 미리보기 계획을 다시 읽어도 ID 시트 매핑이 남아 있어야 매장 마스터에 기록됨, 날짜는 계획의 셀에 입력"""
+
+import dataclasses
+import json
+import os
+import sys
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import invoice_builder as ib  # noqa: E402
+
+
+def test_plan_keeps_id_sheet_mapping_after_round_trip():
+    vendor = next(iter(ib.VENDOR_CONFIGS.values()))
+    plan = ib.plan_build(
+        "test", vendor,
+        id_to_store={"a1": "가게A", "b2": "가게B"}, id_to_group={}, id_to_extra={},
+        store_to_id={"가게A 본점": "a1"}, id_to_store_invoice={"a1": "가게A 본점"},
+        sheet_store_names={"상세내역": ["가게A 본점"]},
+    )
+    reloaded = ib.BuildPlan.from_dict(json.loads(json.dumps(plan.to_dict(), ensure_ascii=False)))
+
+    assert reloaded.id_sheet_mapping == [("a1", "가게A 본점")]
+    assert reloaded.id_sheet_additions == [("b2", "가게B")]
+
+
+def test_old_plan_file_without_mapping_still_loads():
+    data = ib.plan_build(
+        "test", next(iter(ib.VENDOR_CONFIGS.values())),
+        {}, {}, {}, {}, {}, {},
+    ).to_dict()
+    del data["id_sheet_mapping"]
+    assert ib.BuildPlan.from_dict(data).id_sheet_mapping == []
+
+
+def test_plan_without_date_cell_stores_empty_string():
+    vendor = dataclasses.replace(next(iter(ib.VENDOR_CONFIGS.values())), date_cell=None)
+    plan = ib.plan_build("test", vendor, {}, {}, {}, {}, {}, {}, date_value="2025-12-01")
+    assert plan.date_cell == ""
+
+    data = plan.to_dict()
+    data["date_cell"] = None  # 예전 계획 파일
+    assert ib.BuildPlan.from_dict(data).date_cell == ""
+
+
+def test_apply_writes_date_to_plan_cell():
+    vendor = next(iter(ib.VENDOR_CONFIGS.values()))
+    wb = Workbook()
+    plan = ib.BuildPlan("test", date_cell="D4", date_value="2025-12-01")
+
+    ib.apply_build_plan(ib.OpenpyxlInvoiceBackend(), wb, plan, vendor, sheet_names=[])
+
+    assert wb.worksheets[0]["D4"].value == "2025-12-01"
+    if vendor.date_cell and vendor.date_cell != "D4":
+        assert wb.worksheets[0][vendor.date_cell].value is None
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""일괄 실행 진행률: 같은 업체 파일이 여러 개여도 작업 번호로 구분돼야 함"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import invoice_builder as ib  # noqa: E402
+
+
+def test_progress_is_reported_per_job_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(ib.store_master, "ENABLED", False)
+    vendor_key = next(iter(ib.VENDOR_CONFIGS))
+    jobs = [
+        ib.BuildJob(vendor_key, str(tmp_path / "없는 전체리스트.xlsx"), str(tmp_path / f"명세서{i}.xlsx"),
+                    str(tmp_path / f"완성{i}.xlsx"), backend="openpyxl")
+        for i in range(2)
+    ]
+    calls = []
+
+    results = ib.run_builds_parallel(jobs, workers=1, preflight=False,
+                                     progress_callback=lambda *args: calls.append(args))
+
+    assert [r.ok for r in results] == [False, False]
+    assert {index for index, *_ in calls} == {0, 1}
+    assert all(key == vendor_key for _, key, _, _ in calls)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""전체리스트 스냅샷: Parquet으로 저장해도 read_excel(dtype=object) 결과와 값·타입이 같아야 함"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pyarrow")
+import list_cache  # noqa: E402
+
+
+def _round_trip(tmp_path, df):
+    base = str(tmp_path / "snap")
+    list_cache._write_snapshot(base, df)
+    return list_cache._read_snapshot(base), sorted(os.path.splitext(f)[1] for f in os.listdir(tmp_path))
+
+
+def test_object_columns_round_trip_through_parquet(tmp_path):
+    df = pd.DataFrame({
+        "로그인ID": pd.Series(["a01", "b02", float("nan")], dtype=object),
+        "매장코드": pd.Series([101, 102, float("nan")], dtype=object),
+        2025: pd.Series([float("nan")] * 3, dtype=object),    # 숫자 헤더, 빈 열
+    })
+    restored, files = _round_trip(tmp_path, df)
+
+    assert files == [".parquet"]
+    assert list(restored.columns) == ["로그인ID", "매장코드", 2025]
+    for column in df.columns:
+        assert [type(v) for v in restored[column]] == [type(v) for v in df[column]]
+
+
+@pytest.mark.parametrize("values", [[1, "a"], [1, 2.5]])
+def test_mixed_type_column_falls_back_to_pickle(tmp_path, values):
+    df = pd.DataFrame({"id": pd.Series(values, dtype=object)})
+    restored, files = _round_trip(tmp_path, df)
+
+    assert files == [".pkl"]
+    assert [type(v) for v in restored["id"]] == [type(v) for v in values]
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""MatchIndex 제안 점수: 흔한 n-gram을 후보 선정에서 빼도 점수(Dice)는 인덱스 크기와 무관해야 함"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import invoice_builder as ib  # noqa: E402
+
+
+def _dice(a: str, b: str) -> float:
+    ga, gb = ib.char_ngrams(a), ib.char_ngrams(b)
+    return 2 * len(ga & gb) / (len(ga) + len(gb))
+
+
+def _score(index: ib.MatchIndex, login_id: str, candidate: str) -> float:
+    for suggestion in index.suggest(login_id, limit=len(index.id_to_store)):
+        if suggestion.login_id == candidate:
+            return suggestion.score
+    return 0.0
+
+
+def _big_index(extra: dict) -> ib.MatchIndex:
+    # "E0", "08" 같은 n-gram이 MATCH_MAX_POSTINGS보다 흔해지도록 비슷한 ID를 많이 넣음
+    id_to_store = {f"E0{i:04d}": f"커피 {i}호점" for i in range(1000)}
+    id_to_store.update(extra)
+    return ib.MatchIndex(id_to_store)
+
+
+def test_id_score_does_not_depend_on_index_size():
+    extra = {"E08886": "강남점", "E08868": "역삼점"}
+    small = ib.MatchIndex(extra)
+    big = _big_index(extra)
+    for query, candidate in (("E0886", "E08886"), ("E08868X", "E08868")):
+        expected = round(_dice(query.casefold(), candidate.casefold()), 3)
+        assert _score(small, query, candidate) == expected
+        assert _score(big, query, candidate) == expected
+
+
+def test_store_score_does_not_depend_on_index_size():
+    extra = {"Z9999": "커피 강남역점"}
+    small = ib.MatchIndex(extra)
+    big = _big_index(extra)
+    small_scores = {s.login_id: s.score for s in small.suggest(store_name="커피 강남역 1호점")}
+    big_scores = {s.login_id: s.score for s in big.suggest(store_name="커피 강남역 1호점")}
+    assert small_scores["Z9999"] == big_scores["Z9999"]
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""사본 안의 연/월 바꾸기: 셀 문자열에서는 연/월 표기만 바꾸고 주문번호·소수·백분율은 그대로"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("tkinterdnd2")
+pytest.importorskip("win32com.client")
+import excel_copy as ec  # noqa: E402
+
+UNCHANGED = [
+    "주문번호 202511",
+    "25.11 매출",
+    "수수료 25.11%",
+    "수수료 2025.11%",
+    "단가 1.2025.11",
+    "2025.115",
+    "매장코드 2511",
+    "정산일 2025.11.30",
+    "1225년11월",
+    "25년10월 정산",
+]
+
+CHANGED = [
+    ("25년11월 정산", "25년12월 정산"),
+    ("2025년 11월분", "2025년 12월분"),
+    ("기간: 2025.11", "기간: 2025.12"),
+    ("2025.11 / 25년 11월", "2025.12 / 25년 12월"),
+]
+
+
+@pytest.mark.parametrize("text", UNCHANGED)
+def test_cell_text_without_year_month_is_unchanged(text):
+    assert ec.shift_month_text(text, 2025, 11) == (text, 0)
+
+
+@pytest.mark.parametrize("text, expected", CHANGED)
+def test_cell_year_month_is_shifted(text, expected):
+    new_text, count = ec.shift_month_text(text, 2025, 11)
+    assert new_text == expected and count > 0
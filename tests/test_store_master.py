@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""매장 마스터: 다른 형식으로 읽은 전체리스트가 stores를 통째로 바꾸고 이력을 망가뜨리면 안 됨"""
+
+import os
+import sys
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import list_cache  # noqa: E402
+import store_master  # noqa: E402
+
+
+@pytest.fixture
+def list_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(list_cache, "CACHE_DIR", str(tmp_path / "list_cache"))
+    list_cache.clear_memory_cache()
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["전체리스트"])
+    ws.append([])
+    ws.append(["기업명", "그룹명", "매장명", "로그인ID", "최근로그인시간"])
+    ws.append(["KFC", "타코벨", "강남점", "k001", "2025-11-30"])
+    ws.append(["KFC", "", "역삼점", "k002", "2025-11-30"])
+    path = str(tmp_path / "전체리스트_20251201.xlsx")
+    wb.save(path)
+    return path
+
+
+def test_ingest_with_different_layout_is_rejected(list_path, tmp_path):
+    db = str(tmp_path / "store_master.db")
+    first, current = store_master.ingest_list(list_path, engine="openpyxl", db_path=db)
+    assert current
+
+    for other in ({"id_col": "C"}, {"group_col": None}, {"sheet_name": "Sheet"}):
+        with pytest.raises(ValueError):
+            store_master.ingest_list(list_path, engine="openpyxl", db_path=db, **other)
+
+    assert store_master.ingest_list(list_path, engine="openpyxl", db_path=db) == (first, True)
+    assert [r["login_id"] for r in store_master.joined_since("KFC", "2025-01-01", db_path=db)] == ["k001", "k002"]
+    assert store_master.left_since("KFC", "2025-01-01", db_path=db) == []
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+Excel 없이 .xls → .xlsx 변환 (xlrd로 읽고 openpyxl write-only로 쓰기)
+
+excel_copy의 .xls 변환을 Excel COM 없이 처리하기 위한 모듈. Linux에서도 동작하고,
+프로세스 풀로 여러 파일을 동시에 변환할 수 있다 (Excel 인스턴스 풀보다 가볍다).
+
+옮기는 것:
+    - 셀 값 (문자/숫자/날짜/논리/오류), 표시 형식
+    - 글꼴, 채우기, 테두리, 맞춤(가로/세로/줄바꿈)
+    - 병합 셀, 열 너비, 행 높이, 숨긴 행/열/시트, 틀 고정
+
+못 옮기는 것 (이런 파일은 변환 전에 찾아서 UnsupportedXlsError → Excel COM으로 처리):
+    - 수식 (xlrd는 계산 결과만 읽음), 그림/도형/메모, 차트, 조건부 서식, 데이터 유효성 검사,
+      이름 정의(인쇄 영역·인쇄 제목·이름 있는 범위), 하이퍼링크
+
+사용 예:
+    xls_convert.convert_xls_to_xlsx("매장 25년11월.xls", "매장 25년12월.xlsx")
+    results = xls_convert.convert_many([(src, dest), ...], workers=4)
+
+명령줄:
+    python xls_convert.py 원본.xls [원본2.xls ...]   (같은 폴더에 .xlsx로 저장)
+"""
+
+import errno
+import os
+import struct
+import threading
+from copy import copy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import xlrd                                    # pip install xlrd
+from openpyxl import Workbook
+from openpyxl.cell import Cell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+
+# 동시에 변환할 프로세스 수
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+# 변환 결과가 달라지게 고치면 올림 (excel_copy 변환 캐시 키에 들어가서 예전 결과를 다시 쓰지 않음)
+CONVERTER_VERSION = 3
+
+# 이 레코드가 있으면 변환 결과가 원본과 달라지므로 Excel로 넘김 (BIFF8 레코드 번호)
+_UNSUPPORTED_RECORDS = {
+    0x0006: "수식",
+    0x0221: "수식",        # ARRAY
+    0x04BC: "수식",        # SHRFMLA
+    0x00EC: "그림/도형/메모",  # MSODRAWING
+    0x1002: "차트",        # CHART
+    0x01B0: "조건부 서식",  # CONDFMT
+    0x01B2: "데이터 유효성 검사",  # DVAL
+    0x0018: "이름 정의/인쇄 영역",  # NAME (인쇄 영역, 인쇄 제목, 이름 있는 범위)
+    0x01B8: "하이퍼링크",  # HLINK
+}
+
+# xls 테두리 선 종류 번호 → openpyxl 이름
+_BORDER_STYLES = {
+    1: "thin", 2: "medium", 3: "dashed", 4: "dotted", 5: "thick", 6: "double", 7: "hair",
+    8: "mediumDashed", 9: "dashDot", 10: "mediumDashDot", 11: "dashDotDot",
+    12: "mediumDashDotDot", 13: "slantDashDot",
+}
+
+# xls 채우기 무늬 번호 → openpyxl 이름
+_FILL_PATTERNS = {
+    1: "solid", 2: "mediumGray", 3: "darkGray", 4: "lightGray", 5: "darkHorizontal",
+    6: "darkVertical", 7: "darkDown", 8: "darkUp", 9: "darkGrid", 10: "darkTrellis",
+    11: "lightHorizontal", 12: "lightVertical", 13: "lightDown", 14: "lightUp",
+    15: "lightGrid", 16: "lightTrellis", 17: "gray125", 18: "gray0625",
+}
+
+_HORIZONTAL = {1: "left", 2: "center", 3: "right", 4: "fill", 5: "justify", 6: "centerContinuous", 7: "distributed"}
+_VERTICAL = {0: "top", 1: "center", 2: "bottom", 3: "justify", 4: "distributed"}
+_UNDERLINE = {1: "single", 2: "double", 0x21: "singleAccounting", 0x22: "doubleAccounting"}
+_SHEET_STATES = {0: "visible", 1: "hidden", 2: "veryHidden"}
+
+# 1904 날짜 체계 파일은 일련번호에 1462일을 더하면 1900 체계와 같은 날짜
+_DATEMODE_1904_OFFSET = 1462
+
+
+class UnsupportedXlsError(ValueError):
+    """이 변환기로 옮길 수 없는 내용이 있는 파일 (Excel COM으로 변환해야 함)"""
+
+
+def _find_unsupported(book: xlrd.Book) -> List[str]:
+    """Workbook 스트림의 레코드 번호만 훑어서 옮길 수 없는 내용 찾기 (셀을 읽기 전에 확인)"""
+    mem = getattr(book, "mem", None)
+    if mem is None:
+        return []
+    found = []
+    pos = book.base
+    end = book.base + book.stream_len
+    while pos + 4 <= end:
+        code, length = struct.unpack("<HH", mem[pos:pos + 4])
+        reason = _UNSUPPORTED_RECORDS.get(code)
+        if reason and reason not in found:
+            found.append(reason)
+        pos += 4 + length
+    return found
+
+
+def _rgb(book: xlrd.Book, colour_index: int) -> Optional[str]:
+    rgb = book.colour_map.get(colour_index)
+    if rgb is None:
+        return None  # 자동 색
+    return "FF%02X%02X%02X" % rgb
+
+
+class _StyleConverter:
+    """
+    xf 번호별 openpyxl 스타일 (같은 xf는 한 번만 만듦)
+    - 셀마다 font/fill 등을 대입하면 매번 통합문서 스타일 목록에서 해시 비교를 하므로 (변환 시간의 2/3)
+      xf마다 한 번만 등록하고 결과 스타일 번호 배열(StyleArray)을 복사해서 씀
+    """
+
+    def __init__(self, book: xlrd.Book):
+        self.book = book
+        self._cache: Dict[int, object] = {}
+
+    def style_array(self, xf_index: int, ws):
+        """ws가 속한 통합문서에 xf 스타일을 등록하고 StyleArray 반환 (셀에 넣을 때는 복사해서)"""
+        style = self._cache.get(xf_index)
+        if style is None:
+            template = Cell(ws, row=1, column=1)
+            (template.number_format, template.font, template.fill,
+             template.border, template.alignment) = self._build(xf_index)
+            style = self._cache[xf_index] = template._style
+        return style
+
+    def _build(self, xf_index: int) -> Tuple:
+        book = self.book
+        xf = book.xf_list[xf_index]
+
+        fmt = book.format_map.get(xf.format_key)
+        number_format = fmt.format_str if fmt and fmt.format_str else "General"
+
+        f = book.font_list[xf.font_index]
+        font = Font(
+            name=f.name,
+            size=f.height / 20,
+            bold=bool(f.bold),
+            italic=bool(f.italic),
+            underline=_UNDERLINE.get(f.underline_type),
+            strike=bool(f.struck_out),
+            vertAlign={1: "superscript", 2: "subscript"}.get(f.escapement),
+            color=_rgb(book, f.colour_index),
+        )
+
+        bg = xf.background
+        fill = PatternFill()
+        pattern = _FILL_PATTERNS.get(bg.fill_pattern)
+        if pattern:
+            fill = PatternFill(
+                fill_type=pattern,
+                fgColor=_rgb(book, bg.pattern_colour_index) or "FF000000",
+                bgColor=_rgb(book, bg.background_colour_index) or "FFFFFFFF",
+            )
+
+        b = xf.border
+
+        def side(line_style, colour_index):
+            style_name = _BORDER_STYLES.get(line_style)
+            if not style_name:
+                return Side()
+            return Side(style=style_name, color=_rgb(book, colour_index))
+
+        border = Border(
+            left=side(b.left_line_style, b.left_colour_index),
+            right=side(b.right_line_style, b.right_colour_index),
+            top=side(b.top_line_style, b.top_colour_index),
+            bottom=side(b.bottom_line_style, b.bottom_colour_index),
+        )
+
+        a = xf.alignment
+        alignment = Alignment(
+            horizontal=_HORIZONTAL.get(a.hor_align),
+            vertical=_VERTICAL.get(a.vert_align, "bottom"),
+            wrap_text=bool(a.text_wrapped) or None,
+            shrink_to_fit=bool(a.shrink_to_fit) or None,
+            indent=a.indent_level,
+            text_rotation=a.rotation if 0 <= a.rotation <= 180 else 0,
+        )
+        return number_format, font, fill, border, alignment
+
+
+def _cell_value(book: xlrd.Book, cell: xlrd.sheet.Cell):
+    ctype = cell.ctype
+    if ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return None
+    if ctype == xlrd.XL_CELL_DATE:
+        # datetime으로 바꾸지 않고 일련번호 그대로 (표시 형식이 같이 옮겨지므로 Excel에서 같은 날짜로 보임)
+        if book.datemode == 1:
+            return cell.value + _DATEMODE_1904_OFFSET
+        return cell.value
+    if ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    if ctype == xlrd.XL_CELL_ERROR:
+        return xlrd.error_text_from_code.get(cell.value, "#N/A")
+    if ctype == xlrd.XL_CELL_NUMBER and float(cell.value).is_integer() and abs(cell.value) < 2 ** 53:
+        return int(cell.value)
+    return cell.value
+
+
+def _copy_sheet(book: xlrd.Book, sheet: xlrd.sheet.Sheet, ws, styles: _StyleConverter):
+    # 열 너비 / 숨긴 열 (xls 너비 단위는 글자 폭의 1/256)
+    for col, info in sheet.colinfo_map.items():
+        dim = ws.column_dimensions[get_column_letter(col + 1)]
+        dim.width = info.width / 256
+        if info.hidden:
+            dim.hidden = True
+
+    # 행 높이 / 숨긴 행 (행을 쓰기 전에 정해야 write-only에서 반영됨)
+    for row, info in sheet.rowinfo_map.items():
+        dim = ws.row_dimensions[row + 1]
+        if info.has_default_height == 0:
+            dim.height = info.height / 20
+        if info.hidden:
+            dim.hidden = True
+
+    if sheet.panes_are_frozen and (sheet.horz_split_pos or sheet.vert_split_pos):
+        ws.freeze_panes = f"{get_column_letter(sheet.vert_split_pos + 1)}{sheet.horz_split_pos + 1}"
+    ws.sheet_state = _SHEET_STATES.get(sheet.visibility, "visible")
+
+    for rlo, rhi, clo, chi in sheet.merged_cells:
+        ws.merged_cells.add(f"{get_column_letter(clo + 1)}{rlo + 1}:{get_column_letter(chi)}{rhi}")
+
+    for r in range(sheet.nrows):
+        row_values = []
+        for cell in sheet.row(r):
+            value = _cell_value(book, cell)
+            if value is None and cell.xf_index in (None, 0, 15):
+                row_values.append(None)  # 기본 서식 빈 셀은 쓰지 않음
+                continue
+            style = styles.style_array(cell.xf_index, ws) if cell.xf_index is not None else None
+            out = Cell(ws, row=1, column=1, value=value, style_array=copy(style) if style is not None else None)
+            if cell.ctype == xlrd.XL_CELL_TEXT:
+                out.data_type = "s"  # '=SUM(...)', '#REF!' 같은 글자를 수식/오류로 바꾸지 않도록
+            row_values.append(out)
+        ws.append(row_values)
+
+
+def convert_xls_to_xlsx(xls_path: str, dest_xlsx_path: str, force: bool = False) -> str:
+    """
+    .xls를 .xlsx로 변환 (Excel 불필요)
+    - force=False면 수식/그림 등 옮길 수 없는 내용이 있을 때 UnsupportedXlsError
+    - 변환 중 실패하면 반쯤 쓰인 결과 파일은 지움
+    Returns: dest_xlsx_path
+    """
+    book = xlrd.open_workbook(xls_path, formatting_info=True, on_demand=True)
+    try:
+        if not force:
+            reasons = _find_unsupported(book)
+            if reasons:
+                raise UnsupportedXlsError(f"Excel 없이 변환할 수 없는 내용: {', '.join(reasons)}")
+
+        wb = Workbook(write_only=True)
+        styles = _StyleConverter(book)
+        for index in range(book.nsheets):
+            sheet = book.sheet_by_index(index)
+            ws = wb.create_sheet(title=sheet.name)
+            _copy_sheet(book, sheet, ws, styles)
+            book.unload_sheet(index)
+
+        # 임시 이름은 작업자 프로세스/스레드마다 다르게, 대상은 덮어쓰지 않음 (동시에 같은 이름을 만들 때)
+        temp_path = f"{dest_xlsx_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            wb.save(temp_path)
+            move_no_replace(temp_path, dest_xlsx_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    finally:
+        book.release_resources()
+    return dest_xlsx_path
+
+
+def move_no_replace(src: str, dest: str):
+    """
+    src를 dest로 옮김 - dest가 이미 있으면 덮어쓰지 않고 FileExistsError
+    - Windows: os.rename이 원래 대상이 있으면 실패
+    - 그 밖: os.rename은 덮어쓰므로 하드 링크를 만든 뒤 원래 이름 삭제 (링크를 못 만드는 파일 시스템이면 확인 후 rename)
+    """
+    try:
+        if os.name == "nt":
+            os.rename(src, dest)
+            return
+        try:
+            os.link(src, dest)
+        except FileExistsError:
+            raise
+        except OSError:
+            if os.path.exists(dest):
+                raise FileExistsError(errno.EEXIST, "exists", dest)
+            os.rename(src, dest)
+            return
+        os.remove(src)
+    except FileExistsError:
+        raise FileExistsError(errno.EEXIST, "이미 있는 파일이라 덮어쓰지 않음", dest) from None
+
+
+def _convert_job(job: Tuple[str, str]) -> Tuple[str, str]:
+    """작업자 프로세스에서 실행 - (결과 경로, 오류 메시지) 반환 (오류 없으면 "")"""
+    src, dest = job
+    try:
+        return convert_xls_to_xlsx(src, dest), ""
+    except UnsupportedXlsError as e:
+        return dest, f"unsupported:{e}"
+    except Exception as e:
+        return dest, f"{type(e).__name__}: {e}"
+
+
+def convert_many(
+    jobs: List[Tuple[str, str]],
+    workers: int = DEFAULT_WORKERS,
+    on_done: Optional[Callable[[int, str, str], None]] = None,
+) -> List[Tuple[str, str]]:
+    """
+    여러 파일을 프로세스 풀로 변환
+    - jobs: (원본 .xls, 목적지 .xlsx) 목록 (목적지는 호출하는 쪽에서 겹치지 않게 정해 둘 것)
+    - on_done(순번, 결과 경로, 오류): 파일 하나가 끝날 때마다 호출한 스레드에서 호출
+    - 반환: jobs와 같은 순서의 (결과 경로, 오류) - 오류가 "unsupported:"로 시작하면 Excel로 다시 시도할 것
+    """
+    results: List[Tuple[str, str]] = [("", "")] * len(jobs)
+    if not jobs:
+        return results
+    if workers <= 1 or len(jobs) == 1:
+        for i, job in enumerate(jobs):
+            results[i] = _convert_job(job)
+            if on_done:
+                on_done(i, *results[i])
+        return results
+
+    import multiprocessing
+    ctx = multiprocessing.get_context("spawn")  # Windows와 동일하게 spawn
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=ctx) as pool:
+        futures = {pool.submit(_convert_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:  # 작업자 프로세스가 죽은 경우 등
+                results[i] = (jobs[i][1], f"{type(e).__name__}: {e}")
+            if on_done:
+                on_done(i, *results[i])
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        print("사용법: python xls_convert.py <원본.xls> [원본2.xls ...]")
+        sys.exit(1)
+    pairs = [(path, os.path.splitext(path)[0] + ".xlsx") for path in sys.argv[1:]]
+    started = time.perf_counter()
+    for (src, _), (dest, error) in zip(pairs, convert_many(pairs)):
+        print(f"❌ {src}: {error}" if error else f"✅ {src} → {dest}")
+    print(f"{len(pairs)}개, {time.perf_counter() - started:.1f}초")